@@ -0,0 +1,59 @@
+"""
+Full-page / response: bytes and latency for a first visit, a repeat visit
+revalidated with If-None-Match, and the fingerprinted JS/CSS it references.
+
+Runs the app in-process (TestClient) with a signed-in session cookie and the
+store's startup work skipped, so only page rendering and transfer are measured.
+
+Usage:
+    python -m benchmarks.bench_app_page [requests]
+"""
+import base64
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("SESSION_SECRET", "benchmark")
+os.environ["LAZY_STARTUP"] = "1"
+
+import itsdangerous
+from starlette.testclient import TestClient
+
+import main as app_main
+
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+
+def signed_in_client() -> TestClient:
+    client = TestClient(app_main.app)
+    session = base64.b64encode(json.dumps({"email": "benchmark@paris-iea.fr"}).encode())
+    client.cookies.set(app_main.app.session_cookie, itsdangerous.TimestampSigner(app_main.app.secret_key).sign(session).decode())
+    return client
+
+
+def timed(client, url, headers=None):
+    start = time.perf_counter()
+    for _ in range(N):
+        response = client.get(url, headers=headers or {})
+    return response, (time.perf_counter() - start) / N
+
+
+def main():
+    client = signed_in_client()
+    first, first_s = timed(client, "/")
+    assert first.status_code == 200, first.status_code
+    repeat, repeat_s = timed(client, "/", {"If-None-Match": first.headers["etag"]})
+    assert repeat.status_code == 304, repeat.status_code
+
+    print(f"> App page (/, {N} requests each)")
+    print(f"full page:            {len(first.content) / 1e3:6.1f} KB  {first_s * 1e3:.2f} ms")
+    print(f"repeat (304):         {len(repeat.content) / 1e3:6.1f} KB  {repeat_s * 1e3:.2f} ms")
+    for asset in (app_main.app_js, app_main.app_css):
+        response = client.get(asset.url)
+        revalidated = client.get(asset.url, headers={"If-None-Match": response.headers["etag"]})
+        print(f"{asset.filename:<21} {len(response.content) / 1e3:6.1f} KB  ({response.headers['cache-control']}; revalidation {revalidated.status_code})")
+
+
+if __name__ == "__main__":
+    main()
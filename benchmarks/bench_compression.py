@@ -0,0 +1,82 @@
+"""
+Transcript reader fragments over HTTP: bytes on the wire and latency per
+content coding (identity, gzip, brotli), and a revalidation with the ETag.
+
+Writes one long synthetic transcript (the sample segments repeated, see
+bench_parser) into a temporary SQLite store and requests the reader's first
+page and a later chunk of LIMIT segments through the app, in-process. First
+checks that the cached navigation fragments are served as HTML, not escaped.
+
+Usage:
+    python -m benchmarks.bench_compression [limit]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SESSION_SECRET", "benchmark")
+os.environ["LAZY_STARTUP"] = "1"
+os.environ["TRANSCRIPT_STORE"] = "sqlite"
+os.environ["SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(), "compression.db")
+
+from starlette.testclient import TestClient
+
+import main as app_main
+from benchmarks.bench_parser import synthetic_transcript
+from lib.compression import brotli
+
+LIMIT = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+RUNS = 50
+STEM = "bench-compression"
+FRAGMENTS = (
+    "/load-transcripts-country?country=Benchland",
+    "/load-transcripts-project?country=Benchland&project=BN-001 - Compression",
+)
+
+
+def request(client, url, headers):
+    """Last response, its size on the wire (still encoded) and the median ms over RUNS."""
+    elapsed = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        with client.stream("GET", url, headers=headers) as response:
+            wire = sum(len(chunk) for chunk in response.iter_raw())
+        elapsed.append(time.perf_counter() - start)
+    return response, wire, sorted(elapsed)[len(elapsed) // 2] * 1e3
+
+
+def main():
+    store = app_main.get_store()
+    asyncio.run(store.put_transcripts([{
+        "FILE": f"{STEM}.mp4", "COUNTRY": "Benchland", "PROJECT": "BN-001", "NAME": "Compression",
+        "TRANSCRIPT": synthetic_transcript(1),
+    }]))
+    client = TestClient(app_main.app)
+    encodings = ["identity", "gzip"] + (["br"] if brotli else [])
+
+    for url in FRAGMENTS:
+        body = client.get(url, headers={"HX-Request": "true"}).text
+        assert body.lstrip().startswith("<") and "&lt;" not in body, f"{url} serves escaped HTML: {body[:80]}"
+
+    print(f"> Reader fragments ({LIMIT} segments per page, median of {RUNS})")
+    for label, url in (
+        ("first page", f"/read-transcript-content?filename={STEM}&offset=0&limit={LIMIT}"),
+        ("later chunk", f"/read-transcript-chunk?filename={STEM}&offset={LIMIT * 4}&limit={LIMIT}"),
+    ):
+        for encoding in encodings:
+            headers = {"HX-Request": "true", "Accept-Encoding": encoding}
+            response, wire, ms = request(client, url, headers)
+            tag = response.headers["etag"]
+            revalidated, _, revalidate_ms = request(client, url, {**headers, "If-None-Match": tag})
+            print(
+                f"{label:<12} {encoding:<9} {wire / 1e3:7.1f} KB {ms:6.2f} ms"
+                f" | revalidated: {revalidated.status_code} in {revalidate_ms:.2f} ms"
+            )
+    if not brotli:
+        print("(install brotli to compare br)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+MongoDB connection pool under concurrency: first-query latency with and
+without warm-up, then N concurrent queries per pool size, with the pool
+metrics lib.db collects (connections opened, check-out waits).
+
+Needs a real server: set BENCH_MONGODB_URI (a scratch database is used and
+dropped). Pool sizes are set through MONGO_MAX_POOL_SIZE per run, in a fresh
+interpreter each, since lib.db reads its settings at import.
+
+Usage:
+    BENCH_MONGODB_URI=mongodb://localhost:27017 python -m benchmarks.bench_db_pool [concurrency]
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("SESSION_SECRET", "benchmark")
+
+URI = os.getenv("BENCH_MONGODB_URI")
+CONCURRENCY = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1] != "--child" else 100
+POOL_SIZES = [5, 20, 100]
+DB = "socioscope_bench"
+
+
+async def run(concurrency: int, warm: bool) -> dict:
+    from lib import db
+
+    client = db.get_motor_client()
+    coll = client[DB]["pool"]
+    await coll.delete_many({})
+    await coll.insert_many([{"i": i, "TRANSCRIPT": "word " * 2000} for i in range(50)])
+
+    # Drop the connection the setup used, so the first query pays for a new one
+    client.close()
+    db._motor_clients.clear()
+    coll = db.get_motor_client()[DB]["pool"]
+    if warm:
+        await db.warm_up()
+    start = time.perf_counter()
+    await coll.find_one({"i": 0})
+    first_ms = (time.perf_counter() - start) * 1e3
+
+    start = time.perf_counter()
+    await asyncio.gather(*[coll.find_one({"i": i % 50}) for i in range(concurrency)])
+    burst_ms = (time.perf_counter() - start) * 1e3
+
+    await coll.database.client.drop_database(DB)
+    return {"first_ms": first_ms, "burst_ms": burst_ms, **db.pool_stats()}
+
+
+def child():
+    concurrency, warm = int(sys.argv[2]), sys.argv[3] == "warm"
+    print(json.dumps(asyncio.run(run(concurrency, warm))))
+
+
+def main():
+    if not URI:
+        print("> Connection pool: set BENCH_MONGODB_URI to a MongoDB server to run this benchmark")
+        return
+    print(f"> Connection pool ({CONCURRENCY} concurrent find_one of ~10 KB documents)")
+    print(f"{'pool':>5} {'warm':>5} | {'first':>8} {'burst':>9} | {'opened':>6} {'wait avg':>9} {'wait max':>9} {'compressors'}")
+    for pool_size in POOL_SIZES:
+        for warm in (False, True):
+            env = {**os.environ, "MONGODB_URI": URI, "MONGO_MAX_POOL_SIZE": str(pool_size)}
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_db_pool", "--child", str(CONCURRENCY), "warm" if warm else "cold"],
+                env=env, capture_output=True, text=True, check=True,
+            ).stdout
+            r = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{pool_size:>5} {'yes' if warm else 'no':>5} | {r['first_ms']:>6.1f}ms {r['burst_ms']:>7.1f}ms | "
+                f"{r['connections_created']:>6} {r['checkout_wait_ms_avg']:>7.2f}ms {r['checkout_wait_ms_max']:>7.2f}ms {','.join(r['compressors'])}"
+            )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child()
+    else:
+        main()
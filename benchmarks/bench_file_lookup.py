@@ -0,0 +1,91 @@
+"""
+Transcript content lookup: regex alternation on FILE vs. `$in` on indexed FILE_STEM.
+
+Fills a collection with N synthetic transcripts carrying FILE_STEM (as
+ingested or backfilled), and looks up a fixed selection of stems with both
+queries. The comparison needs a real server (BENCH_MONGODB_URI, e.g. a local
+mongod), where it reports latency and the documents and index keys examined
+from `explain()`. Without one it runs on mongomock, which has no indexes or
+query planner, so it only checks that both queries return the same documents
+and reports no timings.
+
+Usage:
+    BENCH_MONGODB_URI=mongodb://localhost:27017 python -m benchmarks.bench_file_lookup
+    python -m benchmarks.bench_file_lookup
+"""
+import os
+import re
+import time
+
+os.environ.setdefault("SESSION_SECRET", "benchmark")
+
+from lib.sources import file_stem
+from utils.backfill_file_stem import create_indexes
+
+SIZES = (1_000, 10_000, 50_000)
+SELECTED = 5
+RUNS = 20
+
+
+def get_collection():
+    uri = os.getenv("BENCH_MONGODB_URI")
+    if uri:
+        from pymongo import MongoClient
+        client = MongoClient(uri, serverSelectionTimeoutMS=2000)
+        client.admin.command("ping")
+        return client["socioscope_bench"]["file_lookup"], True
+    import mongomock
+    return mongomock.MongoClient()["socioscope_bench"]["file_lookup"], False
+
+
+def regex_query(stems):
+    return {"FILE": {"$regex": f"^({'|'.join(re.escape(s) for s in stems)})\\."}}
+
+
+def stem_query(stems):
+    return {"FILE_STEM": {"$in": stems}}
+
+
+def measure(coll, query):
+    elapsed = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        list(coll.find(query, {"TRANSCRIPT": 1}))
+        elapsed = min(elapsed, time.perf_counter() - start)
+    return elapsed * 1000
+
+
+def found(coll, query):
+    return sorted(doc["_id"] for doc in coll.find(query, {"_id": 1}))
+
+
+def examined(coll, query):
+    stats = coll.find(query, {"TRANSCRIPT": 1}).explain()["executionStats"]
+    return f"{stats['totalDocsExamined']:>7} docs {stats['totalKeysExamined']:>7} keys"
+
+
+def main():
+    coll, planner = get_collection()
+    print(f"> FILE lookup, {SELECTED} selected transcripts ({'server' if planner else 'mongomock, results only'})")
+    for size in SIZES:
+        coll.drop()
+        files = [f"XX-{i:06d}_interview_audio.m4a.csv" for i in range(size)]
+        coll.insert_many([
+            {"FILE": file, "FILE_STEM": file_stem(file), "TRANSCRIPT": f"[00:00:00 - 00:00:05] A : transcript {i}"}
+            for i, file in enumerate(files)
+        ])
+        create_indexes(coll)
+        stems = [f"XX-{i:06d}_interview_audio.m4a" for i in range(0, size, size // SELECTED)]
+
+        expected = found(coll, regex_query(stems))
+        assert len(expected) == SELECTED and found(coll, stem_query(stems)) == expected
+        if not planner:
+            print(f"N={size:>6}  regex FILE and $in FILE_STEM return the same {SELECTED} documents")
+            continue
+        for label, query in (("regex FILE", regex_query(stems)), ("$in FILE_STEM", stem_query(stems))):
+            print(f"N={size:>6}  {label:<14} {measure(coll, query):8.2f} ms  {examined(coll, query)}")
+    coll.drop()
+
+
+if __name__ == "__main__":
+    main()
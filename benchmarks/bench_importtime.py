@@ -0,0 +1,68 @@
+"""
+Cold-start import profile of the app (`python -X importtime -c "import main"`).
+
+Each run is a fresh interpreter, as on a serverless cold start (bytecode is
+compiled by a first, unmeasured run). Reports the best total over RUNS, the
+slowest top-level imports and this repo's own modules, and exits with status 1
+if a module that should load lazily (LLM, email and database drivers) is
+imported at startup, or if the total exceeds an optional budget in ms.
+
+Usage:
+    python -m benchmarks.bench_importtime [budget_ms]
+"""
+import os
+import subprocess
+import sys
+
+RUNS = 5
+TOP = 12
+BUDGET_MS = float(sys.argv[1]) if len(sys.argv) > 1 else None
+
+# Loaded by the first request that needs them, never by `import main`
+DEFERRED = ["groq", "boto3", "botocore", "motor", "pymongo", "lib.vector_index", "lib.mongo_store", "lib.sqlite_store"]
+OWN_PACKAGES = ("main", "config", "styles", "lib", "components")
+
+
+def profile() -> list[tuple[str, int, int]]:
+    """(module, self us, cumulative us) of every module imported by `import main`, in import order."""
+    env = {**os.environ, "SESSION_SECRET": os.environ.get("SESSION_SECRET", "benchmark")}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        modules.append((name.rstrip(), int(own), int(cumulative)))
+    return modules
+
+
+def main():
+    profile()  # writes bytecode caches
+    runs = [profile() for _ in range(RUNS)]
+    best = min(runs, key=lambda modules: next(c for name, _, c in modules if name.strip() == "main"))
+    total_ms = next(c for name, _, c in best if name.strip() == "main") / 1e3
+    names = {name.strip() for name, _, _ in best}
+
+    print(f"> import main: {total_ms:.0f} ms (best of {RUNS}), {len(best)} modules")
+    print("slowest top-level imports:")
+    top_level = [(name.strip(), c) for name, _, c in best if name.startswith("  ") and not name.startswith("    ")]
+    for name, cumulative in sorted(top_level, key=lambda m: -m[1])[:TOP]:
+        print(f"  {cumulative / 1e3:>8.1f} ms  {name}")
+    own = [(name.strip(), s) for name, s, _ in best if name.strip().split(".")[0] in OWN_PACKAGES]
+    print(f"this repo's modules (self time): {sum(s for _, s in own) / 1e3:.1f} ms")
+    for name, own_us in sorted(own, key=lambda m: -m[1])[:5]:
+        print(f"  {own_us / 1e3:>8.1f} ms  {name}")
+
+    failures = [f"{module} is imported at startup" for module in DEFERRED if module in names]
+    if BUDGET_MS is not None and total_ms > BUDGET_MS:
+        failures.append(f"import main takes {total_ms:.0f} ms, over the {BUDGET_MS:.0f} ms budget")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
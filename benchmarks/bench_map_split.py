@@ -0,0 +1,73 @@
+"""
+Map calls for an oversized document against a fake LLM that records prompt sizes.
+
+Maps a synthetic long interview with retrieval disabled (the whole transcript)
+under a given context window and checks that it is split into as few calls as
+fit, none of which (plus its completion budget) exceeds the window. Then maps
+several such documents for one question, with batch reduces of two, and checks
+that their parts and the batch reduces together never exceed the map
+concurrency limit, and that failing batch reduces leave every map response
+for the final reduce.
+
+Usage:
+    python -m benchmarks.bench_map_split [size_mb] [context_tokens]
+"""
+import asyncio
+import math
+import os
+import sys
+import time
+
+from benchmarks.fake_llm import FakeLLMServer
+
+SIZE_MB = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+CONTEXT_TOKENS = int(sys.argv[2]) if len(sys.argv) > 2 else 8192
+DOCUMENTS = 4
+CONCURRENCY = 4
+
+os.environ.setdefault("SESSION_SECRET", "benchmark")
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ["RAG_TOP_K"] = "0"  # retrieval disabled: whole transcripts reach the map phase
+
+
+def main():
+    from benchmarks.bench_parser import synthetic_transcript
+    transcript = synthetic_transcript(SIZE_MB)
+
+    with FakeLLMServer(delay=0.2) as server:
+        os.environ["GROQ_BASE_URL"] = server.base_url
+        from lib import discussion
+        from lib.discussion import map_document, map_partials, map_input_budget, map_max_tokens
+        from lib.tokens import estimate_tokens
+
+        question = "How do the projects involve volunteers?"
+        model = "qwen/qwen3-32b"
+        budget = map_input_budget(question, model, CONTEXT_TOKENS)
+
+        start = time.perf_counter()
+        asyncio.run(map_document(question, transcript, model, top_k=0, use_cache=False, context_tokens=CONTEXT_TOKENS))
+        elapsed = time.perf_counter() - start
+        prompts = [estimate_tokens("x" * size) for size in server.prompt_sizes()]
+
+        contents = {f"document-{i}": transcript for i in range(DOCUMENTS)}
+        server.max_in_flight = 0
+        asyncio.run(map_partials(question, contents, model, concurrency=CONCURRENCY, reduce_batch=2, context_tokens=CONTEXT_TOKENS))
+        peak = server.max_in_flight
+
+        async def failing_reduce(*args):
+            raise RuntimeError("reduce failed")
+
+        discussion.reduce_responses = failing_reduce
+        left = asyncio.run(map_partials(question, contents, model, concurrency=CONCURRENCY, reduce_batch=2, context_tokens=CONTEXT_TOKENS))
+
+    limit = CONTEXT_TOKENS - map_max_tokens(model)
+    print(f"> Map split ({SIZE_MB} MB transcript, ~{estimate_tokens(transcript)} tokens, context {CONTEXT_TOKENS} tokens)")
+    print(f"Map calls:           {len(prompts)} in {elapsed:.2f}s (at least {math.ceil(estimate_tokens(transcript) / budget)} needed)")
+    print(f"Largest prompt:      ~{max(prompts)} tokens (limit {limit})")
+    print(f"Peak concurrent:     {peak} calls for {DOCUMENTS} split documents and their batch reduces (limit {CONCURRENCY})")
+    print(f"Failed batch reduces: {len(left)} of {DOCUMENTS} map responses left for the final reduce")
+    sys.exit(0 if max(prompts) <= limit and peak <= CONCURRENCY and len(left) == DOCUMENTS else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Transcript navigation at scale: full accordion vs. lazy fragments.
+
+Builds a synthetic corpus of N transcripts (50 countries, ~10 transcripts per
+project) and reports response bytes and render time of /load-transcripts in
+full and lazy mode, and of a typical lazy country and project fragment.
+
+Usage:
+    python -m benchmarks.bench_navigation [transcripts]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SESSION_SECRET", "benchmark")
+
+from fasthtml.common import to_xml
+from lib.sources import build_navigation
+from components import TranscriptsCard, CountryProjects, ProjectRecords
+
+TRANSCRIPTS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+COUNTRIES = 50
+PER_PROJECT = 10
+RUNS = 5
+
+
+def synthetic_metadata(n: int) -> list[dict]:
+    return [
+        {
+            "COUNTRY": f"Country {i // PER_PROJECT % COUNTRIES:02d}",
+            "PROJECT": f"P-{i // PER_PROJECT:05d}",
+            "NAME": f"Project {i // PER_PROJECT}",
+            "FILE": f"XX-{i:06d}_interview_audio.m4a.csv",
+        }
+        for i in range(n)
+    ]
+
+
+def measure(render):
+    elapsed = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        html = to_xml(render())
+        elapsed = min(elapsed, time.perf_counter() - start)
+    return len(html.encode()), elapsed * 1000
+
+
+def main():
+    nav = build_navigation(synthetic_metadata(TRANSCRIPTS))
+    country, projects = next(iter(nav.items()))
+    project, records = next(iter(projects.items()))
+
+    print(f"> Navigation render ({TRANSCRIPTS} transcripts, {len(nav)} countries, {sum(map(len, nav.values()))} projects)")
+    for label, render in (
+        ("full /load-transcripts", lambda: TranscriptsCard(nav, TRANSCRIPTS)),
+        ("lazy /load-transcripts", lambda: TranscriptsCard(nav, TRANSCRIPTS, lazy=True)),
+        ("lazy country fragment", lambda: CountryProjects(country, projects)),
+        ("lazy project fragment", lambda: ProjectRecords(records)),
+    ):
+        size, ms = measure(render)
+        print(f"{label:<24} {size / 1e3:>9.1f} KB {ms:>9.1f} ms")
+    print("(fragments are rendered once per navigation version, then served from cache)")
+
+
+if __name__ == "__main__":
+    main()
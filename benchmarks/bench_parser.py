@@ -0,0 +1,104 @@
+"""
+Compare the single-pass transcript parser with the original regex parser.
+
+Builds a synthetic transcript of about SIZE_MB megabytes by repeating the
+segments of data/samples.json with increasing timestamps, checks both parsers
+agree there and on every sample transcript as is (same segments, timestamps as
+written, empty-text segments kept), and reports parse time and peak memory
+(tracemalloc).
+
+Usage:
+    python -m benchmarks.bench_parser [size_mb]
+"""
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SESSION_SECRET", "benchmark")
+
+from lib.sources import parse_transcript
+from lib.transcript_parser import iter_segments, parse_columnar, format_timestamp
+
+SIZE_MB = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+
+def legacy_parse_transcript(transcript_text: str) -> list[dict]:
+    """The original implementation: DOTALL lazy findall with a lookahead."""
+    pattern = r'\[(\d{2}:\d{2}:\d{2})\s*-\s*(\d{2}:\d{2}:\d{2})\]\s*([^:]+?)\s*:\s*(.+?)(?=\[\d{2}:\d{2}:\d{2}|$)'
+    segments = []
+    for start_time, end_time, speaker, text in re.findall(pattern, transcript_text, re.DOTALL):
+        segments.append({"start_time": start_time, "end_time": end_time, "speaker": speaker.strip(), "text": text.strip()})
+    return segments
+
+
+def legacy_unique_speakers(segments: list[dict]) -> list[str]:
+    speakers = []
+    for seg in segments:
+        if seg["speaker"] not in speakers:
+            speakers.append(seg["speaker"])
+    return speakers
+
+
+def synthetic_transcript(size_mb: float) -> str:
+    with open("data/samples.json", "r") as f:
+        segments = [seg for doc in json.load(f) for seg in parse_transcript(doc.get("TRANSCRIPT", ""))]
+    lines, size, clock, i = [], 0, 0, 0
+    while size < size_mb * 1e6:
+        seg = segments[i % len(segments)]
+        line = f"[{format_timestamp(clock)} - {format_timestamp(clock + 20)}] {seg['speaker']} : {seg['text']}"
+        lines.append(line)
+        size += len(line) + 1
+        clock = (clock + 20) % (100 * 3600)
+        i += 1
+    return "\n".join(lines)
+
+
+def measure(fn, text):
+    """Best of 3 runs, then peak memory in a separate traced run (tracing slows Python code)."""
+    elapsed = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        result = fn(text)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(text)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 1e6
+
+
+def check_samples():
+    """The new parser returns exactly the original regex's segments for every sample transcript."""
+    with open("data/samples.json", "r") as f:
+        transcripts = [doc.get("TRANSCRIPT", "") for doc in json.load(f)]
+    for transcript in transcripts:
+        assert parse_transcript(transcript) == legacy_parse_transcript(transcript)
+    # Empty text (kept) and out-of-range timestamps (as written)
+    edge = "[00:00:00 - 00:00:05] A : hi\n[00:75:00 - 00:99:99] B : \n"
+    assert parse_transcript(edge) == legacy_parse_transcript(edge)
+    return len(transcripts)
+
+
+def main():
+    checked = check_samples()
+    text = synthetic_transcript(SIZE_MB)
+
+    (legacy, speakers), legacy_s, legacy_mb = measure(lambda t: (lambda segs: (segs, legacy_unique_speakers(segs)))(legacy_parse_transcript(t)), text)
+    _, lazy_s, lazy_mb = measure(lambda t: sum(1 for _ in iter_segments(t)), text)
+    table, columnar_s, columnar_mb = measure(parse_columnar, text)
+
+    assert len(table) == len(legacy) and table.speakers == speakers
+    assert all(table.as_dict(i) == legacy[i] for i in range(len(legacy)))
+
+    print(f"> Transcript parser ({len(text) / 1e6:.1f} MB, {len(table)} segments, {len(table.speakers)} speakers)")
+    print(f"Same segments as the original regex on all {checked} sample transcripts")
+    print(f"legacy parse + speakers:   {legacy_s:.2f}s (peak {legacy_mb:.0f} MB)")
+    print(f"iter_segments (lazy):      {lazy_s:.2f}s (peak {lazy_mb:.1f} MB)")
+    print(f"parse_columnar:            {columnar_s:.2f}s (peak {columnar_mb:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Markdown rendering of model answers: per-call conversion vs. the
+rendered-HTML cache, and streamed renders in full vs. incrementally.
+
+Answers of 5-50 KB are built from the blocks models produce (headings,
+paragraphs, loose and tight lists, tables, fenced code). The streaming
+numbers replay each answer in CHUNK-byte deltas, rendering after every
+delta like /rag-stream does, and check the incremental HTML matches a full
+render once the stream ends.
+
+Usage:
+    python -m benchmarks.bench_render [chunk_bytes]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SESSION_SECRET", "benchmark")
+
+from lib.rendering import IncrementalMarkdown, convert, render_markdown
+
+SIZES_KB = [5, 10, 25, 50]
+CHUNK = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+
+BLOCKS = [
+    "## Findings on {topic}\n",
+    "Participants in the {topic} groups described **recurring tensions** between local "
+    "practices and national policy, often pointing to `funding` and *trust* as the main issues. "
+    "Several of them returned to the question later in the discussion.\n",
+    "- Farmers mention {topic} as a source of income\n- Teachers link it to school attendance\n"
+    "- Officials rarely raise it unprompted\n",
+    "1. First, the {topic} project started in the north.\n\n"
+    "2. It then spread to coastal districts.\n\n"
+    "3. Finally it reached the capital.\n",
+    "| Country | Mentions of {topic} | Share |\n|---|---|---|\n| Kenya | 42 | 31% |\n"
+    "| Ghana | 27 | 20% |\n| Peru | 65 | 49% |\n",
+    "```python\n# Counting {topic} mentions\ncounts = {{}}\n\nfor doc in documents:\n"
+    "    counts[doc] = doc.count('{topic}')\n```\n",
+    "> \"We never talked about {topic} before,\" one participant said.\n",
+]
+TOPICS = ["water", "education", "migration", "health", "energy", "housing"]
+
+
+def synthetic_answer(size_kb: int) -> str:
+    parts, size, i = [], 0, 0
+    while size < size_kb * 1000:
+        block = BLOCKS[i % len(BLOCKS)].format(topic=TOPICS[i % len(TOPICS)])
+        parts.append(block)
+        size += len(block) + 1
+        i += 1
+    return "\n".join(parts)
+
+
+def best_of(fn, runs=5):
+    elapsed = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        elapsed = min(elapsed, time.perf_counter() - start)
+    return elapsed
+
+
+def stream_full(text):
+    for end in range(CHUNK, len(text) + CHUNK, CHUNK):
+        convert(text[:end])
+
+
+def stream_incremental(text):
+    renderer = IncrementalMarkdown()
+    for end in range(CHUNK, len(text) + CHUNK, CHUNK):
+        html = renderer.render(text[:end])
+    return html
+
+
+def normalized(html: str) -> str:
+    return "".join(html.split())
+
+
+def main():
+    print(f"> Answer rendering (stream chunks of {CHUNK} bytes)")
+    print(f"{'size':>6} | {'per call':>9} {'cached':>9} | {'renders':>7} {'stream full':>12} {'incremental':>12}")
+    for size_kb in SIZES_KB:
+        text = synthetic_answer(size_kb)
+        per_call = best_of(lambda: convert(text))
+        render_markdown(text)
+        cached = best_of(lambda: render_markdown(text))
+
+        renders = -(-len(text) // CHUNK)
+        full = best_of(lambda: stream_full(text), runs=1)
+        incremental = best_of(lambda: stream_incremental(text), runs=1)
+        assert normalized(stream_incremental(text)) == normalized(convert(text)), "incremental render differs"
+
+        print(
+            f"{size_kb:>4}KB | {per_call * 1e3:>7.2f}ms {cached * 1e6:>7.1f}us "
+            f"| {renders:>7} {full:>11.2f}s {incremental:>11.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
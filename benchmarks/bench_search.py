@@ -0,0 +1,91 @@
+"""
+Benchmark the segment search index over data/samples.json scaled up synthetically.
+
+Each copy of a sample gets a new filename and a slightly varied vocabulary
+(every 7th word is suffixed with the copy number) so postings do not all line
+up. Reports build, persist/load, incremental update and query latency.
+
+Usage:
+    python -m benchmarks.bench_search [copies]
+"""
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SESSION_SECRET", "benchmark")
+
+from lib.search_index import SearchIndex
+
+COPIES = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+QUERIES = [
+    "urban garden foundation",
+    "homelessness social welfare",
+    "community funding volunteers",
+    "environmental education children",
+    "city council project",
+]
+
+
+def _vary(text: str, copy: int) -> str:
+    words = text.split(" ")
+    return " ".join(w + str(copy % 50) if i % 7 == 6 else w for i, w in enumerate(words))
+
+
+def synthetic_corpus(copies: int) -> dict[str, str]:
+    with open("data/samples.json", "r") as f:
+        samples = {doc["FILE"][:-4]: doc.get("TRANSCRIPT", "") for doc in json.load(f)}
+    return {
+        f"{stem}-{copy}": _vary(text, copy)
+        for copy in range(copies)
+        for stem, text in samples.items()
+    }
+
+
+def main():
+    corpus = synthetic_corpus(COPIES)
+    corpus_mb = sum(len(t) for t in corpus.values()) / 1e6
+
+    index = SearchIndex()
+    start = time.perf_counter()
+    index.update(corpus)
+    build = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index.pkl")
+        start = time.perf_counter()
+        index.save(path)
+        save = time.perf_counter() - start
+        size_mb = os.path.getsize(path) / 1e6
+        start = time.perf_counter()
+        index = SearchIndex.load(path)
+        load = time.perf_counter() - start
+
+    # Incremental refresh: one document changed, one removed
+    changed = dict(corpus)
+    first, second = list(changed)[:2]
+    changed[first] += " [99:00:00 - 99:00:10] Editor : appended segment"
+    del changed[second]
+    start = time.perf_counter()
+    index.update(changed)
+    incremental = time.perf_counter() - start
+
+    latencies = []
+    for _ in range(20):
+        for query in QUERIES:
+            start = time.perf_counter()
+            index.search(query, limit=20)
+            latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    print(f"> Search index ({len(corpus)} transcripts, {corpus_mb:.1f} MB, {len(index)} segments, {len(index.terms)} terms)")
+    print(f"Full build:          {build:.2f}s")
+    print(f"Save / load:         {save:.2f}s / {load:.2f}s ({size_mb:.1f} MB on disk)")
+    print(f"Incremental update:  {incremental * 1000:.1f}ms (1 changed, 1 removed)")
+    print(f"Query p50 / p95:     {statistics.median(latencies):.2f}ms / {latencies[int(len(latencies) * 0.95)]:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
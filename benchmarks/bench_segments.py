@@ -0,0 +1,62 @@
+"""
+Memory held per cached transcript: list of segment dicts vs. SegmentTable.
+
+For each sample transcript and a few synthetic long interviews, measures with
+tracemalloc the memory retained by the parsed form (the transcript text itself
+is excluded), and compares it with the size the transcript cache accounts for.
+
+Usage:
+    python -m benchmarks.bench_segments
+"""
+import gc
+import json
+import os
+import tracemalloc
+
+os.environ.setdefault("SESSION_SECRET", "benchmark")
+
+from lib.sources import parse_transcript, get_unique_speakers
+from lib.transcript_parser import parse_columnar
+from benchmarks.bench_parser import synthetic_transcript
+
+
+def retained(build, text):
+    """Bytes still allocated by `build(text)`'s result once it returns."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(text)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def dict_payload(text):
+    segments = parse_transcript(text)
+    return segments, get_unique_speakers(segments)
+
+
+def main():
+    with open("data/samples.json", "r") as f:
+        samples = [(doc["FILE"], doc.get("TRANSCRIPT", "")) for doc in json.load(f)]
+    transcripts = samples + [(f"synthetic {mb} MB", synthetic_transcript(mb)) for mb in (0.5, 2, 8)]
+
+    print("> Retained memory per parsed transcript (tracemalloc)")
+    print(f"{'transcript':<36} {'segments':>8} {'dicts':>10} {'table':>10} {'saved':>7} {'accounted':>10}")
+    total_dicts = total_table = 0
+    for name, text in transcripts:
+        (segments, _), dicts_bytes = retained(dict_payload, text)
+        table, table_bytes = retained(parse_columnar, text)
+        assert len(table) == len(segments)
+        total_dicts += dicts_bytes
+        total_table += table_bytes
+        print(
+            f"{name[:36]:<36} {len(table):>8} {dicts_bytes / 1e3:>8.0f}KB {table_bytes / 1e3:>8.0f}KB "
+            f"{1 - table_bytes / dicts_bytes:>6.0%} {table.nbytes() / 1e3:>8.0f}KB"
+        )
+        del segments, table
+    print(f"{'total':<36} {'':>8} {total_dicts / 1e6:>8.1f}MB {total_table / 1e6:>8.1f}MB {1 - total_table / total_dicts:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+TranscriptStore benchmark: the same workload against a backend.
+
+Writes N transcripts (the samples repeated under new names, stems prefixed
+with "bench-"), then times metadata listing, navigation, content for a
+5-transcript selection, a reader page and keyword search, and removes them.
+The mongo backend uses MONGODB_URI, so point it at a scratch server.
+
+Usage:
+    python -m benchmarks.bench_store [sqlite|mongo] [transcripts]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("SESSION_SECRET", "benchmark")
+
+from lib.local_corpus import get_local_corpus
+from lib.sources import file_stem
+from benchmarks.store_contract import make_store
+
+BACKEND = sys.argv[1] if len(sys.argv) > 1 else "sqlite"
+TRANSCRIPTS = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+QUERIES = ["urban farm", "community garden", "food", "volunteers project", "climate change", "market"]
+RUNS = 20
+
+
+def bench_documents(n: int) -> list[dict]:
+    samples = [doc for doc in get_local_corpus().documents if doc.get("TRANSCRIPT")]
+    return [
+        {**samples[i % len(samples)], "FILE": f"bench-{i:05d}_{samples[i % len(samples)]['FILE']}"}
+        for i in range(n)
+    ]
+
+
+async def timed(fn, runs: int = RUNS) -> float:
+    """Median milliseconds of `await fn()`."""
+    elapsed = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await fn()
+        elapsed.append((time.perf_counter() - start) * 1000)
+    return statistics.median(elapsed)
+
+
+async def run(store):
+    docs = bench_documents(TRANSCRIPTS)
+    stems = [file_stem(doc["FILE"]) for doc in docs]
+    await store.prepare()
+
+    start = time.perf_counter()
+    await store.put_transcripts(docs)
+    print(f"put {TRANSCRIPTS} transcripts:      {time.perf_counter() - start:8.2f} s")
+
+    selection = stems[:: max(1, TRANSCRIPTS // 5)][:5]
+    await store.search(QUERIES[0])  # builds the in-memory index on the mongo backend
+    query = iter(QUERIES * RUNS)
+    for label, fn in (
+        ("list_metadata", lambda: store.list_metadata()),
+        ("navigation", lambda: store.navigation()),
+        ("get_contents (5)", lambda: store.get_contents(selection)),
+        ("get_segments (200)", lambda: store.get_segments(stems[1], 0, 200)),
+        ("search", lambda: store.search(next(query), limit=20)),
+    ):
+        print(f"{label + ':':<30} {await timed(fn):8.2f} ms")
+
+    await store.delete_transcripts(stems)
+
+
+def main():
+    store = make_store(BACKEND)
+    print(f"> {type(store).__name__} ({TRANSCRIPTS} transcripts, median of {RUNS})")
+    asyncio.run(run(store))
+
+
+if __name__ == "__main__":
+    main()
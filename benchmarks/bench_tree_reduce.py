@@ -0,0 +1,50 @@
+"""
+Tree reduce against a fake LLM that records prompt sizes.
+
+Reduces many long map responses under a deliberately small context window and
+checks that no reduce prompt (plus its completion budget) exceeds it, compared
+with the single flat prompt that would have been sent before.
+
+Usage:
+    python -m benchmarks.bench_tree_reduce [responses] [context_tokens]
+"""
+import asyncio
+import os
+import sys
+import time
+
+from benchmarks.fake_llm import FakeLLMServer
+
+RESPONSES = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+CONTEXT_TOKENS = int(sys.argv[2]) if len(sys.argv) > 2 else 8192
+REPLY = " ".join(f"finding{i}" for i in range(300))
+
+os.environ.setdefault("SESSION_SECRET", "benchmark")
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+
+def main():
+    with FakeLLMServer(delay=0.2, reply=REPLY) as server:
+        os.environ["GROQ_BASE_URL"] = server.base_url
+        from lib.discussion import reduce_all, _reduce_messages, REDUCE_MAX_TOKENS
+        from lib.tokens import estimate_tokens
+
+        question = "What do the projects have in common?"
+        responses = [f"Response about document {i}. " + "Detail " * 600 for i in range(RESPONSES)]
+        flat = sum(estimate_tokens(m["content"]) for m in _reduce_messages(question, responses))
+
+        start = time.perf_counter()
+        asyncio.run(reduce_all(question, responses, context_tokens=CONTEXT_TOKENS))
+        elapsed = time.perf_counter() - start
+        prompts = [estimate_tokens("x" * size) for size in server.prompt_sizes()]
+
+    limit = CONTEXT_TOKENS - REDUCE_MAX_TOKENS
+    print(f"> Tree reduce ({RESPONSES} responses, context {CONTEXT_TOKENS} tokens)")
+    print(f"Flat prompt:         ~{flat} tokens")
+    print(f"Reduce calls:        {len(prompts)} in {elapsed:.2f}s")
+    print(f"Largest prompt:      ~{max(prompts)} tokens (limit {limit})")
+    sys.exit(0 if max(prompts) <= limit else 1)
+
+
+if __name__ == "__main__":
+    main()
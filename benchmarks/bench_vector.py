@@ -0,0 +1,79 @@
+"""
+Recall vs. latency of the approximate (IVF) vector search against exact search.
+
+Part 1 embeds the chunks of data/samples.json scaled up synthetically to report
+embedding throughput. Part 2 searches a clustered synthetic matrix of N rows
+(default 200k, above VECTOR_ANN_THRESHOLD) and compares IVF top-10 results
+for several `nprobe` values with the exact NumPy scan.
+
+Usage:
+    python -m benchmarks.bench_vector [rows]
+"""
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+os.environ.setdefault("SESSION_SECRET", "benchmark")
+
+from benchmarks.bench_search import synthetic_corpus
+from lib.vector_index import VectorIndex, top_k, _normalize
+from config import EMBEDDING_DIM
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+QUERIES = 200
+K = 10
+
+
+def embedding_throughput():
+    index = VectorIndex()
+    corpus = synthetic_corpus(10)
+    start = time.perf_counter()
+    index.update(corpus)
+    elapsed = time.perf_counter() - start
+    print(f"> Embedding ({len(corpus)} transcripts, {len(index)} chunks)")
+    print(f"Build:               {elapsed:.2f}s ({len(index) / elapsed:.0f} chunks/s)")
+    print()
+
+
+def clustered_matrix(rows: int, clusters: int = 256, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, EMBEDDING_DIM)).astype(np.float32)
+    labels = rng.integers(0, clusters, rows)
+    noise = rng.standard_normal((rows, EMBEDDING_DIM)).astype(np.float32)
+    return _normalize(centers[labels] + 0.8 * noise)
+
+
+def ann_recall():
+    rng = np.random.default_rng(1)
+    matrix = clustered_matrix(ROWS)
+    index = VectorIndex(matrix, [{"row": i} for i in range(ROWS)], {})
+    queries = _normalize(matrix[rng.choice(ROWS, QUERIES)] + 0.3 * rng.standard_normal((QUERIES, EMBEDDING_DIM)).astype(np.float32))
+
+    start = time.perf_counter()
+    index.build_ivf()
+    train = time.perf_counter() - start
+
+    exact, exact_ms = [], []
+    for q in queries:
+        start = time.perf_counter()
+        exact.append(set(top_k(matrix @ q, K).tolist()))
+        exact_ms.append((time.perf_counter() - start) * 1000)
+
+    print(f"> Vector search ({ROWS} rows x {EMBEDDING_DIM} dims, top-{K}, IVF trained in {train:.1f}s)")
+    print(f"exact        recall 1.000   p50 {statistics.median(exact_ms):6.2f}ms")
+    for nprobe in (1, 4, 8, 16, 32):
+        hits, latencies = 0, []
+        for q, truth in zip(queries, exact):
+            start = time.perf_counter()
+            rows, _ = index._ivf_search(q, K, nprobe)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += len(truth & set(rows.tolist()))
+        print(f"ivf nprobe={nprobe:<3} recall {hits / (K * QUERIES):.3f}   p50 {statistics.median(latencies):6.2f}ms")
+
+
+if __name__ == "__main__":
+    embedding_throughput()
+    ann_recall()
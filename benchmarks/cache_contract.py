@@ -0,0 +1,42 @@
+"""
+Contract checks for `lib.cache.LRUCache`.
+
+Entry and byte budgets evict the least recently used entries, TTLs expire
+entries, and a value too large for the byte budget is not stored and does not
+leave the key's previous value behind.
+
+Usage:
+    python -m benchmarks.cache_contract
+"""
+import time
+
+from lib.cache import LRUCache
+
+
+def main():
+    cache = LRUCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "b" not in cache and cache.get("a") == 1 and cache.get("c") == 3, "entry budget evicts the least recently used"
+
+    cache = LRUCache(10, max_bytes=10, sizeof=len)
+    cache.set("a", "x" * 6)
+    cache.set("b", "x" * 6)
+    assert "a" not in cache and cache.get("b") == "x" * 6, "byte budget evicts the least recently used"
+
+    cache.set("b", "x" * 11)
+    assert "b" not in cache and cache.get("b") is None, "an oversized update drops the previous value"
+    assert cache.stats()["bytes"] == 0
+
+    cache = LRUCache(10, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None and cache.expirations == 1, "entries expire after their TTL"
+
+    print("> LRUCache: contract passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Local fake of the Groq chat completions API for benchmarks.
+
+Answers every completion after a fixed delay plus a per-word generation delay
+(non-blocking), streams word by word when `stream=True` is requested, and
+records the prompt of each request and the peak of concurrent requests, so
+benchmarks can measure concurrency and prompt sizes without calling the real provider.
+
+Usage:
+    with FakeLLMServer(delay=0.5) as server:
+        os.environ["GROQ_BASE_URL"] = server.base_url
+"""
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+
+class ThreadedServer:
+    """Run an ASGI app with uvicorn in a background thread on a free local port."""
+
+    def __init__(self, app):
+        self.app = app
+        self.port = _free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        config = uvicorn.Config(self.app, host="127.0.0.1", port=self.port, log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+class FakeLLMServer(ThreadedServer):
+    """Threaded uvicorn server serving /openai/v1/chat/completions."""
+
+    def __init__(self, delay: float = 0.5, reply: str = "Fake answer.", token_delay: float = 0.0):
+        self.delay = delay
+        self.reply = reply
+        self.token_delay = token_delay
+        self.requests: list[dict] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        super().__init__(Starlette(routes=[Route("/openai/v1/chat/completions", self._completions, methods=["POST"])]))
+
+    async def _completions(self, request):
+        body = await request.json()
+        self.requests.append(body)
+        if body.get("stream"):
+            return StreamingResponse(self._stream(body), media_type="text/event-stream")
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay + self.token_delay * len(self.reply.split(" ")))
+        finally:
+            self.in_flight -= 1
+        return JSONResponse({
+            "id": f"fake-{len(self.requests)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self.reply},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        })
+
+    async def _stream(self, body):
+        await asyncio.sleep(self.delay)
+        words = self.reply.split(" ")
+        for i, word in enumerate(words):
+            chunk = {
+                "id": f"fake-{len(self.requests)}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": word if i == 0 else " " + word},
+                    "finish_reason": "stop" if i == len(words) - 1 else None,
+                }],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+            await asyncio.sleep(self.token_delay)
+        yield "data: [DONE]\n\n"
+
+    def prompt_sizes(self) -> list[int]:
+        """Total characters of message content sent in each recorded request."""
+        return [sum(len(m.get("content") or "") for m in r.get("messages", [])) for r in self.requests]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
@@ -0,0 +1,135 @@
+"""
+Load test: N concurrent /map requests against a fake LLM.
+
+With an async LLM client the completions overlap on the event loop, so N
+concurrent requests should finish in roughly the time of one. Transcript
+content is served from data/samples.json so only the LLM layer is measured.
+
+Also counts store queries for one question fanned out over every sample
+document, with and without a /rag-job prefetch (opened by a signed-in session),
+and checks that another session cannot read that job.
+
+Usage:
+    python -m benchmarks.load_map [N] [delay_seconds]
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+import httpx
+from cryptography.fernet import Fernet
+
+from benchmarks.fake_llm import FakeLLMServer
+
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+DELAY = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+
+os.environ.setdefault("SESSION_SECRET", "benchmark")
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ.setdefault("MAGIC_SECRET", Fernet.generate_key().decode())
+
+with open("data/samples.json", "r") as f:
+    SAMPLES = {doc["FILE"][:-4]: doc.get("TRANSCRIPT", "") for doc in json.load(f)}
+
+
+FETCHES = []
+
+
+async def _samples_content(filenames):
+    """Stand-in for the database so the benchmark isolates the LLM layer."""
+    FETCHES.append(len(filenames))
+    return {fn: SAMPLES[fn] for fn in filenames if fn in SAMPLES}
+
+
+async def _no_parsed(filenames):
+    """No stored segments: map calls parse the sample text."""
+    FETCHES.append(len(filenames))
+    return {}
+
+
+async def _sign_in(client, email="benchmark@paris-iea.fr"):
+    """Sign the client's session in with a magic link token (minted here, not emailed)."""
+    from lib.auth import get_fernet
+    token = get_fernet().encrypt(json.dumps({"email": email, "ts": time.time()}).encode()).decode()
+    await client.get("/auth", params={"token": token})
+
+
+async def _post_map(client, filename, job_id=None, question=0):
+    # Distinct questions, so the map response cache does not answer the load test
+    data = {"query": f"What is this project about? ({question})", "filename": filename}
+    if job_id:
+        data["job_id"] = job_id
+    response = await client.post("/map", data=data)
+    return response.json()
+
+
+async def count_fetches(app, filenames):
+    """
+    Store queries for one question over `filenames`: per-document /map calls,
+    /map calls with a /rag-job, and with that job presented by another session.
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with (
+        httpx.AsyncClient(transport=transport, base_url="http://test") as client,
+        httpx.AsyncClient(transport=transport, base_url="http://test") as other,
+    ):
+        await _sign_in(client)
+        FETCHES.clear()
+        await asyncio.gather(*[_post_map(client, fn) for fn in filenames])
+        without_job = len(FETCHES)
+
+        FETCHES.clear()
+        job = (await client.post("/rag-job", data={"selected": ",".join(filenames)})).json()
+        await asyncio.gather(*[_post_map(client, fn, job["job_id"]) for fn in filenames])
+        with_job = len(FETCHES)
+
+        FETCHES.clear()
+        await asyncio.gather(*[_post_map(other, fn, job["job_id"]) for fn in filenames])
+        other_session = len(FETCHES)
+        unauthenticated = (await other.post("/rag-job", data={"selected": filenames[0]})).status_code
+    return without_job, with_job, other_session, unauthenticated
+
+
+async def run(app, filename):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        start = time.perf_counter()
+        await _post_map(client, filename, question=-1)
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*[_post_map(client, filename, question=i) for i in range(N)])
+        concurrent = time.perf_counter() - start
+
+    errors = [r for r in results if "error" in r]
+    return single, concurrent, errors
+
+
+def main():
+    with FakeLLMServer(delay=DELAY) as server:
+        os.environ["GROQ_BASE_URL"] = server.base_url
+        import main as app_module
+
+        app_module.get_store().get_contents = _samples_content
+        app_module.get_store().get_parsed_transcripts = _no_parsed
+        filename = next(iter(SAMPLES))
+        single, concurrent, errors = asyncio.run(run(app_module.app, filename))
+        without_job, with_job, other_session, unauthenticated = asyncio.run(count_fetches(app_module.app, list(SAMPLES)))
+
+    print(f"> /map load test ({N} concurrent, LLM delay {DELAY}s)")
+    print(f"Single request:      {single:.2f}s")
+    print(f"{N} concurrent:      {concurrent:.2f}s")
+    print(f"Ratio:               {concurrent / single:.2f}x")
+    print(f"Errors:              {len(errors)}")
+    print(f"Store queries per question over {len(SAMPLES)} documents: {without_job} without /rag-job, {with_job} with")
+    print(f"Job presented by another session: {other_session} queries (job not shared); /rag-job signed out: {unauthenticated}")
+    if errors:
+        print(errors[0])
+    shared = other_session == 0 or unauthenticated != 401
+    sys.exit(0 if not errors and concurrent < single * 2 and with_job < without_job and not shared else 1)
+
+
+if __name__ == "__main__":
+    main()
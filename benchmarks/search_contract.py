@@ -0,0 +1,44 @@
+"""
+Contract check for /search: keyword and semantic results are the same record.
+
+Runs both modes through the app, in-process, over a temporary SQLite store
+seeded from the local samples, and checks that every result of either mode
+has exactly the filename, start_ms, end_ms, speaker, text and score keys, with
+integer millisecond offsets.
+
+Usage:
+    python -m benchmarks.search_contract
+"""
+import os
+import tempfile
+
+os.environ.setdefault("SESSION_SECRET", "benchmark")
+os.environ["LAZY_STARTUP"] = "1"
+os.environ["TRANSCRIPT_STORE"] = "sqlite"
+os.environ["SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(), "search.db")
+os.environ["VECTOR_INDEX_PATH"] = os.path.join(tempfile.mkdtemp(), "vector_index")
+
+from starlette.testclient import TestClient
+
+import main as app_main
+
+RECORD = {"filename", "start_ms", "end_ms", "speaker", "text", "score"}
+
+
+def main():
+    client = TestClient(app_main.app)
+    keys = {}
+    for mode in ("keyword", "semantic"):
+        results = client.get("/search", params={"q": "education", "mode": mode}).json()["results"]
+        assert results, f"{mode} search finds the samples"
+        for result in results:
+            assert set(result) == RECORD, f"{mode} result keys: {sorted(result)}"
+            assert isinstance(result["start_ms"], int) and isinstance(result["end_ms"], int)
+            assert result["start_ms"] <= result["end_ms"]
+        keys[mode] = set(results[0])
+    assert keys["keyword"] == keys["semantic"], "both modes return the same record"
+    print(f"> /search: keyword and semantic results share {sorted(RECORD)}")
+
+
+if __name__ == "__main__":
+    main()
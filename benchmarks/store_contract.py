@@ -0,0 +1,110 @@
+"""
+Contract checks every TranscriptStore backend must pass.
+
+Writes a few synthetic transcripts (stems prefixed with "contract-"), checks
+metadata, navigation, content, parsed segments, segment ranges, search, idempotent and changed
+writes, and deletion, then removes them. The sqlite backend runs on a
+temporary database; the mongo backend uses MONGODB_URI, so point it at a
+scratch server.
+
+Usage:
+    python -m benchmarks.store_contract [sqlite|mongo]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+os.environ.setdefault("SESSION_SECRET", "benchmark")
+
+from lib.sources import content_hash
+from lib.transcript_parser import parse_columnar
+
+BACKEND = sys.argv[1] if len(sys.argv) > 1 else "sqlite"
+
+
+def make_store(backend: str):
+    if backend == "sqlite":
+        from lib.sqlite_store import SQLiteTranscriptStore
+        return SQLiteTranscriptStore(os.path.join(tempfile.mkdtemp(), "contract.db"))
+    from lib.mongo_store import MongoTranscriptStore
+    return MongoTranscriptStore()
+
+
+def document(i: int, word: str) -> dict:
+    transcript = "\n".join(
+        f"[00:00:{s * 10:02d} - 00:00:{s * 10 + 9:02d}] Speaker {s % 2} : segment {s} of transcript {i} {word if s == 3 else ''}"
+        for s in range(5)
+    )
+    return {
+        "FILE": f"contract-{i}_interview_audio.m4a.csv",
+        "COUNTRY": "Contractland",
+        "PROJECT": "CT-001",
+        "NAME": "Contract project",
+        "DESCRIPTION": "Synthetic transcript for the store contract",
+        "TRANSCRIPT": transcript,
+    }
+
+
+async def check(store):
+    docs = [document(i, f"zebraword{i}") for i in range(3)]
+    stems = [f"contract-{i}_interview_audio.m4a" for i in range(3)]
+    await store.prepare()
+    await store.delete_transcripts(stems)
+
+    assert await store.put_transcripts(docs) == 3, "put writes new transcripts"
+    assert await store.put_transcripts(docs) == 0, "put skips unchanged transcripts"
+
+    metadata = {doc["FILE"]: doc for doc in await store.list_metadata()}
+    assert all(doc["FILE"] in metadata for doc in docs), "metadata lists every transcript"
+    assert all("TRANSCRIPT" not in metadata[doc["FILE"]] for doc in docs), "metadata excludes TRANSCRIPT"
+
+    tree, count, version = await store.navigation()
+    assert tree["Contractland"]["CT-001 - Contract project"] == stems, "navigation groups and sorts records"
+    assert count >= 3
+
+    contents = await store.get_contents([stems[0], "contract-missing"])
+    assert contents == {stems[0]: docs[0]["TRANSCRIPT"]}, "content by stem, missing stems omitted"
+    hashes = await store.content_hashes()
+    assert all(hashes[stem] == content_hash(doc["TRANSCRIPT"]) for stem, doc in zip(stems, docs)), "content hashes list every transcript"
+    parsed = await store.get_parsed_transcripts([stems[0], "contract-missing"])
+    assert list(parsed) == [stems[0]], "parsed transcripts by stem, missing stems omitted"
+    assert [(s.start, s.end, s.speaker, s.text) for s in parsed[stems[0]]["segments"]] == [
+        (s.start, s.end, s.speaker, s.text) for s in parse_columnar(docs[0]["TRANSCRIPT"])
+    ], "parsed transcripts hold every segment"
+    assert parsed[stems[0]]["speakers"] == ["Speaker 0", "Speaker 1"] and parsed[stems[0]]["content_hash"] == hashes[stems[0]]
+
+    page = await store.get_segments(stems[1], 1, 2)
+    expected = parse_columnar(docs[1]["TRANSCRIPT"])[1:3]
+    assert page["total"] == 5 and page["speakers"] == ["Speaker 0", "Speaker 1"]
+    assert [(s.start, s.end, s.speaker, s.text) for s in page["segments"]] == [(s.start, s.end, s.speaker, s.text) for s in expected]
+    assert (await store.get_segments(stems[1], 10, 5))["segments"] == [], "range past the end is empty"
+    assert page["content_hash"] == content_hash(docs[1]["TRANSCRIPT"]), "pages carry the transcript's content hash"
+
+    results = await store.search("zebraword2", limit=5)
+    assert results and results[0]["filename"] == stems[2] and results[0]["start_ms"] == 30_000, "search finds the segment"
+    assert set(results[0]) == {"filename", "start_ms", "end_ms", "speaker", "text", "score"}
+
+    changed = document(2, "quaggaword")
+    assert await store.put_transcripts([changed]) == 1, "put rewrites changed transcripts"
+    assert (await store.get_contents([stems[2]]))[stems[2]] == changed["TRANSCRIPT"]
+    assert (await store.get_segments(stems[2], 0, 1))["content_hash"] == content_hash(changed["TRANSCRIPT"])
+    assert (await store.content_hashes())[stems[2]] == content_hash(changed["TRANSCRIPT"])
+    assert not any(r["filename"] == stems[2] for r in await store.search("zebraword2")), "old text is no longer found"
+    assert (await store.search("quaggaword"))[0]["filename"] == stems[2], "new text is found"
+    assert (await store.navigation())[2] != version, "navigation version changes with the data"
+
+    assert await store.delete_transcripts(stems) == 3
+    assert await store.get_contents(stems) == {}
+    assert not set(stems) & set(await store.content_hashes())
+    assert not await store.search("quaggaword")
+
+
+def main():
+    store = make_store(BACKEND)
+    asyncio.run(check(store))
+    print(f"> {type(store).__name__}: contract passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Time-to-first-byte of the streamed RAG answer (/rag-stream) vs. the blocking /rag.
+
+The fake LLM answers after a fixed delay and then produces a long reply word by
+word, like a model generating tokens. Transcript content is served from
+data/samples.json so only the orchestration and LLM layers are measured.
+
+Usage:
+    python -m benchmarks.stream_ttfb [documents]
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+import httpx
+
+from benchmarks.fake_llm import FakeLLMServer, ThreadedServer
+
+DOCUMENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+REPLY = " ".join(["<think>Weighing the responses.</think>"] + [f"word{i}" for i in range(200)])
+
+os.environ.setdefault("SESSION_SECRET", "benchmark")
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+with open("data/samples.json", "r") as f:
+    SAMPLES = {doc["FILE"][:-4]: doc.get("TRANSCRIPT", "") for doc in json.load(f)}
+
+
+async def _samples_content(database, collection, filenames):
+    """Stand-in for the database so the benchmark isolates the LLM layer."""
+    return {fn: SAMPLES[fn] for fn in filenames if fn in SAMPLES}
+
+
+async def run(base_url):
+    selected = ",".join(list(SAMPLES)[:DOCUMENTS])
+    data = {"query": "What do the projects have in common?", "selected": selected}
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        start = time.perf_counter()
+        await client.post("/rag", data=data)
+        blocking = time.perf_counter() - start
+
+        first_byte = first_answer = None
+        start = time.perf_counter()
+        # A different question so map responses cached by /rag are not reused
+        data["query"] += " Answer briefly."
+        async with client.stream("POST", "/rag-stream", data=data) as response:
+            async for line in response.aiter_lines():
+                if first_byte is None:
+                    first_byte = time.perf_counter() - start
+                if first_answer is None and line.startswith("event: answer"):
+                    first_answer = time.perf_counter() - start
+        streamed = time.perf_counter() - start
+
+    return blocking, first_byte, first_answer, streamed
+
+
+def main():
+    with FakeLLMServer(delay=0.3, reply=REPLY, token_delay=0.01) as server:
+        os.environ["GROQ_BASE_URL"] = server.base_url
+        import main as app_module
+
+        app_module.get_transcripts_content_async = _samples_content
+        # A real socket: in-process ASGI transports buffer the whole response
+        with ThreadedServer(app_module.app) as app_server:
+            blocking, first_byte, first_answer, streamed = asyncio.run(run(app_server.base_url))
+
+    print(f"> RAG answer latency ({min(DOCUMENTS, len(SAMPLES))} documents)")
+    print(f"/rag full response:         {blocking:.2f}s")
+    print(f"/rag-stream first byte:     {first_byte:.2f}s")
+    print(f"/rag-stream first answer:   {first_answer:.2f}s")
+    print(f"/rag-stream complete:       {streamed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
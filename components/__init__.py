@@ -5,6 +5,10 @@ from components.transcripts import (
     TranscriptRow,
     ProjectRow,
     CountryRow,
+    LazyProjectRow,
+    LazyCountryRow,
+    CountryProjects,
+    ProjectRecords,
     TranscriptsSkeleton,
     TranscriptsCard,
     TranscriptSegmentRow,
@@ -18,6 +22,7 @@ from components.transcripts import (
 from components.discussion import (
     parse_thinking,
     render_response,
+    StreamingResponse,
     PromptForm,
     ProgressIndicator,
     RightPanelCard,
@@ -39,6 +44,10 @@ __all__ = [
     "TranscriptRow",
     "ProjectRow",
     "CountryRow",
+    "LazyProjectRow",
+    "LazyCountryRow",
+    "CountryProjects",
+    "ProjectRecords",
     "TranscriptsSkeleton",
     "TranscriptsCard",
     "TranscriptSegmentRow",
@@ -49,6 +58,7 @@ __all__ = [
     # Discussion
     "parse_thinking",
     "render_response",
+    "StreamingResponse",
     "PromptForm",
     "ProgressIndicator",
     "RightPanelCard",
@@ -1,23 +1,61 @@
 """Discussion and workspace UI components."""
-import re
-import markdown
 from fasthtml.common import *
 from monsterui.all import *
+from lib.rendering import IncrementalMarkdown, render_markdown
 from config import MODELS
 
 
-def parse_thinking(response: str):
-    """Parse <think> blocks from LLM response and return (thinking, answer) tuple."""
-    think_pattern = re.compile(r'<think>(.*?)</think>', re.DOTALL)
-    thinking_blocks = think_pattern.findall(response)
-    answer = think_pattern.sub('', response).strip()
-    thinking = '\n\n'.join(thinking_blocks).strip() if thinking_blocks else None
+def parse_thinking(response: str, partial: bool = False):
+    """
+    Parse <think> blocks from LLM response and return (thinking, answer) tuple.
+
+    With `partial=True` the response is still being streamed: an unclosed
+    <think> block counts as thinking so far, and a tag cut in half at the end
+    is held back until the next chunk completes it.
+    """
+    if partial:
+        tail = response[response.rfind("<"):] if "<" in response else ""
+        if tail and ("<think>".startswith(tail) or "</think>".startswith(tail)):
+            response = response[: -len(tail)]
+
+    # One scan over the tags; an unclosed block runs to the end of the response
+    thinking_blocks, answer_parts, pos = [], [], 0
+    while (start := response.find("<think>", pos)) != -1:
+        end = response.find("</think>", start + 7)
+        if end == -1 and not partial:
+            break  # not a thinking block, like the regex this replaces
+        answer_parts.append(response[pos:start])
+        thinking_blocks.append(response[start + 7: end if end != -1 else len(response)])
+        pos = end + 8 if end != -1 else len(response)
+    answer_parts.append(response[pos:])
+
+    answer = "".join(answer_parts).strip()
+    thinking = "\n\n".join(thinking_blocks).strip() if thinking_blocks else None
     return thinking, answer
 
 
-def render_response(response: str):
-    """Render LLM response with thinking blocks displayed separately."""
-    thinking, answer = parse_thinking(response)
+class StreamingResponse:
+    """
+    Renders a response as it streams: the thinking and the answer each keep an
+    `IncrementalMarkdown`, so a chunk only re-renders their unfinished tails.
+    """
+
+    def __init__(self):
+        self.thinking = IncrementalMarkdown()
+        self.answer = IncrementalMarkdown()
+
+    def render(self, response: str):
+        return render_response(response, partial=True, stream=self)
+
+
+def render_response(response: str, partial: bool = False, stream: StreamingResponse = None):
+    """
+    Render LLM response with thinking blocks displayed separately.
+
+    Complete responses go through the rendered-HTML cache; partial ones are
+    rendered incrementally when the caller passes its `StreamingResponse`.
+    """
+    thinking, answer = parse_thinking(response, partial=partial)
     elements = []
 
     if thinking:
@@ -25,16 +63,18 @@ def render_response(response: str):
             Details(
                 Summary("💭 Model Thinking", cls="thinking-summary"),
                 Div(
-                    NotStr(markdown.markdown(thinking, extensions=['fenced_code', 'tables'])),
+                    NotStr(stream.thinking.render(thinking) if stream else render_markdown(thinking)),
                     cls="thinking-content prose"
                 ),
-                cls="thinking-block"
+                cls="thinking-block",
+                # Keep the thinking visible while the model is still reasoning
+                open=partial and not answer,
             )
         )
 
     elements.append(
         Div(
-            NotStr(markdown.markdown(answer, extensions=['fenced_code', 'tables'])),
+            NotStr(stream.answer.render(answer) if stream else render_markdown(answer)),
             cls="prose max-w-none"
         )
     )
@@ -1,4 +1,6 @@
 """Transcript UI components."""
+from urllib.parse import urlencode
+
 from fasthtml.common import *
 from monsterui.all import *
 
@@ -49,6 +51,47 @@ def CountryRow(country: str, projects: dict):
     )
 
 
+def LazyContent(url: str):
+    """Placeholder fetched by HTMX the first time its accordion item is opened."""
+    return Div(hx_get=url, hx_trigger="intersect once", hx_swap="outerHTML")(
+        Div(cls="skeleton-bar", style="width: 60%;")
+    )
+
+
+def LazyProjectRow(country: str, project: str, count: int):
+    """Project accordion item whose transcript rows load when it is opened."""
+    return AccordionItem(
+        P(f"{project} ({count})"),
+        LazyContent("/load-transcripts-project?" + urlencode({"country": country, "project": project})),
+        title_cls="pt-2 pb-2",
+    )
+
+
+def LazyCountryRow(country: str, count: int):
+    """Country accordion item whose projects load when it is opened."""
+    return AccordionItem(
+        P(f"{country.title()} ({count})"),
+        LazyContent("/load-transcripts-country?" + urlencode({"country": country})),
+        title_cls="pt-2 pb-2",
+    )
+
+
+def CountryProjects(country: str, projects: dict):
+    """Fragment: the project items of one country (lazy navigation)."""
+    return Accordion(
+        *[LazyProjectRow(country, project, len(records)) for project, records in projects.items()],
+        multiple=True,
+        animation=True,
+        cls="pl-4",
+        id=country,
+    )
+
+
+def ProjectRecords(records: list):
+    """Fragment: the transcript rows of one project (lazy navigation)."""
+    return Div(*[TranscriptRow(record) for record in records])
+
+
 def TranscriptsSkeleton():
     """Loading skeleton shown while transcripts load from MongoDB."""
     return Div(
@@ -76,13 +119,16 @@ def TranscriptsSkeleton():
     )
 
 
-def TranscriptsCard(transcript_nav: dict, count: int):
-    """Render the full transcripts card with navigation."""
+def TranscriptsCard(transcript_nav: dict, count: int, lazy: bool = False):
+    """
+    Render the transcripts card with navigation.
+    With lazy=True only the country headers are rendered; projects and rows are HTMX fragments.
+    """
     return Div(id="transcripts-container", cls="h-full overflow-hidden border-r border-[hsl(var(--border))]")(
         Card(
             Accordion(
                 *[
-                    CountryRow(country, projects)
+                    LazyCountryRow(country, len(projects)) if lazy else CountryRow(country, projects)
                     for country, projects in transcript_nav.items()
                 ],
                 multiple=True,
@@ -95,13 +141,13 @@ def TranscriptsCard(transcript_nav: dict, count: int):
     )
 
 
-def TranscriptSegmentRow(segment: dict):
-    """Render a single transcript segment with speaker coloring."""
+def TranscriptSegmentRow(segment):
+    """Render a single transcript segment (a `lib.transcript_parser.Segment`) with speaker coloring."""
     return Div(cls="transcript-segment")(
-        Div(cls="segment-time")(segment["start_time"]),
+        Div(cls="segment-time")(segment.start_time),
         Div(cls="segment-body")(
-            Div(cls="segment-speaker text-xs font-light uppercase text-[hsl(var(--foreground))]")(segment["speaker"]),
-            Div(cls="segment-text")(segment["text"])
+            Div(cls="segment-speaker text-xs font-light uppercase text-[hsl(var(--foreground))]")(segment.speaker),
+            Div(cls="segment-text")(segment.text)
         )
     )
 
@@ -154,19 +200,15 @@ SPEAKER_COLORS = [
 ]
 
 
-def TranscriptViewer(metadata: dict, segments: list, speakers: list, offset: int, limit: int, filename: str):
-    """Full transcript viewer with header, legend, and content."""
-    total = len(segments)
-    chunk = segments[offset: offset + limit]
-    speaker_to_index = {s: i for i, s in enumerate(speakers)}
-
+def TranscriptViewer(metadata: dict, segments: list, speakers: list, offset: int, limit: int, filename: str, total: int):
+    """Full transcript viewer with header, legend, and content. `segments` is the page starting at `offset`."""
     return Div(cls="transcript-viewer")(
         Div(cls="transcript-header")(
             H4(metadata.get("NAME", "Transcript"), cls="mb-2"),
             Span(metadata.get("PROJECT", "-"), cls="text-[hsl(var(--muted-foreground))]"),
         ),
         Div(cls="transcript-content")(
-            *[TranscriptSegmentRow(seg) for seg in chunk],
+            *[TranscriptSegmentRow(seg) for seg in segments],
             TranscriptLoadMoreSentinel(filename, offset + limit, limit) if (offset + limit) < total else None,
         ),
     )
@@ -2,6 +2,7 @@
 Configuration for Socioscope application.
 """
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,11 +13,97 @@ if not SESSION_SECRET:
     raise ValueError("SESSION_SECRET env var not set - generate with: python -c \"import secrets; print(secrets.token_hex(32))\"")
 IS_PRODUCTION = os.getenv("VERCEL_ENV") == "production"
 
-# Database configuration
+# Local state (SQLite store, search and vector indexes) defaults to a per-user
+# directory under the temp dir, the only writable location on Vercel
+INDEX_DIR = os.path.join(tempfile.gettempdir(), f"socioscope-{os.getuid()}")
+
+# Database configuration: TRANSCRIPT_STORE is "mongo" (MONGODB_URI) or "sqlite"
+# (a local database at SQLITE_PATH, seeded from data/samples.json when empty)
+TRANSCRIPT_STORE = os.getenv("TRANSCRIPT_STORE", "mongo")
+SQLITE_PATH = os.getenv("SQLITE_PATH", os.path.join(INDEX_DIR, "socioscope.db"))
 DB_NAME = "socioscope_db"
 COLLECTION_NAME = "socioscope_documents"
+SEGMENTS_COLLECTION_NAME = "socioscope_segments"
 MAX_SESSION_AGE = 7 * 24 * 3600  # days x hours x minutes
 
+# RAG orchestration: max concurrent map calls per question, and how many map
+# responses are reduced together while the remaining maps are still running
+RAG_MAP_CONCURRENCY = int(os.getenv("RAG_MAP_CONCURRENCY", "8"))
+RAG_REDUCE_BATCH = int(os.getenv("RAG_REDUCE_BATCH", "10"))
+
+# Client-orchestrated RAG: transcripts prefetched by /rag-job for its /map
+# calls are kept RAG_JOB_TTL seconds, within a RAG_JOB_CACHE_MAX_BYTES memory budget
+RAG_JOB_TTL = int(os.getenv("RAG_JOB_TTL", "300"))
+RAG_JOB_CACHE_MAX_BYTES = int(os.getenv("RAG_JOB_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Cap on prompt + completion tokens per LLM request (0 = each model's context
+# window); documents larger than a map call allows are split into several calls
+MODEL_REQUEST_TOKEN_LIMIT = int(os.getenv("MODEL_REQUEST_TOKEN_LIMIT", "0"))
+
+# Retrieval: transcripts are split into segment-aligned chunks of about
+# RAG_CHUNK_CHARS characters and only the RAG_TOP_K best chunks per document
+# reach the map call (0 sends whole transcripts)
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "8"))
+RAG_CHUNK_CHARS = int(os.getenv("RAG_CHUNK_CHARS", "2000"))
+
+# Segment search index: persisted to SEARCH_INDEX_PATH and refreshed at most
+# every SEARCH_INDEX_REFRESH seconds
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH", os.path.join(INDEX_DIR, "search_index.pkl"))
+SEARCH_INDEX_REFRESH = int(os.getenv("SEARCH_INDEX_REFRESH", "300"))
+
+# Retrieval ranking for the map phase: "bm25" (keyword) or "vector" (embeddings)
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "bm25")
+
+# Vector index: EMBEDDING_FUNCTION is "hashing" (local feature hashing) or a
+# "module:function" taking a list of texts; above VECTOR_ANN_THRESHOLD chunks
+# /search switches from exact to approximate (IVF) search
+EMBEDDING_FUNCTION = os.getenv("EMBEDDING_FUNCTION", "hashing")
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "256"))
+VECTOR_INDEX_PATH = os.getenv("VECTOR_INDEX_PATH", os.path.join(INDEX_DIR, "vector_index"))
+VECTOR_ANN_THRESHOLD = int(os.getenv("VECTOR_ANN_THRESHOLD", "100000"))
+
+# Map response cache: in-memory LRU of MAP_CACHE_SIZE entries, optionally
+# backed by a MongoDB collection (MAP_CACHE_BACKEND=mongo); entries expire after MAP_CACHE_TTL seconds
+MAP_CACHE_SIZE = int(os.getenv("MAP_CACHE_SIZE", "512"))
+MAP_CACHE_TTL = int(os.getenv("MAP_CACHE_TTL", str(7 * 24 * 3600)))
+MAP_CACHE_BACKEND = os.getenv("MAP_CACHE_BACKEND", "memory")
+MAP_CACHE_COLLECTION = "map_cache"
+
+# Parsed transcript cache for the reader: memory budget in bytes and entry TTL in seconds
+TRANSCRIPT_CACHE_MAX_BYTES = int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+TRANSCRIPT_CACHE_TTL = int(os.getenv("TRANSCRIPT_CACHE_TTL", "600"))
+
+# Transcript navigation: with NAVIGATION_LAZY=1 /load-transcripts renders only
+# country headers and projects/rows load as HTMX fragments when opened
+NAVIGATION_LAZY = os.getenv("NAVIGATION_LAZY", "1") == "1"
+NAVIGATION_FRAGMENT_CACHE_SIZE = int(os.getenv("NAVIGATION_FRAGMENT_CACHE_SIZE", "1024"))
+
+# MongoDB connections (lib/db.py): pool bounds per client, timeouts in ms and
+# wire compressors, in order of preference (those whose packages are missing are skipped)
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "20"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "60000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "10000"))
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zstd,snappy,zlib")
+
+# Startup-optimized mode for serverless cold starts: with LAZY_STARTUP=1 the
+# app does no database work at startup (indexes come from the migrations and
+# ingestion CLIs); LLM, email and database clients are always created on first use
+LAZY_STARTUP = os.getenv("LAZY_STARTUP", "0") == "1"
+
+# HTTP compression: complete text responses of at least COMPRESSION_MIN_BYTES
+# are sent brotli (if installed) or gzip encoded; 0 disables compression
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+
+# Rendered model answers (markdown to HTML), cached by content hash:
+# at most RENDER_CACHE_SIZE entries within RENDER_CACHE_MAX_BYTES
+RENDER_CACHE_SIZE = int(os.getenv("RENDER_CACHE_SIZE", "256"))
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+DEFAULT_MODEL = "qwen/qwen3-32b"
 MODELS = [
     ("Qwen3-32B", "qwen/qwen3-32b"),
     ("Llama Guard 4-12B", "meta-llama/llama-guard-4-12b"),
@@ -0,0 +1,45 @@
+"""
+Fingerprinted static assets.
+
+The app's own JavaScript and CSS are registered once at import and served
+from `/static/<name>.<hash>.<ext>`. The URL changes whenever the content
+does, so the files can be cached for a year and pages only reference them
+instead of inlining them.
+"""
+import hashlib
+import os
+from dataclasses import dataclass
+
+from lib.http_cache import etag
+
+STATIC_PREFIX = "/static"
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    filename: str  # fingerprinted, e.g. app.3f2a9c1b0d4e.js
+    body: bytes
+    media_type: str
+    etag: str
+
+    @property
+    def url(self) -> str:
+        return f"{STATIC_PREFIX}/{self.filename}"
+
+
+_assets: dict[str, StaticAsset] = {}
+
+
+def register_asset(name: str, content: str, media_type: str) -> StaticAsset:
+    """Serve `content` under a fingerprinted version of `name` (e.g. app.js)."""
+    body = content.encode("utf-8")
+    stem, ext = os.path.splitext(name)
+    filename = f"{stem}.{hashlib.sha256(body).hexdigest()[:12]}{ext}"
+    asset = StaticAsset(filename, body, media_type, etag(body))
+    _assets[filename] = asset
+    return asset
+
+
+def get_asset(filename: str):
+    """Registered asset for a fingerprinted filename, or None."""
+    return _assets.get(filename)
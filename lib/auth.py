@@ -1,8 +1,6 @@
 import os
 import json
 import time
-import boto3
-from botocore.exceptions import ClientError
 from cryptography.fernet import Fernet, InvalidToken
 from dataclasses import dataclass
 
@@ -38,9 +36,25 @@ def get_fernet() -> Fernet:
     return _fernet
 
 
+# Lazy-loaded SES client (boto3 is only imported when a login email is sent)
+_ses_client = None
+
+
+def get_ses_client():
+    """Get SES client (lazy-loaded, reused across emails)."""
+    global _ses_client
+    if _ses_client is None:
+        import boto3
+
+        _ses_client = boto3.client("ses", region_name=SES_REGION)
+    return _ses_client
+
+
 def send_magic_link_email(email: str, magic_link: str) -> bool:
     """Send magic link via Amazon SES. Returns True on success."""
-    ses = boto3.client("ses", region_name=SES_REGION)
+    from botocore.exceptions import ClientError
+
+    ses = get_ses_client()
 
     subject = "Your Socioscope Login Link"
     body_text = f"""Hi,
@@ -0,0 +1,150 @@
+"""
+In-process caches with hit/miss counters.
+
+Every named cache registers itself so `cache_stats()` can report on all of
+them (exposed to signed-in users by the /cache-stats endpoint).
+"""
+import asyncio
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+_registry: dict[str, "LRUCache"] = {}
+
+
+class LRUCache:
+    """
+    O(1) least-recently-used cache bounded by entry count and optionally bytes, with optional TTL.
+
+    Safe to share between threads. `get_or_load` adds single-flight loading for
+    async callers: concurrent misses on one key share a single load.
+
+    Args:
+        max_entries: entries kept before the least recently used is evicted
+        ttl: seconds an entry stays valid, or None to keep it until evicted
+        name: registers the cache for `cache_stats()` when given
+        max_bytes: total size budget, measured with `sizeof`, or None for no budget
+        sizeof: size of a value in bytes (defaults to `sys.getsizeof`)
+    """
+
+    def __init__(self, max_entries: int, ttl: float = None, name: str = None, max_bytes: int = None, sizeof=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or sys.getsizeof
+        self._data = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._inflight: dict = {}  # key -> asyncio.Task loading it
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.shared_loads = 0
+        if name:
+            _registry[name] = self
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._live(key) is not None
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._data.move_to_end(key)
+            return entry[2]
+
+    def set(self, key, value):
+        size = self.sizeof(value) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            # Would evict everything else and still not fit; the old value is stale either way
+            with self._lock:
+                self._discard(key)
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._discard(key)
+            self._data[key] = (expires_at, size, value)
+            self._bytes += size
+            while len(self._data) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes):
+                _, (_, evicted_size, _) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._discard(key)
+        return default if entry is None else entry[2]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    async def get_or_load(self, key, loader):
+        """
+        Cached value for `key`, or the result of awaiting `loader()`.
+
+        Concurrent callers missing the same key await one shared load. None
+        results and exceptions are not cached.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.shared_loads += 1
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(loader())
+        self._inflight[key] = task
+        try:
+            value = await asyncio.shield(task)
+        finally:
+            self._inflight.pop(key, None)
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "shared_loads": self.shared_loads,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _live(self, key):
+        entry = self._data.get(key)
+        if entry is not None and entry[0] is not None and entry[0] < time.monotonic():
+            self._discard(key)
+            self.expirations += 1
+            return None
+        return entry
+
+    def _discard(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+        return entry
+
+
+def cache_stats() -> dict:
+    """Stats of every named cache."""
+    return {name: cache.stats() for name, cache in _registry.items()}
@@ -0,0 +1,119 @@
+"""
+Response compression middleware (brotli or gzip).
+
+Complete responses of a compressible type and at least COMPRESSION_MIN_BYTES
+are compressed with the best coding the client accepts: brotli when the
+optional `brotli` package is installed, otherwise gzip. Transcript pages and
+navigation fragments repeat the same markup for every row, so they compress
+very well. Streamed responses (server-sent events) pass through untouched,
+so each event still reaches the client as soon as it is sent.
+
+The ETag of a compressed response gets the coding appended (see
+`lib.http_cache.encoded_etag`), keeping strong validators distinct per
+representation.
+"""
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from lib.http_cache import ENCODINGS, encoded_etag
+from config import COMPRESSION_MIN_BYTES
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # fast enough per request, still well ahead of gzip on HTML
+
+_COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "image/svg+xml")
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def accepted_encoding(accept_encoding: str):
+    """Best coding this server supports among those in an Accept-Encoding header, or None."""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    for encoding in ENCODINGS:
+        if encoding == "br" and brotli is None:
+            continue
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing complete responses above `minimum_size` bytes (0 disables it)."""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.minimum_size:
+            await self.app(scope, receive, send)
+            return
+        encoding = accepted_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        await self.app(scope, receive, _CompressingSend(send, encoding, self.minimum_size))
+
+
+class _CompressingSend:
+    """Holds the response start until the first body message shows whether the body is complete."""
+
+    def __init__(self, send, encoding, minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start = None
+        self.passthrough = False
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough or self.start is None:
+            await self.send(message)
+            return
+
+        start, self.start = self.start, None
+        body = message.get("body", b"")
+        if message.get("more_body", False):
+            # Streaming response: send as is
+            self.passthrough = True
+            await self.send(start)
+            await self.send(message)
+            return
+
+        headers = MutableHeaders(scope=start)
+        media_type = headers.get("content-type", "")
+        if (
+            len(body) >= self.minimum_size
+            and "content-encoding" not in headers
+            and media_type.startswith(_COMPRESSIBLE_TYPES)
+            and not media_type.startswith("text/event-stream")
+        ):
+            headers.add_vary_header("Accept-Encoding")
+            if self.encoding:
+                body = _compress(body, self.encoding)
+                headers["Content-Encoding"] = self.encoding
+                headers["Content-Length"] = str(len(body))
+                tag = headers.get("etag")
+                if tag:
+                    headers["ETag"] = encoded_etag(tag, self.encoding)
+                message = {**message, "body": body}
+        await self.send(start)
+        await self.send(message)
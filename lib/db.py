@@ -0,0 +1,193 @@
+"""
+Managed MongoDB connections.
+
+Every client is built from the same options: bounded connection pools,
+server selection/connect/socket timeouts (an unreachable database fails
+within seconds and the callers fall back to the local samples, instead of
+hanging for the driver's 30 s default), and wire compression for the large
+TRANSCRIPT payloads. zstd and snappy are used when their packages are
+installed, zlib otherwise.
+
+Motor clients are bound to the event loop they first run on, so there is one
+per loop. A new loop (a test client, a worker restart) gets its own client,
+and clients of closed loops are closed. Synchronous code (CLIs, the
+`load_transcripts` fallback) shares one thread-safe `MongoClient`.
+
+A pool listener counts connections and check-outs across all clients, for
+`pool_stats()` (exposed to signed-in users by the /db-stats endpoint).
+"""
+import asyncio
+import importlib.util
+import os
+import threading
+
+from config import (
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+    MONGO_MAX_IDLE_TIME_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    MONGO_CONNECT_TIMEOUT_MS,
+    MONGO_SOCKET_TIMEOUT_MS,
+    MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    MONGO_COMPRESSORS,
+)
+
+# Package each wire compressor needs (zlib is in the standard library)
+_COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+_lock = threading.Lock()
+_motor_clients: dict = {}  # event loop -> AsyncIOMotorClient
+_sync_client = None
+_listener = None
+
+
+def compressors() -> list[str]:
+    """Compressors from MONGO_COMPRESSORS whose packages are installed, in order."""
+    names = [name.strip() for name in MONGO_COMPRESSORS.split(",") if name.strip()]
+    return [name for name in names if name in _COMPRESSOR_MODULES and importlib.util.find_spec(_COMPRESSOR_MODULES[name])]
+
+
+def client_options() -> dict:
+    """Keyword arguments shared by the Motor and pymongo clients."""
+    from pymongo.server_api import ServerApi
+
+    options = {
+        "server_api": ServerApi("1"),
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "event_listeners": [_pool_listener()],
+    }
+    available = compressors()
+    if available:
+        options["compressors"] = ",".join(available)
+    return options
+
+
+def get_motor_client():
+    """The Motor client of the running event loop (created on first use)."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    client = _motor_clients.get(loop)
+    if client is None:
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        with _lock:
+            for other in [other for other in _motor_clients if other is not None and other.is_closed()]:
+                _motor_clients.pop(other).close()
+            client = _motor_clients.get(loop)
+            if client is None:
+                client = _motor_clients[loop] = AsyncIOMotorClient(os.getenv("MONGODB_URI"), **client_options())
+    return client
+
+
+def get_sync_client():
+    """The process-wide synchronous `MongoClient` (created on first use)."""
+    global _sync_client
+    if _sync_client is None:
+        from pymongo import MongoClient
+
+        with _lock:
+            if _sync_client is None:
+                _sync_client = MongoClient(os.getenv("MONGODB_URI"), **client_options())
+    return _sync_client
+
+
+async def warm_up():
+    """Select a server and open a pooled connection now, so the first request does not pay for it."""
+    await get_motor_client().admin.command("ping")
+
+
+def _pool_listener():
+    global _listener
+    if _listener is None:
+        from pymongo import monitoring
+
+        class PoolMetrics(monitoring.ConnectionPoolListener):
+            """Connection and check-out counters, updated from the driver's threads."""
+
+            def __init__(self):
+                self.lock = threading.Lock()
+                self.stats = {
+                    "pools": 0,
+                    "connections_open": 0,
+                    "connections_created": 0,
+                    "connections_closed": 0,
+                    "checked_out": 0,
+                    "checkouts": 0,
+                    "checkout_failures": 0,
+                    "checkout_wait_ms_total": 0.0,
+                    "checkout_wait_ms_max": 0.0,
+                    "pool_clears": 0,
+                }
+
+            def _add(self, **deltas):
+                with self.lock:
+                    for key, delta in deltas.items():
+                        self.stats[key] += delta
+
+            def _waited(self, event):
+                wait_ms = (getattr(event, "duration", None) or 0.0) * 1000
+                with self.lock:
+                    self.stats["checkout_wait_ms_total"] += wait_ms
+                    self.stats["checkout_wait_ms_max"] = max(self.stats["checkout_wait_ms_max"], wait_ms)
+
+            def pool_created(self, event):
+                self._add(pools=1)
+
+            def pool_ready(self, event):
+                pass
+
+            def pool_cleared(self, event):
+                self._add(pool_clears=1)
+
+            def pool_closed(self, event):
+                self._add(pools=-1)
+
+            def connection_created(self, event):
+                self._add(connections_open=1, connections_created=1)
+
+            def connection_ready(self, event):
+                pass
+
+            def connection_closed(self, event):
+                self._add(connections_open=-1, connections_closed=1)
+
+            def connection_check_out_started(self, event):
+                pass
+
+            def connection_check_out_failed(self, event):
+                self._add(checkout_failures=1)
+                self._waited(event)
+
+            def connection_checked_out(self, event):
+                self._add(checked_out=1, checkouts=1)
+                self._waited(event)
+
+            def connection_checked_in(self, event):
+                self._add(checked_out=-1)
+
+        _listener = PoolMetrics()
+    return _listener
+
+
+def pool_stats() -> dict:
+    """Pool counters across all clients, with the pool settings they run under."""
+    listener = _pool_listener()
+    with listener.lock:
+        stats = dict(listener.stats)
+    checkouts = stats.get("checkouts", 0)
+    stats["checkout_wait_ms_avg"] = round(stats["checkout_wait_ms_total"] / checkouts, 3) if checkouts else 0.0
+    return {
+        **stats,
+        "clients": len(_motor_clients) + (_sync_client is not None),
+        "max_pool_size": MONGO_MAX_POOL_SIZE,
+        "min_pool_size": MONGO_MIN_POOL_SIZE,
+        "compressors": compressors(),
+    }
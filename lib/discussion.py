@@ -1,8 +1,10 @@
+import asyncio
 import os
-from groq import Groq
-from dotenv import load_dotenv
-
-load_dotenv()
+import re
+from config import RAG_MAP_CONCURRENCY, RAG_REDUCE_BATCH, RAG_TOP_K, RAG_CHUNK_CHARS, RETRIEVAL_MODE
+from lib.retrieval import select_context, split_transcript
+from lib.map_cache import map_cache_key, get_cached_map, set_cached_map
+from lib.tokens import estimate_tokens, clip_to_tokens, context_window, model_budget
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
@@ -17,76 +19,351 @@ class Message:
     final_response: str
 
 
-# Initialize Groq client
-client = Groq(api_key=GROQ_API_KEY)
+# Async Groq client - completions are awaited so a slow model never blocks the
+# event loop serving the other /map requests. Created on the first LLM call, so
+# requests that never reach the model do not pay for importing the SDK.
+_client = None
+
+
+def get_client():
+    """Get or create the shared async Groq client."""
+    global _client
+    if _client is None:
+        from groq import AsyncGroq
+
+        _client = AsyncGroq(api_key=GROQ_API_KEY)
+    return _client
+
+
+# Bump when SYSTEM_PROMPT or the map message layout changes, to invalidate cached map responses
+PROMPT_VERSION = "1"
 
 SYSTEM_PROMPT = """You're a helpful AI academic research assistant.
 Given a user question and some provided documents, answer the user question.
 If none of the documents answer the question, just say you don't know. Format your final answer in markdown."""
 
+REDUCE_SYSTEM_PROMPT = "You are a helpful assistant that consolidates information from multiple sources into a coherent final answer."
+
 REDUCE_PROMPT = """The following is a set of intermediate responses:
 {responses}
 
 Take these and distill it into a final, consolidated response to the main user question:
 {question}"""
 
+MAP_PROMPT = "Document:\n{context}\n\nQuestion: {question}"
+
+MAP_MAX_TOKENS = 1024
+REDUCE_MAX_TOKENS = 2048
+# "Response N:" header and "---" separator around each response in a reduce prompt
+RESPONSE_OVERHEAD_TOKENS = 8
+# Chat formatting around the system and user messages
+MESSAGE_OVERHEAD_TOKENS = 16
+# Smallest document part worth a map call
+MIN_PART_TOKENS = 256
+
+_THINKING = re.compile(r"<think>.*?</think>", re.DOTALL)
+_NO_ANSWER = re.compile(r"^\W*(i (do not|don't) know|i'm not sure)\b", re.IGNORECASE)
+
 
-def map_document(question: str, content: str, model: str = "qwen/qwen3-32b") -> str:
-    """Process a single document and generate a response."""
-    response = client.chat.completions.create(
+def map_max_tokens(model: str) -> int:
+    """Completion tokens requested from a map call of `model`."""
+    return min(MAP_MAX_TOKENS, model_budget(model).max_output_tokens)
+
+
+def map_input_budget(question: str, model: str, context_tokens: int = None) -> int:
+    """Tokens of document text that fit in one map call of `model`."""
+    window = context_tokens or context_window(model)
+    overhead = estimate_tokens(SYSTEM_PROMPT + MAP_PROMPT + question) + MESSAGE_OVERHEAD_TOKENS
+    return max(window - map_max_tokens(model) - overhead, MIN_PART_TOKENS)
+
+
+def merge_part_answers(answers: list[str]) -> str:
+    """
+    Merge the answers for the parts of one document without another LLM call:
+    reasoning blocks are dropped, and so are "don't know" answers when another part answered.
+    """
+    answers = [_THINKING.sub("", answer).strip() for answer in answers]
+    informative = [answer for answer in answers if answer and not _NO_ANSWER.match(answer)]
+    return "\n\n".join(informative) if informative else answers[0]
+
+
+async def _map_call(question: str, context: str, model: str) -> str:
+    response = await get_client().chat.completions.create(
         model=model,
         messages=[
             {"role": "system", "content": SYSTEM_PROMPT},
-            {
-                "role": "user",
-                "content": f"Document:\n{content}\n\nQuestion: {question}",
-            },
+            {"role": "user", "content": MAP_PROMPT.format(context=context, question=question)},
         ],
         temperature=0.7,
-        max_tokens=1024,
+        max_tokens=map_max_tokens(model),
     )
     return response.choices[0].message.content
 
 
-def reduce_responses(question: str, responses: list[str], model: str = "qwen/qwen3-32b") -> str:
-    """Consolidate multiple responses into a final answer."""
+async def map_document(
+    question: str,
+    content: str,
+    model: str = "qwen/qwen3-32b",
+    top_k: int = RAG_TOP_K,
+    use_cache: bool = True,
+    context_tokens: int = None,
+    segments=None,
+    semaphore: asyncio.Semaphore = None,
+) -> str:
+    """
+    Process a single document and generate a response from its `top_k` most relevant chunks.
+    `segments` are the document's segments as parsed on write, if available.
+
+    Context larger than one call of the model allows is split on segment
+    boundaries into as few parts as fit; the parts are mapped concurrently and
+    their answers merged locally. Every LLM call holds `semaphore` (shared by
+    the documents of one question, see `map_partials`; by default one of
+    RAG_MAP_CONCURRENCY for this document). Responses are cached per (model,
+    question, prompt version, document hash).
+    """
+    budget = map_input_budget(question, model, context_tokens)
+    if use_cache:
+        key = map_cache_key(model, question, content, f"{PROMPT_VERSION}/{RETRIEVAL_MODE}/{top_k}/{RAG_CHUNK_CHARS}/{budget}")
+        cached = await get_cached_map(key)
+        if cached is not None:
+            return cached
+
+    context = select_context(question, content, top_k, segments=segments)
+    parts = split_transcript(context, budget, segments if context is content else None)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max(1, RAG_MAP_CONCURRENCY))
+
+    async def _map_part(part: str) -> str:
+        async with semaphore:
+            return await _map_call(question, part, model)
+
+    if len(parts) == 1:
+        answer = await _map_part(context)
+    else:
+        print(f"LOG:\tMap - Splitting document into {len(parts)} parts of up to {budget} tokens for {model}")
+        answer = merge_part_answers(await asyncio.gather(*[_map_part(part) for part in parts]))
+
+    if use_cache:
+        await set_cached_map(key, answer)
+    return answer
+
+
+def _reduce_messages(question: str, responses: list[str]) -> list[dict]:
+    """Build the chat messages consolidating `responses` into one answer."""
     responses_text = "\n\n---\n\n".join(
         [f"Response {i+1}:\n{r}" for i, r in enumerate(responses)]
     )
     prompt = REDUCE_PROMPT.format(responses=responses_text, question=question)
+    return [
+        {"role": "system", "content": REDUCE_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+
 
-    response = client.chat.completions.create(
+async def reduce_responses(question: str, responses: list[str], model: str = "qwen/qwen3-32b") -> str:
+    """Consolidate multiple responses into a final answer."""
+    response = await get_client().chat.completions.create(
         model=model,
-        messages=[
-            {
-                "role": "system",
-                "content": "You are a helpful assistant that consolidates information from multiple sources into a coherent final answer.",
-            },
-            {"role": "user", "content": prompt},
-        ],
+        messages=_reduce_messages(question, responses),
         temperature=0.7,
-        max_tokens=2048,
+        max_tokens=REDUCE_MAX_TOKENS,
     )
     return response.choices[0].message.content
 
 
-def send_rag(docs, message, model="qwen/qwen3-32b"):
+async def stream_reduce(question: str, responses: list[str], model: str = "qwen/qwen3-32b"):
+    """Consolidate multiple responses, yielding the final answer as text deltas."""
+    stream = await get_client().chat.completions.create(
+        model=model,
+        messages=_reduce_messages(question, responses),
+        temperature=0.7,
+        max_tokens=REDUCE_MAX_TOKENS,
+        stream=True,
+    )
+    async with stream:  # closing the generator early closes the HTTP stream too
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+def reduce_budget(question: str, model: str, context_tokens: int = None) -> int:
+    """Tokens left for the responses in one reduce prompt of `model`."""
+    window = context_tokens or context_window(model)
+    overhead = estimate_tokens(REDUCE_SYSTEM_PROMPT + REDUCE_PROMPT + question)
+    return max(window - REDUCE_MAX_TOKENS - overhead, 4 * RESPONSE_OVERHEAD_TOKENS)
+
+
+def _response_tokens(response: str) -> int:
+    return estimate_tokens(response) + RESPONSE_OVERHEAD_TOKENS
+
+
+def pack_groups(responses: list[str], budget: int) -> list[list[str]]:
+    """Split responses, in order, into groups whose estimated tokens fit in `budget`."""
+    groups, current, used = [], [], 0
+    for response in responses:
+        tokens = _response_tokens(response)
+        if current and used + tokens > budget:
+            groups.append(current)
+            current, used = [], 0
+        current.append(response)
+        used += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+async def tree_reduce(
+    question: str,
+    responses: list[str],
+    model: str = "qwen/qwen3-32b",
+    context_tokens: int = None,
+    concurrency: int = RAG_MAP_CONCURRENCY,
+) -> list[str]:
+    """
+    Reduce responses level by level until they fit in a single reduce prompt.
+
+    Each level packs the responses into as few groups as the model context
+    allows (the fan-in adapts to their estimated size) and reduces the groups in
+    parallel. Responses are clipped to half the budget, so any two fit together
+    and every level at least halves the count.
+
+    Returns: the responses for the final reduce (a single one needs no reduce)
+    """
+    budget = reduce_budget(question, model, context_tokens)
+    max_response = budget // 2 - RESPONSE_OVERHEAD_TOKENS
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _reduce(group: list[str]) -> str:
+        if len(group) == 1:
+            return group[0]
+        async with semaphore:
+            return await reduce_responses(question, group, model)
+
+    level = [clip_to_tokens(r, max_response) for r in responses]
+    while True:
+        groups = pack_groups(level, budget)
+        if len(groups) <= 1:
+            return level
+        print(f"LOG:\t/rag - Reducing {len(level)} responses in {len(groups)} groups")
+        level = [clip_to_tokens(r, max_response) for r in await asyncio.gather(*[_reduce(g) for g in groups])]
+
+
+async def reduce_all(question: str, responses: list[str], model: str = "qwen/qwen3-32b", context_tokens: int = None) -> str:
+    """Consolidate any number of responses into a final answer, tree-reducing when needed."""
+    level = await tree_reduce(question, responses, model, context_tokens)
+    if len(level) == 1:
+        return level[0]
+    return await reduce_responses(question, level, model)
+
+
+async def map_partials(
+    question: str,
+    contents: dict[str, str],
+    model: str = "qwen/qwen3-32b",
+    concurrency: int = RAG_MAP_CONCURRENCY,
+    reduce_batch: int = RAG_REDUCE_BATCH,
+    context_tokens: int = None,
+    on_mapped=None,
+    segments: dict = None,
+) -> list[str]:
+    """
+    Map phase of the server-side RAG, returning the responses left for the final reduce.
+
+    Map calls, including the parts of split documents, and batch reduces run
+    under one semaphore of `concurrency`. As map results arrive they
+    are buffered, and each batch of `reduce_batch` responses (fewer if they would
+    overflow the model context) is reduced in the background while the remaining
+    maps are still running. A failed batch reduce, like a failed map, does not
+    fail the question: its responses are left for the final reduce.
+
+    Args:
+        contents: dict mapping filename -> transcript content
+        on_mapped: optional callback receiving the number of documents mapped so far
+        segments: optional dict mapping filename -> its parsed segments (see `map_document`)
+
+    Returns: the partial summaries plus any leftover map responses
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    budget = reduce_budget(question, model, context_tokens)
+
+    async def _map(filename: str, content: str) -> str:
+        response = await map_document(
+            question, content, model, context_tokens=context_tokens,
+            segments=(segments or {}).get(filename), semaphore=semaphore,
+        )
+        print(f"LOG:\t/rag - Mapped {filename}")
+        return response
+
+    map_tasks = [asyncio.create_task(_map(fn, content)) for fn, content in contents.items()]
+    reduce_tasks = []
+    partials = []
+    pending = []
+    pending_tokens = 0
+    errors = 0
+
+    async def _reduce_batch(batch: list[str]) -> list[str]:
+        try:
+            async with semaphore:
+                return [await reduce_responses(question, batch, model)]
+        except Exception as e:
+            print(f"LOG:\t/rag batch reduce error: {e}")
+            return batch
+
+    def _flush():
+        nonlocal pending, pending_tokens
+        if len(pending) > 1:
+            reduce_tasks.append(asyncio.create_task(_reduce_batch(pending)))
+        else:
+            partials.extend(pending)
+        pending, pending_tokens = [], 0
+
+    try:
+        for done, next_done in enumerate(asyncio.as_completed(map_tasks), start=1):
+            try:
+                response = await next_done
+            except Exception as e:
+                errors += 1
+                print(f"LOG:\t/rag map error: {e}")
+                continue
+            finally:
+                if on_mapped:
+                    on_mapped(done)
+
+            tokens = _response_tokens(response)
+            if pending and pending_tokens + tokens > budget:
+                _flush()
+            pending.append(response)
+            pending_tokens += tokens
+            if len(pending) >= reduce_batch:
+                _flush()
+
+        if errors == len(map_tasks):
+            raise RuntimeError("All document processing failed")
+
+        reduced = [response for batch in await asyncio.gather(*reduce_tasks) for response in batch]
+        return partials + reduced + pending
+    finally:
+        # Cancelled (client disconnected) or failed: no LLM call outlives the request
+        for task in map_tasks + reduce_tasks:
+            task.cancel()
+
+
+async def run_rag(question: str, contents: dict[str, str], model: str = "qwen/qwen3-32b", context_tokens: int = None, **kwargs) -> str:
+    """Server-side map-reduce over already fetched transcripts (see `map_partials` and `tree_reduce`)."""
+    partials = await map_partials(question, contents, model, context_tokens=context_tokens, **kwargs)
+    return await reduce_all(question, partials, model, context_tokens)
+
+
+async def send_rag(docs, message, model="qwen/qwen3-32b"):
     """
     Process documents using map-reduce pattern with Groq API.
-    Note: This is the legacy synchronous version. For better serverless performance,
+    Note: This is the legacy all-in-one version. For better serverless performance,
     use map_document + reduce_responses with client-side orchestration.
     """
-    responses = []
     contents = [doc["page_content"] for doc in docs]
+    responses = list(await asyncio.gather(*[map_document(message, content, model) for content in contents]))
 
-    for content in contents:
-        response = map_document(message, content, model)
-        responses.append(response)
-
-    if len(responses) == 1:
-        final_response = responses[0]
-    else:
-        final_response = reduce_responses(message, responses, model)
+    final_response = await reduce_all(message, responses, model)
 
     return {
         "question": message,
@@ -0,0 +1,68 @@
+"""
+HTTP validators: strong ETags and If-None-Match handling.
+
+A response whose bytes are known up front gets an ETag from their hash. A
+request repeating that tag in If-None-Match gets an empty 304 instead of
+the body.
+"""
+import hashlib
+
+from starlette.responses import Response
+
+# Fingerprinted assets never change under their URL
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Per-user pages: the browser may keep a copy but revalidates it on every use
+REVALIDATE = "private, no-cache"
+# Content codings applied by lib.compression, most preferred first
+ENCODINGS = ("br", "gzip")
+
+
+def etag(*parts) -> str:
+    """Strong ETag (quoted) from the bytes or text parts that determine a response."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()}"'
+
+
+def encoded_etag(tag: str, encoding: str) -> str:
+    """ETag of a compressed representation: the identity tag with the encoding appended ("abc" -> "abc-gzip")."""
+    return f'{tag[:-1]}-{encoding}"'
+
+
+def _identity_etag(tag: str) -> str:
+    tag = tag.strip().removeprefix("W/")
+    for encoding in ENCODINGS:
+        suffix = f'-{encoding}"'
+        if tag.endswith(suffix):
+            return tag[: -len(suffix)] + '"'
+    return tag
+
+
+def matched_etag(request, tag: str):
+    """
+    The If-None-Match entry naming `tag` (so the response would not change), or None.
+
+    Compares weakly, as RFC 9110 asks for GET, and ignores the encoding suffix
+    `lib.compression` appends, so a client holding the gzip or brotli copy matches.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    if header.strip() == "*":
+        return tag
+    for candidate in header.split(","):
+        if _identity_etag(candidate) == tag:
+            return candidate.strip()
+    return None
+
+
+def conditional_response(request, body, tag: str, media_type: str = "text/html; charset=utf-8", cache_control: str = REVALIDATE, headers: dict = None) -> Response:
+    """`body` with its ETag, or a bodiless 304 when the client already has it."""
+    headers = {"ETag": tag, "Cache-Control": cache_control, **(headers or {})}
+    matched = matched_etag(request, tag)
+    if matched:
+        # Echo the client's tag: it may name the compressed copy it holds
+        return Response(status_code=304, headers={**headers, "ETag": matched})
+    return Response(body, media_type=media_type, headers=headers)
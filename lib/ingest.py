@@ -0,0 +1,179 @@
+"""
+Bulk transcript ingestion with parse-on-write.
+
+Documents are read as a stream (JSON arrays decoded element by element, JSON
+Lines or CSV rows with the transcript fields as columns) and written in
+batches, so memory is bounded by the batch rather than the file. For each
+batch the content hashes are compared with the stored ones first, so
+unchanged transcripts are skipped before any parsing; the changed ones are
+parsed in a process pool into:
+
+- the transcript document: input fields plus FILE_STEM, content_hash,
+  speakers, segment_count, duration_s, token_count and updated_at, upserted
+  by FILE_STEM (or by FILE for documents stored before FILE_STEM existed)
+- segment documents in the segments collection (`lib.segment_store` layout),
+  so readers use stored segments and never parse raw text
+
+All writes are unordered bulk operations.
+"""
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
+
+from pymongo import UpdateOne
+
+from lib.segment_store import segment_documents, segment_header
+from lib.sources import content_hash, file_stem, transcript_filter
+from lib.tokens import estimate_tokens
+from lib.transcript_parser import parse_columnar
+
+# Bytes read at a time from a JSON file
+JSON_READ_SIZE = 1 << 20
+
+
+def iter_json(f, read_size: int = JSON_READ_SIZE):
+    """
+    Yield the elements of a top-level JSON array (or a single top-level
+    value), decoding each as soon as it has been read instead of loading the
+    whole file.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = f.read(read_size)
+        eof = not chunk
+        buffer, pos = buffer[pos:] + chunk, 0
+
+    def skip(chars: str):
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in chars:
+                pos += 1
+            if pos < len(buffer) or eof:
+                return
+            fill()
+
+    skip(" \t\r\n")
+    if buffer[pos: pos + 1] != "[":
+        while not eof:
+            fill()
+        if buffer[pos:].strip():
+            yield json.loads(buffer[pos:])
+        return
+    pos += 1
+    while True:
+        skip(" \t\r\n,")
+        if pos >= len(buffer):
+            raise ValueError("Unterminated JSON array")
+        if buffer[pos] == "]":
+            return
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill()  # the element continues past what has been read
+            continue
+        if end == len(buffer) and not eof:
+            fill()  # a number or literal may be cut short
+            continue
+        pos = end
+        yield value
+
+
+def read_documents(path: str):
+    """Yield the transcript documents of a .json (array or object), .jsonl or .csv file."""
+    if path.endswith(".csv"):
+        csv.field_size_limit(sys.maxsize)
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+    elif path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, encoding="utf-8") as f:
+            yield from iter_json(f)
+
+
+def prepare_document(doc: dict) -> tuple[dict, list[dict]]:
+    """Parse one transcript: (transcript document fields, segment documents). Runs in pool workers."""
+    stem = file_stem(doc["FILE"])
+    text = doc.get("TRANSCRIPT") or ""
+    segments = parse_columnar(text)
+
+    transcript = {
+        **{k: v for k, v in doc.items() if k != "_id"},
+        "FILE_STEM": stem,
+        "TRANSCRIPT": text,
+        "content_hash": content_hash(text),
+        "speakers": segments.speakers,
+        "segment_count": len(segments),
+        "duration_s": segments.ends[-1] if len(segments) else 0,
+        "token_count": estimate_tokens(text),
+    }
+    return transcript, segment_documents(stem, segments)
+
+
+def _changed(collection, batch: list[dict]) -> list[dict]:
+    """Documents of the batch whose content hash differs from the stored one (last one wins per stem)."""
+    by_stem = {file_stem(doc["FILE"]): doc for doc in batch}
+    stored = {
+        doc["FILE_STEM"]: doc.get("content_hash")
+        for doc in collection.find({"FILE_STEM": {"$in": list(by_stem)}}, {"_id": 0, "FILE_STEM": 1, "content_hash": 1})
+    }
+    return [doc for stem, doc in by_stem.items() if stored.get(stem) != content_hash(doc.get("TRANSCRIPT") or "")]
+
+
+def write_batch(collection, segments_collection, prepared: list[tuple[dict, list[dict]]]):
+    """Upsert transcripts and replace their segments (rows first, headers last, as `lib.segment_store` expects)."""
+    now = datetime.now(timezone.utc)
+    stems = [transcript["FILE_STEM"] for transcript, _ in prepared]
+
+    segments_collection.delete_many({"FILE_STEM": {"$in": stems}})
+    rows = [segment for _, segments in prepared for segment in segments]
+    if rows:
+        segments_collection.insert_many(rows, ordered=False)
+    segments_collection.insert_many(
+        [
+            segment_header(
+                transcript["FILE_STEM"], transcript["segment_count"], transcript["speakers"], transcript["content_hash"], now
+            )
+            for transcript, _ in prepared
+        ],
+        ordered=False,
+    )
+    collection.bulk_write(
+        [
+            UpdateOne(transcript_filter(transcript["FILE"]), {"$set": {**transcript, "updated_at": now}}, upsert=True)
+            for transcript, _ in prepared
+        ],
+        ordered=False,
+    )
+
+
+def ingest(paths: list[str], collection, segments_collection, batch_size: int = 200, workers: int = None) -> dict:
+    """Ingest every document of `paths`. Returns counts of documents read, written and skipped as unchanged."""
+    counts = {"read": 0, "written": 0, "unchanged": 0}
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path in paths:
+            documents = read_documents(path)
+            while batch := list(islice(documents, batch_size)):
+                changed = _changed(collection, batch)
+                if changed:
+                    chunksize = max(1, len(changed) // (4 * workers))
+                    prepared = list(pool.map(prepare_document, changed, chunksize=chunksize))
+                    write_batch(collection, segments_collection, prepared)
+                counts["read"] += len(batch)
+                counts["written"] += len(changed)
+                counts["unchanged"] += len(batch) - len(changed)
+                print(f"LOG:\t{path}: {counts['read']} read, {counts['written']} written, {counts['unchanged']} unchanged")
+    return counts
@@ -0,0 +1,60 @@
+"""
+Local transcript corpus (data/samples.json), used offline and whenever MongoDB
+is unreachable or empty.
+
+The file is parsed once and indexed by FILE stem; later calls only `stat` it
+and re-read it when its mtime changed. Async callers load it in a worker
+thread, so a (re)load never blocks the event loop.
+"""
+import asyncio
+import json
+import os
+import threading
+
+SAMPLES_PATH = "data/samples.json"
+
+
+class LocalCorpus:
+    """Documents of a corpus file, with metadata and content indexed by FILE stem."""
+
+    def __init__(self, documents: list[dict], mtime: int):
+        from lib.sources import file_stem  # lib.sources imports this module for its fallbacks
+
+        self.documents = documents
+        self.mtime = mtime
+        self.metadata = [{k: v for k, v in doc.items() if k != "TRANSCRIPT"} for doc in documents]
+        self.contents = {file_stem(doc["FILE"]): doc.get("TRANSCRIPT", "") for doc in documents}
+
+    def get_contents(self, stems) -> dict:
+        """Transcript content of the given stems that exist, in O(len(stems))."""
+        return {stem: self.contents[stem] for stem in stems if stem in self.contents}
+
+
+_corpus: LocalCorpus = None
+_lock = threading.Lock()
+
+
+def _mtime(path: str) -> int:
+    return os.stat(path).st_mtime_ns
+
+
+def get_local_corpus(path: str = SAMPLES_PATH) -> LocalCorpus:
+    """The loaded corpus, re-read only when the file changed."""
+    global _corpus
+    mtime = _mtime(path)
+    if _corpus is not None and _corpus.mtime == mtime:
+        return _corpus
+    with _lock:
+        if _corpus is None or _corpus.mtime != mtime:
+            with open(path, "r") as f:
+                _corpus = LocalCorpus(json.load(f), mtime)
+            print(f"LOG:\tLoaded {len(_corpus.documents)} local transcripts from {path}")
+        return _corpus
+
+
+async def get_local_corpus_async(path: str = SAMPLES_PATH) -> LocalCorpus:
+    """`get_local_corpus` for async handlers: a (re)load runs in a worker thread."""
+    corpus = _corpus
+    if corpus is not None and corpus.mtime == _mtime(path):
+        return corpus
+    return await asyncio.to_thread(get_local_corpus, path)
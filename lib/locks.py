@@ -0,0 +1,30 @@
+"""
+asyncio locks that work across event loops.
+
+An `asyncio.Lock` binds to the event loop it is first contended on and fails
+on any other, while the app may run several loops over its lifetime (a test
+client, a worker restart, serverless re-entry). Like the Motor clients of
+`lib.db`, a `LoopLock` keeps one lock per running loop, created on first use;
+locks of closed loops are dropped.
+"""
+import asyncio
+import threading
+
+
+class LoopLock:
+    """Module-level lock for async code: `async with lock.get(): ...`."""
+
+    def __init__(self):
+        self._locks: dict = {}  # event loop -> asyncio.Lock
+        self._guard = threading.Lock()
+
+    def get(self) -> asyncio.Lock:
+        """The lock of the running event loop."""
+        loop = asyncio.get_running_loop()
+        lock = self._locks.get(loop)
+        if lock is None:
+            with self._guard:
+                for other in [other for other in self._locks if other.is_closed()]:
+                    del self._locks[other]
+                lock = self._locks.setdefault(loop, asyncio.Lock())
+        return lock
@@ -0,0 +1,88 @@
+"""
+Cache of map-phase responses.
+
+Keys combine the model, the normalized question, the prompt version and a
+content hash of the transcript, so re-asking a question over an overlapping
+selection only pays for the documents not seen yet. A bounded in-memory LRU
+sits in front of an optional MongoDB tier (MAP_CACHE_BACKEND=mongo) whose
+entries expire through a TTL index.
+"""
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+from lib.cache import LRUCache
+from lib.db import get_motor_client
+from lib.sources import content_hash
+from config import DB_NAME, MAP_CACHE_BACKEND, MAP_CACHE_COLLECTION, MAP_CACHE_SIZE, MAP_CACHE_TTL
+
+_memory = LRUCache(MAP_CACHE_SIZE, ttl=MAP_CACHE_TTL, name="map_responses")
+
+# MongoDB tier counters and TTL index state
+_mongo_stats = {"hits": 0, "misses": 0, "errors": 0}
+_ttl_index_ready = False
+
+
+def normalize_question(question: str) -> str:
+    """Case- and whitespace-insensitive form of a question."""
+    return " ".join(question.lower().split())
+
+
+def map_cache_key(model: str, question: str, content: str, prompt_version: str) -> str:
+    """Cache key for the map response of one transcript."""
+    parts = (model, normalize_question(question), prompt_version, content_hash(content))
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _collection():
+    return get_motor_client()[DB_NAME][MAP_CACHE_COLLECTION]
+
+
+async def get_cached_map(key: str):
+    """Cached map response, or None."""
+    response = _memory.get(key)
+    if response is not None or MAP_CACHE_BACKEND != "mongo":
+        return response
+
+    try:
+        # The TTL monitor only runs every minute, so also filter on age
+        oldest = datetime.now(timezone.utc) - timedelta(seconds=MAP_CACHE_TTL)
+        doc = await _collection().find_one({"_id": key, "created_at": {"$gt": oldest}}, {"response": 1})
+    except Exception as e:
+        _mongo_stats["errors"] += 1
+        print(f"LOG:\tMap cache lookup failed: {e}")
+        return None
+
+    if doc is None:
+        _mongo_stats["misses"] += 1
+        return None
+    _mongo_stats["hits"] += 1
+    _memory.set(key, doc["response"])
+    return doc["response"]
+
+
+async def set_cached_map(key: str, response: str):
+    """Store a map response in every configured tier."""
+    global _ttl_index_ready
+
+    _memory.set(key, response)
+    if MAP_CACHE_BACKEND != "mongo":
+        return
+
+    try:
+        coll = _collection()
+        if not _ttl_index_ready:
+            await coll.create_index("created_at", expireAfterSeconds=MAP_CACHE_TTL)
+            _ttl_index_ready = True
+        await coll.update_one(
+            {"_id": key},
+            {"$set": {"response": response, "created_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+    except Exception as e:
+        _mongo_stats["errors"] += 1
+        print(f"LOG:\tMap cache write failed: {e}")
+
+
+def map_cache_stats() -> dict:
+    """Counters of the MongoDB tier (the memory tier reports through `cache_stats`)."""
+    return {"backend": MAP_CACHE_BACKEND, **_mongo_stats}
@@ -0,0 +1,98 @@
+"""
+MongoDB transcript store: the `lib.sources`, `lib.navigation`,
+`lib.segment_store` and `lib.search_index` paths behind the `TranscriptStore`
+interface, including their fallbacks to the local samples.
+"""
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+
+from lib.db import get_motor_client, warm_up
+from lib.navigation import get_navigation, navigation_version
+from lib.search_index import get_search_index, invalidate_search_index
+from lib.segment_store import get_segment_page, get_parsed_transcripts, store_segments, delete_segments
+from lib.sources import (
+    content_hash,
+    ensure_transcript_indexes,
+    file_stem,
+    get_transcripts_content_async,
+    load_content_hashes_async,
+    load_transcripts_metadata_async,
+    transcript_filter,
+)
+from lib.store import TranscriptStore
+from lib.transcript_parser import parse_columnar
+from lib.transcript_service import forget_parsed_transcript
+from config import DB_NAME, COLLECTION_NAME
+
+
+class MongoTranscriptStore(TranscriptStore):
+    def __init__(self, database: str = DB_NAME, collection: str = COLLECTION_NAME):
+        self.database = database
+        self.collection = collection
+
+    def _collection(self):
+        return get_motor_client()[self.database][self.collection]
+
+    async def prepare(self):
+        await warm_up()  # server selection and the first pooled connection, before any request needs them
+        await ensure_transcript_indexes(self.database, self.collection)
+
+    async def list_metadata(self) -> list[dict]:
+        return await load_transcripts_metadata_async(self.database, self.collection)
+
+    async def navigation(self) -> tuple[dict, int, object]:
+        tree, count = await get_navigation(self.database, self.collection)
+        return tree, count, navigation_version()
+
+    async def get_contents(self, stems: list[str]) -> dict:
+        return await get_transcripts_content_async(self.database, self.collection, stems)
+
+    async def get_parsed_transcripts(self, stems: list[str]) -> dict:
+        return await get_parsed_transcripts(stems)
+
+    async def content_hashes(self) -> dict:
+        return await load_content_hashes_async(self.database, self.collection)
+
+    async def get_segments(self, stem: str, offset: int, limit: int):
+        return await get_segment_page(stem, offset, limit)
+
+    async def search(self, query: str, limit: int = 20) -> list[dict]:
+        index = await get_search_index(self)
+        return index.search(query, limit=limit)
+
+    async def put_transcripts(self, documents: list[dict]) -> int:
+        coll = self._collection()
+        by_stem = {file_stem(doc["FILE"]): doc for doc in documents}
+        stored = await coll.find(
+            {"FILE_STEM": {"$in": list(by_stem)}}, {"_id": 0, "FILE_STEM": 1, "content_hash": 1}
+        ).to_list(length=None)
+        stored_hashes = {doc["FILE_STEM"]: doc.get("content_hash") for doc in stored}
+
+        now = datetime.now(timezone.utc)
+        changed = {}
+        for stem, doc in by_stem.items():
+            digest = content_hash(doc.get("TRANSCRIPT", ""))
+            if stored_hashes.get(stem) != digest:
+                changed[stem] = {**doc, "FILE_STEM": stem, "content_hash": digest, "updated_at": now}
+        if not changed:
+            return 0
+
+        await coll.bulk_write(
+            [UpdateOne(transcript_filter(doc["FILE"]), {"$set": doc}, upsert=True) for doc in changed.values()],
+            ordered=False,
+        )
+        for stem, doc in changed.items():
+            segments = parse_columnar(doc.get("TRANSCRIPT", ""))
+            await store_segments(stem, segments, segments.speakers, doc["content_hash"], now)
+            forget_parsed_transcript(stem)
+        invalidate_search_index()
+        return len(changed)
+
+    async def delete_transcripts(self, stems: list[str]) -> int:
+        result = await self._collection().delete_many({"FILE_STEM": {"$in": list(stems)}})
+        for stem in stems:
+            await delete_segments(stem)
+            forget_parsed_transcript(stem)
+        invalidate_search_index()
+        return result.deleted_count
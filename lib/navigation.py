@@ -0,0 +1,109 @@
+"""
+Cached navigation tree for /load-transcripts.
+
+Only COUNTRY, PROJECT, NAME and FILE are read (never DESCRIPTION or
+TRANSCRIPT). Each page load costs one cheap check: the newest `updated_at`
+(through its index) and the estimated document count. When neither moved the
+cached tree is served as is; when documents were updated or added, only those
+newer than the watermark are fetched and merged. Anything else (deletions,
+documents without `updated_at`) triggers a full reload.
+
+Lazy navigation fragments (one country's projects, one project's rows) are
+rendered once per navigation version and served from `_fragments`.
+"""
+import asyncio
+
+from lib.cache import LRUCache
+from lib.local_corpus import get_local_corpus_async
+from lib.locks import LoopLock
+from lib.db import get_motor_client
+from lib.sources import navigation_entry, navigation_tree
+from config import NAVIGATION_FRAGMENT_CACHE_SIZE
+
+NAV_PROJECTION = {"COUNTRY": 1, "PROJECT": 1, "NAME": 1, "FILE": 1, "updated_at": 1}
+
+
+class NavigationCache:
+    """Navigation entries by document id, with the tree built from them."""
+
+    def __init__(self):
+        self.entries: dict = {}  # _id -> (country, project, record)
+        self.tree: dict = None
+        self.watermark = None  # (max updated_at, document count)
+
+    def replace(self, documents, watermark):
+        self.entries = {doc["_id"]: navigation_entry(doc) for doc in documents}
+        self._rebuild(watermark)
+
+    def merge(self, documents, watermark):
+        for doc in documents:
+            self.entries[doc["_id"]] = navigation_entry(doc)
+        self._rebuild(watermark)
+
+    def _rebuild(self, watermark):
+        self.tree = navigation_tree(self.entries.values())
+        self.watermark = watermark
+
+
+_cache = NavigationCache()
+_lock = LoopLock()
+_fragments = LRUCache(NAVIGATION_FRAGMENT_CACHE_SIZE, name="navigation_fragments")
+
+
+async def _read_watermark(coll):
+    latest, count = await asyncio.gather(
+        coll.find({"updated_at": {"$exists": True}}, {"_id": 0, "updated_at": 1}).sort("updated_at", -1).limit(1).to_list(length=1),
+        coll.estimated_document_count(),
+    )
+    return (latest[0]["updated_at"] if latest else None, count)
+
+
+async def _refresh(coll):
+    watermark = await _read_watermark(coll)
+    if watermark == _cache.watermark:
+        return
+
+    last_update = _cache.watermark[0] if _cache.watermark else None
+    if last_update is not None and watermark[0] is not None:
+        changed = await coll.find({"updated_at": {"$gt": last_update}}, NAV_PROJECTION).to_list(length=None)
+        known = sum(1 for doc in changed if doc["_id"] in _cache.entries)
+        if len(_cache.entries) + len(changed) - known == watermark[1]:
+            _cache.merge(changed, watermark)
+            print(f"LOG:\tNavigation updated: {len(changed)} changed transcripts")
+            return
+
+    documents = await coll.find({}, NAV_PROJECTION).to_list(length=None)
+    if not documents:
+        raise Exception("Collection is empty! -> Load local samples")
+    _cache.replace(documents, watermark)
+    print(f"LOG:\tNavigation rebuilt from {len(documents)} transcripts")
+
+
+async def get_navigation(database: str, collection: str) -> tuple[dict, int]:
+    """Navigation tree (country -> project -> records) and the number of transcripts."""
+    try:
+        async with _lock.get():
+            await _refresh(get_motor_client()[database][collection])
+        return _cache.tree, len(_cache.entries)
+
+    except Exception as e:
+        print(f"LOG:\tNavigation refresh failed: {e}")
+        if _cache.tree is not None:
+            return _cache.tree, len(_cache.entries)
+        samples = (await get_local_corpus_async()).metadata
+        return navigation_tree(navigation_entry(doc) for doc in samples), len(samples)
+
+
+def navigation_version():
+    """Version of the cached tree (its watermark); changes whenever the tree does."""
+    return _cache.watermark
+
+
+def cached_fragment(key: tuple, render, version=None) -> str:
+    """HTML of a navigation fragment: `render()` once per navigation `version`, then cached."""
+    key = (version, *key)
+    html = _fragments.get(key)
+    if html is None:
+        html = render()
+        _fragments.set(key, html)
+    return html
@@ -0,0 +1,46 @@
+"""
+Request-scoped transcript prefetch for client-orchestrated RAG.
+
+A client that fans out one /map call per document first opens a job with
+/rag-job: every selected transcript (text and parsed segments) is loaded in a
+single round of store queries and kept under a random job id for RAG_JOB_TTL
+seconds. /map calls carrying the job id read their transcript from here
+instead of querying the database, so a question costs one round trip instead
+of one per document.
+
+A job belongs to the signed-in user who opened it: other sessions presenting
+its id are treated as if it did not exist. Jobs live in this process's memory;
+a /map call served by another instance (or after the job expired) falls back
+to fetching its transcript.
+"""
+import secrets
+
+from lib.cache import LRUCache
+from config import RAG_JOB_TTL, RAG_JOB_CACHE_MAX_BYTES
+
+_RAG_JOB_MAX = 256
+
+
+def _job_size(job: dict) -> int:
+    return sum(len(text) for text in job["contents"].values()) + sum(s.nbytes() for s in job["segments"].values())
+
+
+_jobs = LRUCache(_RAG_JOB_MAX, ttl=RAG_JOB_TTL, name="rag_jobs", max_bytes=RAG_JOB_CACHE_MAX_BYTES, sizeof=_job_size)
+
+
+def create_job(owner: str, contents: dict, segments: dict) -> str:
+    """Keep prefetched contents (filename -> text) and their parsed segments for `owner` under a new job id."""
+    job_id = secrets.token_urlsafe(16)
+    _jobs.set(job_id, {"owner": owner, "contents": contents, "segments": segments})
+    return job_id
+
+
+def get_job_document(job_id: str, owner: str, filename: str):
+    """
+    (text, parsed segments or None) of a prefetched transcript, or None if the
+    job is unknown, belongs to someone else or does not hold the file.
+    """
+    job = _jobs.get(job_id)
+    if job is None or not owner or job["owner"] != owner or filename not in job["contents"]:
+        return None
+    return job["contents"][filename], job["segments"].get(filename)
@@ -0,0 +1,110 @@
+"""
+Markdown rendering for model answers.
+
+Rendered HTML is cached by content hash, so re-rendering the same answer
+(repeated questions, cached map/reduce results) is a lookup.
+
+`IncrementalMarkdown` renders a streamed answer as it grows. Top-level
+blocks that can no longer change are rendered once and kept, and only the
+unfinished tail is converted on each update.
+"""
+import hashlib
+import re
+
+import markdown
+
+from lib.cache import LRUCache
+from config import RENDER_CACHE_SIZE, RENDER_CACHE_MAX_BYTES
+
+MARKDOWN_EXTENSIONS = ["fenced_code", "tables"]
+
+_rendered = LRUCache(
+    RENDER_CACHE_SIZE,
+    name="rendered_markdown",
+    max_bytes=RENDER_CACHE_MAX_BYTES,
+    sizeof=len,
+)
+
+# Fence opener/closer (``` or ~~~, up to three spaces of indentation)
+_FENCE = re.compile(r" {0,3}(`{3,}|~{3,})")
+# Lines that may continue the block before a blank line: indented text, list
+# items (a loose list), table rows, block quotes and raw HTML
+_CONTINUATION = re.compile(r"[ \t]|[-*+] |\d+[.)] |[|><]")
+
+
+def convert(text: str) -> str:
+    """Markdown to HTML (uncached)."""
+    return markdown.markdown(text, extensions=MARKDOWN_EXTENSIONS)
+
+
+def render_markdown(text: str) -> str:
+    """Markdown to HTML, cached by content hash."""
+    if not text:
+        return ""
+    key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    html = _rendered.get(key)
+    if html is None:
+        html = convert(text)
+        _rendered.set(key, html)
+    return html
+
+
+def stable_prefix(text: str, start: int = 0) -> int:
+    """
+    End of the last complete top-level block in `text[start:]` (`start` if none).
+
+    A block is complete once it is followed by a blank line (outside a code
+    fence) and a full line that cannot continue it, so nothing appended later
+    can change how it renders. `start` must itself be such a boundary.
+    """
+    boundary = start
+    fence = None
+    after_blank = False
+    pos = start
+    while True:
+        newline = text.find("\n", pos)
+        if newline == -1:
+            return boundary  # the last line may still be growing
+        line = text[pos:newline]
+        if fence is not None:
+            match = _FENCE.match(line)
+            if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence) and not line[match.end():].strip():
+                fence = None
+            after_blank = False
+        elif not line.strip():
+            after_blank = True
+        else:
+            if after_blank and not _CONTINUATION.match(line):
+                boundary = pos
+            match = _FENCE.match(line)
+            if match:
+                fence = match.group(1)
+            after_blank = False
+        pos = newline + 1
+
+
+class IncrementalMarkdown:
+    """
+    Renders a growing markdown text, converting each finished block once.
+
+    `render(text)` expects the text passed previously plus whatever was
+    appended since; any other text starts over. The HTML is the blocks
+    rendered separately, which matches a full render except for constructs
+    spanning blocks (reference-style link definitions), so the final render
+    of a stream should use `render_markdown`.
+    """
+
+    def __init__(self):
+        self._source = ""  # finished blocks, already rendered
+        self._html: list[str] = []
+
+    def render(self, text: str) -> str:
+        if not text.startswith(self._source):
+            self._source, self._html = "", []
+        end = stable_prefix(text, len(self._source))
+        if end > len(self._source):
+            self._html.append(convert(text[len(self._source):end]))
+            self._source = text[:end]
+        tail = text[end:]
+        parts = self._html + [convert(tail)] if tail.strip() else self._html
+        return "\n".join(part for part in parts if part)
@@ -0,0 +1,164 @@
+"""
+Retrieval stage for the map phase.
+
+Splits a transcript into chunks aligned on its `[HH:MM:SS - HH:MM:SS] Speaker :`
+segments, ranks the chunks against the question with BM25 (or embeddings when
+RETRIEVAL_MODE is "vector") and keeps only the top-k, so the tokens sent per
+map call scale with k instead of transcript length. Callers holding the
+segments parsed on write pass them along, and the text is not parsed again.
+"""
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from lib.sources import parse_transcript, content_hash
+from lib.transcript_parser import SegmentTable, parse_columnar
+from lib.tokens import BYTES_PER_TOKEN, estimate_tokens
+from config import RAG_TOP_K, RAG_CHUNK_CHARS, RETRIEVAL_MODE
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+@dataclass
+class Chunk:
+    index: int  # position of the chunk in the transcript
+    start_time: str
+    end_time: str
+    text: str
+    speaker: str = ""  # the chunk's speakers, in order of first appearance
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens, skipping single characters."""
+    return [t for t in _TOKEN_PATTERN.findall(text.lower()) if len(t) > 1]
+
+
+def format_segment(segment: dict) -> str:
+    """Render a parsed segment back into the transcript line format."""
+    return f"[{segment['start_time']} - {segment['end_time']}] {segment['speaker']} : {segment['text']}"
+
+
+def document_segments(document) -> SegmentTable:
+    """Segments of a transcript given as text (parsed here) or as parsed (see `TranscriptStore.get_parsed_transcripts`)."""
+    return parse_columnar(document) if isinstance(document, str) else document["segments"]
+
+
+def document_hash(document) -> str:
+    """Content hash of a transcript given as text or as parsed."""
+    return content_hash(document) if isinstance(document, str) else document["content_hash"]
+
+
+def _segment_dicts(transcript: str, segments) -> list[dict]:
+    return parse_transcript(transcript) if segments is None else [segment.as_dict() for segment in segments]
+
+
+def chunk_segments(segments: list[dict], max_chars: int = RAG_CHUNK_CHARS) -> list[Chunk]:
+    """Group consecutive segments into chunks of at most `max_chars` (a single long segment stays whole)."""
+    chunks = []
+    lines = []
+    speakers = {}
+    size = 0
+    first = None
+
+    def _close():
+        chunks.append(Chunk(len(chunks), first["start_time"], previous["end_time"], "\n".join(lines), ", ".join(speakers)))
+
+    for segment in segments:
+        line = format_segment(segment)
+        if lines and size + len(line) > max_chars:
+            _close()
+            lines, speakers, size = [], {}, 0
+        if not lines:
+            first = segment
+        lines.append(line)
+        speakers[segment["speaker"]] = None
+        size += len(line) + 1
+        previous = segment
+
+    if lines:
+        _close()
+    return chunks
+
+
+def bm25_scores(query_tokens: list[str], documents: list[list[str]]) -> list[float]:
+    """Score each tokenized document against the query tokens with BM25."""
+    if not documents:
+        return []
+
+    n = len(documents)
+    avg_len = sum(len(d) for d in documents) / n or 1.0
+    doc_freq = Counter()
+    for doc in documents:
+        doc_freq.update(set(doc))
+
+    terms = set(query_tokens)
+    idf = {t: math.log(1 + (n - doc_freq[t] + 0.5) / (doc_freq[t] + 0.5)) for t in terms if doc_freq[t]}
+
+    scores = []
+    for doc in documents:
+        tf = Counter(doc)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * len(doc) / avg_len)
+        scores.append(sum(
+            weight * tf[t] * (BM25_K1 + 1) / (tf[t] + norm)
+            for t, weight in idf.items() if tf[t]
+        ))
+    return scores
+
+
+def rank_chunks(question: str, chunks: list[Chunk], k: int = RAG_TOP_K) -> list[Chunk]:
+    """Return the `k` best chunks for the question, in transcript order."""
+    scores = bm25_scores(tokenize(question), [tokenize(c.text) for c in chunks])
+    best = sorted(range(len(chunks)), key=lambda i: scores[i], reverse=True)[:k]
+    return [chunks[i] for i in sorted(best)]
+
+
+def select_context(question: str, transcript: str, k: int = RAG_TOP_K, max_chars: int = RAG_CHUNK_CHARS, segments=None) -> str:
+    """
+    Reduce a transcript to the chunks most relevant to the question
+    (`segments`: its already parsed `Segment`s, if available).
+
+    Returns the transcript unchanged when retrieval is disabled (k <= 0), when
+    it has no parsable segments, or when it already fits in k chunks.
+    """
+    if k <= 0:
+        return transcript
+
+    segments = _segment_dicts(transcript, segments)
+    if not segments:
+        return transcript
+
+    chunks = chunk_segments(segments, max_chars)
+    if len(chunks) <= k:
+        return transcript
+
+    if RETRIEVAL_MODE == "vector":
+        from lib.vector_index import rank_chunks_by_vector
+        best = rank_chunks_by_vector(question, chunks, k, content_hash(transcript))
+    else:
+        best = rank_chunks(question, chunks, k)
+    return "\n[...]\n".join(c.text for c in best)
+
+
+def split_transcript(transcript: str, max_tokens: int, segments=None) -> list[str]:
+    """
+    Split a transcript into as few parts of at most about `max_tokens` as
+    possible, on segment boundaries (a segment longer than that is cut).
+    `segments` are its already parsed `Segment`s, if available.
+    """
+    if estimate_tokens(transcript) <= max_tokens:
+        return [transcript]
+
+    # Character budget matching the token budget for this text's bytes per character
+    max_chars = max(1, max_tokens * BYTES_PER_TOKEN * len(transcript) // len(transcript.encode("utf-8")))
+    segments = _segment_dicts(transcript, segments)
+    texts = [chunk.text for chunk in chunk_segments(segments, max_chars)] if segments else [transcript]
+
+    parts = []
+    for text in texts:
+        parts.extend(text[i: i + max_chars] for i in range(0, len(text), max_chars))
+    return parts
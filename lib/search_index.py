@@ -0,0 +1,314 @@
+"""
+Persistent BM25 inverted index over every transcript segment.
+
+Segments come from the transcript store, as parsed on write; their metadata lives in parallel
+`array`s (document id, start/end in milliseconds, speaker id, token count) and
+each term's postings are two arrays of segment ids and term frequencies.
+Documents are tracked by content hash, so a refresh lists the stored hashes,
+fetches and re-indexes only the transcripts that were added or changed, and
+tombstones removed ones; the index is compacted once dead segments outnumber
+live ones. Refreshes run in a worker thread on a copy of the index, so
+searches keep being served from the current one meanwhile.
+
+The index is pickled, so it is only loaded from a file that this user owns
+in a directory nobody else can write to.
+"""
+import asyncio
+import copy
+import heapq
+import math
+import os
+import pickle
+import tempfile
+import time
+from array import array
+from collections import Counter, defaultdict
+
+from lib.locks import LoopLock
+from lib.retrieval import tokenize, document_hash, document_segments, BM25_K1, BM25_B
+from config import SEARCH_INDEX_PATH, SEARCH_INDEX_REFRESH
+
+# Bump when the on-disk layout changes; older files are rebuilt
+INDEX_VERSION = 1
+
+
+class SearchIndex:
+    """Inverted index over transcript segments with incremental updates."""
+
+    def __init__(self):
+        self.version = INDEX_VERSION
+        # Documents: stem -> doc id, doc id -> stem (None once removed), content
+        # hash and the contiguous [first, end) range of its segment ids
+        self.doc_ids: dict[str, int] = {}
+        self.doc_names: list = []
+        self.doc_hashes: list[str] = []
+        self.doc_first = array("I")
+        self.doc_end = array("I")
+        # Segments, as parallel arrays indexed by segment id
+        self.seg_doc = array("I")
+        self.seg_start = array("I")
+        self.seg_end = array("I")
+        self.seg_speaker = array("I")
+        self.seg_length = array("I")
+        self.seg_text: list[str] = []
+        self.speakers: list[str] = []
+        self.speaker_ids: dict[str, int] = {}
+        # Terms: term -> term id, then postings per term id
+        self.terms: dict[str, int] = {}
+        self.postings: list[array] = []
+        self.frequencies: list[array] = []
+        self.doc_freq = array("I")
+        # Live corpus statistics for BM25
+        self.live_segments = 0
+        self.dead_segments = 0
+        self.total_length = 0
+
+    def __len__(self):
+        return self.live_segments
+
+    def stale(self, hashes: dict) -> tuple[list[str], list[str]]:
+        """
+        Documents to refresh given the corpus' content hashes (stem -> hash, None if unknown).
+
+        The index keeps the hash it computed for each document, so a document
+        without a stored hash (written before content hashes existed, see
+        utils.backfill_file_stem) is fetched once, not on every refresh.
+
+        Returns (stems to fetch and update, indexed stems no longer in the corpus).
+        """
+        changed = [
+            stem for stem, digest in hashes.items()
+            if (stem not in self.doc_ids if digest is None else self._hash_of(stem) != digest)
+        ]
+        removed = [stem for stem in self.doc_ids if stem not in hashes]
+        return changed, removed
+
+    def update(self, contents: dict, removed: list[str] = None) -> tuple[int, int]:
+        """
+        Bring the index in line with `contents` (stem -> transcript text, or
+        parsed as by `TranscriptStore.get_parsed_transcripts`).
+
+        Without `removed`, `contents` is the whole corpus and indexed documents
+        missing from it are removed; with it, `contents` only holds the new or
+        changed documents (see `stale`).
+
+        Returns (added_or_changed, removed) document counts.
+        """
+        hashes = {stem: document_hash(document) for stem, document in contents.items()}
+        changed = [stem for stem, digest in hashes.items() if self._hash_of(stem) != digest]
+        if removed is None:
+            removed = [stem for stem in self.doc_ids if stem not in contents]
+        removed = [stem for stem in removed if stem in self.doc_ids and stem not in contents]
+
+        for stem in changed + removed:
+            if stem in self.doc_ids:
+                self._remove_document(stem)
+        for stem in changed:
+            doc = self._new_document(stem, hashes[stem])
+            for segment in document_segments(contents[stem]):
+                self._add_segment(segment.start * 1000, segment.end * 1000, segment.speaker, segment.text)
+            self.doc_end[doc] = len(self.seg_text)
+
+        if self.dead_segments > self.live_segments:
+            self._compact()
+        return len(changed), len(removed)
+
+    def search(self, query: str, limit: int = 20) -> list[dict]:
+        """Rank live segments against the query with BM25."""
+        if not self.live_segments:
+            return []
+
+        avg_length = self.total_length / self.live_segments or 1.0
+        scores = defaultdict(float)
+
+        for term in set(tokenize(query)):
+            term_id = self.terms.get(term)
+            if term_id is None or not self.doc_freq[term_id]:
+                continue
+            df = self.doc_freq[term_id]
+            idf = math.log(1 + (self.live_segments - df + 0.5) / (df + 0.5))
+            for seg, tf in zip(self.postings[term_id], self.frequencies[term_id]):
+                if self.doc_names[self.seg_doc[seg]] is None:
+                    continue
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.seg_length[seg] / avg_length)
+                scores[seg] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [
+            {
+                "filename": self.doc_names[self.seg_doc[seg]],
+                "start_ms": self.seg_start[seg],
+                "end_ms": self.seg_end[seg],
+                "speaker": self.speakers[self.seg_speaker[seg]],
+                "text": self.seg_text[seg],
+                "score": round(score, 4),
+            }
+            for seg, score in best
+        ]
+
+    def save(self, path: str):
+        """Write the index atomically (temp file + rename) into a private directory."""
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        if not _is_private(directory):
+            raise OSError(f"{directory} is writable by other users")
+        with tempfile.NamedTemporaryFile("wb", dir=directory, delete=False) as f:
+            pickle.dump(self.__dict__, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f.name, path)
+
+    @classmethod
+    def load(cls, path: str):
+        """Load an index saved by `save`, or None if missing, unreadable, outdated or not private."""
+        try:
+            with open(path, "rb") as f:
+                if not (_is_private(os.path.dirname(path) or ".") and _is_private(f.fileno())):
+                    print(f"LOG:\tSearch index {path} is writable by other users, rebuilding")
+                    return None
+                state = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"LOG:\tSearch index unreadable, rebuilding: {e}")
+            return None
+        if state.get("version") != INDEX_VERSION:
+            return None
+        index = cls()
+        index.__dict__.update(state)
+        return index
+
+    def _hash_of(self, stem: str):
+        doc = self.doc_ids.get(stem)
+        return None if doc is None else self.doc_hashes[doc]
+
+    def _new_document(self, stem: str, digest: str) -> int:
+        """Register a document; its segments must be added right after."""
+        doc = len(self.doc_names)
+        self.doc_ids[stem] = doc
+        self.doc_names.append(stem)
+        self.doc_hashes.append(digest)
+        self.doc_first.append(len(self.seg_text))
+        self.doc_end.append(len(self.seg_text))
+        return doc
+
+    def _add_segment(self, start_ms: int, end_ms: int, speaker: str, text: str):
+        """Append a segment to the most recently registered document."""
+        seg = len(self.seg_text)
+        doc = len(self.doc_names) - 1
+        tokens = Counter(tokenize(text))
+        length = sum(tokens.values())
+
+        speaker_id = self.speaker_ids.get(speaker)
+        if speaker_id is None:
+            speaker_id = self.speaker_ids[speaker] = len(self.speakers)
+            self.speakers.append(speaker)
+
+        self.seg_doc.append(doc)
+        self.seg_start.append(start_ms)
+        self.seg_end.append(end_ms)
+        self.seg_speaker.append(speaker_id)
+        self.seg_length.append(length)
+        self.seg_text.append(text)
+
+        for term, tf in tokens.items():
+            term_id = self.terms.get(term)
+            if term_id is None:
+                term_id = self.terms[term] = len(self.postings)
+                self.postings.append(array("I"))
+                self.frequencies.append(array("I"))
+                self.doc_freq.append(0)
+            self.postings[term_id].append(seg)
+            self.frequencies[term_id].append(tf)
+            self.doc_freq[term_id] += 1
+
+        self.live_segments += 1
+        self.total_length += length
+
+    def _remove_document(self, stem: str):
+        doc = self.doc_ids.pop(stem)
+        self.doc_names[doc] = None
+        for seg in range(self.doc_first[doc], self.doc_end[doc]):
+            for term in set(tokenize(self.seg_text[seg])):
+                self.doc_freq[self.terms[term]] -= 1
+            self.live_segments -= 1
+            self.dead_segments += 1
+            self.total_length -= self.seg_length[seg]
+
+    def _compact(self):
+        """Rebuild without tombstoned segments."""
+        old = self.__dict__.copy()
+        self.__init__()
+        for stem, old_doc in sorted(old["doc_ids"].items(), key=lambda item: item[1]):
+            doc = self._new_document(stem, old["doc_hashes"][old_doc])
+            for seg in range(old["doc_first"][old_doc], old["doc_end"][old_doc]):
+                self._add_segment(
+                    old["seg_start"][seg],
+                    old["seg_end"][seg],
+                    old["speakers"][old["seg_speaker"][seg]],
+                    old["seg_text"][seg],
+                )
+            self.doc_end[doc] = len(self.seg_text)
+
+
+def _is_private(path) -> bool:
+    """Whether a path (or open file descriptor) belongs to this user and nobody else can write to it."""
+    st = os.stat(path)
+    return st.st_uid == os.getuid() and not st.st_mode & 0o022
+
+
+def _updated(index: SearchIndex, contents: dict, removed: list[str], in_use: bool):
+    """
+    `index` updated (a copy if it is `in_use` by searches), with the counts
+    `SearchIndex.update` returns. Runs in a worker thread.
+    """
+    # Documents listed without a stored hash may well be unchanged
+    contents = {stem: document for stem, document in contents.items() if index._hash_of(stem) != document_hash(document)}
+    if not contents and not removed:
+        return index, 0, 0
+    if in_use:
+        index = copy.deepcopy(index)
+    return index, *index.update(contents, removed)
+
+
+# Process-wide index, refreshed at most every SEARCH_INDEX_REFRESH seconds
+_index = None
+_refreshed_at = 0.0
+_lock = LoopLock()
+
+
+async def get_search_index(store) -> SearchIndex:
+    """Load the persisted index and incrementally refresh it from the transcript store."""
+    global _index, _refreshed_at
+
+    if _index is not None and (time.monotonic() - _refreshed_at < SEARCH_INDEX_REFRESH or _lock.get().locked()):
+        # Fresh, or a refresh is under way: serve the current index meanwhile
+        return _index
+
+    async with _lock.get():
+        if _index is not None and time.monotonic() - _refreshed_at < SEARCH_INDEX_REFRESH:
+            return _index
+
+        index = _index
+        if index is None:
+            index = await asyncio.to_thread(SearchIndex.load, SEARCH_INDEX_PATH) or SearchIndex()
+
+        # Only the hashes are listed; only new or changed transcripts are fetched
+        changed, removed = index.stale(await store.content_hashes())
+        if changed or removed:
+            contents = await store.get_parsed_transcripts(changed) if changed else {}
+            # Parsing and tokenizing are CPU-bound: update off the event loop, then swap in
+            index, added, dropped = await asyncio.to_thread(_updated, index, contents, removed, index is _index)
+            if added or dropped:
+                print(f"LOG:\tSearch index updated: {added} added/changed, {dropped} removed")
+                try:
+                    await asyncio.to_thread(index.save, SEARCH_INDEX_PATH)
+                except OSError as e:
+                    print(f"LOG:\tCould not persist search index: {e}")
+        _index = index
+        _refreshed_at = time.monotonic()
+
+    return _index
+
+
+def invalidate_search_index():
+    """Make the next `get_search_index` call refresh from the store (after writes)."""
+    global _refreshed_at
+    _refreshed_at = float("-inf")
@@ -0,0 +1,235 @@
+"""
+Pre-parsed transcript segments stored one document per segment.
+
+Each transcript has a header document (`i = -1`: segment count, speakers,
+content hash, time written) and one document per segment keyed by
+(FILE_STEM, i), with times in integer seconds, so the reader fetches exactly
+`[offset, offset + limit)` through an index instead of loading and parsing
+the whole transcript for every page.
+
+Every page read also probes the transcript document's content_hash and
+updated_at. Segments whose hash differs, or that were written before the
+transcript was last updated (an edit made outside `put_transcripts` and the
+ingest CLI), are treated as missing: the page is parsed from the transcript and
+the segments rewritten.
+
+Transcripts already in this instance's parsed transcript cache are paged from
+memory. Transcripts that are not stored yet are parsed once through that cache
+and written in the background, so later pages come from storage.
+
+`get_parsed_transcripts` reads whole transcripts the same way, for map
+retrieval and the search indexes: every stored segment of the selection in
+one indexed query, with the same staleness check and parse fallback.
+"""
+import asyncio
+from datetime import datetime, timezone
+
+from lib.db import get_motor_client
+from lib.sources import get_transcripts_content_async, content_hash
+from lib.transcript_parser import Segment, SegmentTable, parse_columnar
+from lib.transcript_service import get_parsed_transcript, peek_parsed_transcript, forget_parsed_transcript
+from config import DB_NAME, COLLECTION_NAME, SEGMENTS_COLLECTION_NAME
+
+HEADER_INDEX = -1
+SEGMENT_INDEX = ([("FILE_STEM", 1), ("i", 1)], {"unique": True})
+
+_index_ready = False
+_background_writes: dict[str, asyncio.Task] = {}  # stem -> task storing it
+
+
+def _collection():
+    return get_motor_client()[DB_NAME][SEGMENTS_COLLECTION_NAME]
+
+
+async def _ensure_index(coll):
+    global _index_ready
+    if not _index_ready:
+        keys, options = SEGMENT_INDEX
+        await coll.create_index(keys, **options)
+        _index_ready = True
+
+
+def segment_documents(stem: str, segments) -> list[dict]:
+    """Stored form of a transcript's `Segment`s: one document per (FILE_STEM, i)."""
+    return [
+        {"FILE_STEM": stem, "i": i, "start": seg.start, "end": seg.end, "speaker": seg.speaker, "text": seg.text}
+        for i, seg in enumerate(segments)
+    ]
+
+
+def segment_header(stem: str, count: int, speakers: list[str], digest: str = None, updated_at: datetime = None) -> dict:
+    """Header document of a transcript's stored segments; `updated_at` is when they were written."""
+    return {
+        "FILE_STEM": stem,
+        "i": HEADER_INDEX,
+        "count": count,
+        "speakers": speakers,
+        "content_hash": digest,
+        "updated_at": updated_at or datetime.now(timezone.utc),
+    }
+
+
+async def store_segments(stem: str, segments, speakers: list[str], digest: str = None, updated_at: datetime = None):
+    """Replace the stored segments of a transcript (the header goes last, marking the set complete)."""
+    coll = _collection()
+    await _ensure_index(coll)
+    await coll.delete_many({"FILE_STEM": stem})
+    if segments:
+        await coll.insert_many(segment_documents(stem, segments), ordered=False)
+    await coll.insert_one(segment_header(stem, len(segments), speakers, digest, updated_at))
+
+
+async def delete_segments(stem: str):
+    """Remove the stored segments of a transcript."""
+    await _collection().delete_many({"FILE_STEM": stem})
+
+
+async def _store_in_background(stem: str, segments, speakers: list[str], digest: str):
+    try:
+        await store_segments(stem, segments, speakers, digest)
+        print(f"LOG:\tStored {len(segments)} segments for {stem}")
+    except Exception as e:
+        print(f"LOG:\tCould not store segments for {stem}: {e}")
+
+
+def _is_current(header: dict, transcript) -> bool:
+    """
+    Whether stored segments still match their transcript document. Without a
+    transcript document (local samples, documents predating FILE_STEM) there
+    is nothing to compare against and they are kept.
+    """
+    if transcript is None:
+        return True
+    digest = transcript.get("content_hash")
+    if digest is not None and digest != header.get("content_hash"):
+        return False
+    updated_at, written_at = transcript.get("updated_at"), header.get("updated_at")
+    return updated_at is None or (written_at is not None and written_at >= updated_at)
+
+
+def _store_later(stem: str, data: dict):
+    """Write parsed segments in the background (once per transcript at a time)."""
+    if stem not in _background_writes:
+        task = asyncio.create_task(_store_in_background(stem, data["segments"], data["speakers"], data["content_hash"]))
+        _background_writes[stem] = task
+        task.add_done_callback(lambda _: _background_writes.pop(stem, None))
+
+
+async def _read_stored_page(stem: str, offset: int, limit: int):
+    """The stored page, None if the transcript has no stored segments, or False if they are stale."""
+    coll = _collection()
+    header, rows, transcript = await asyncio.gather(
+        coll.find_one({"FILE_STEM": stem, "i": HEADER_INDEX}),
+        coll.find(
+            {"FILE_STEM": stem, "i": {"$gte": offset, "$lt": offset + limit}},
+            {"_id": 0, "start": 1, "end": 1, "speaker": 1, "text": 1},
+        ).sort("i", 1).to_list(length=limit),
+        get_motor_client()[DB_NAME][COLLECTION_NAME].find_one(
+            {"FILE_STEM": stem}, {"_id": 0, "content_hash": 1, "updated_at": 1}
+        ),
+    )
+    if header is None:
+        return None
+    if not _is_current(header, transcript):
+        print(f"LOG:\tStored segments of {stem} are stale, rebuilding")
+        return False
+    return {
+        "metadata": {"NAME": stem},
+        "segments": [Segment(r["start"], r["end"], r["speaker"], r["text"]) for r in rows],
+        "speakers": header["speakers"],
+        "total": header["count"],
+        "content_hash": header.get("content_hash"),
+    }
+
+
+async def get_segment_page(filename: str, offset: int, limit: int):
+    """
+    Segments `[offset, offset + limit)` of a transcript.
+    Returns dict with 'metadata', 'segments' (the page, as `Segment`s), 'speakers', 'total' and 'content_hash' keys, or None if not found.
+    """
+    offset, limit = max(offset, 0), max(limit, 0)
+
+    # A transcript parsed recently by this instance needs no round trip at all
+    data = peek_parsed_transcript(filename)
+    stored = None
+    if data is None:
+        try:
+            page = await _read_stored_page(filename, offset, limit)
+            if page:
+                return page
+            if page is False:
+                forget_parsed_transcript(filename)  # parsed from the same outdated text
+            stored = False
+        except Exception as e:
+            print(f"LOG:\tSegment store unavailable: {e}")  # database down - do not try to write either
+
+        data = await get_parsed_transcript(filename)
+        if not data:
+            return None
+
+    if stored is False:
+        _store_later(filename, data)
+
+    return {
+        "metadata": data["metadata"],
+        "segments": data["segments"][offset: offset + limit],
+        "speakers": data["speakers"],
+        "total": len(data["segments"]),
+        "content_hash": data["content_hash"],
+    }
+
+
+async def _read_stored_transcripts(stems: list[str]) -> dict:
+    """Current stored segments of the stems that have a complete set."""
+    coll = _collection()
+    headers, transcripts = await asyncio.gather(
+        coll.find({"FILE_STEM": {"$in": stems}, "i": HEADER_INDEX}).to_list(length=None),
+        get_motor_client()[DB_NAME][COLLECTION_NAME].find(
+            {"FILE_STEM": {"$in": stems}}, {"_id": 0, "FILE_STEM": 1, "content_hash": 1, "updated_at": 1}
+        ).to_list(length=None),
+    )
+    transcripts = {doc["FILE_STEM"]: doc for doc in transcripts}
+    current = {header["FILE_STEM"]: header for header in headers if _is_current(header, transcripts.get(header["FILE_STEM"]))}
+    if not current:
+        return {}
+
+    tables = {stem: SegmentTable() for stem in current}
+    rows = coll.find(
+        {"FILE_STEM": {"$in": list(current)}, "i": {"$gte": 0}},
+        {"_id": 0, "FILE_STEM": 1, "start": 1, "end": 1, "speaker": 1, "text": 1},
+    ).sort([("FILE_STEM", 1), ("i", 1)])
+    async for row in rows:
+        tables[row["FILE_STEM"]].append(row["start"], row["end"], row["speaker"], row["text"])
+    return {
+        stem: {"segments": tables[stem], "speakers": tables[stem].speakers, "content_hash": header.get("content_hash")}
+        for stem, header in current.items()
+        if len(tables[stem]) == header["count"]  # not being rewritten
+    }
+
+
+async def get_parsed_transcripts(stems: list[str]) -> dict:
+    """
+    Every segment of each transcript.
+    Returns dict mapping stem -> {'segments' (a `SegmentTable`), 'speakers', 'content_hash'}, for the stems found.
+    """
+    stems = list(dict.fromkeys(stems))
+    if not stems:
+        return {}
+
+    stored = True
+    try:
+        parsed = await _read_stored_transcripts(stems)
+    except Exception as e:
+        print(f"LOG:\tSegment store unavailable: {e}")  # database down - do not try to write either
+        parsed, stored = {}, False
+
+    # Not stored yet (or stale): parse from the text once, and store for next time
+    missing = [stem for stem in stems if stem not in parsed]
+    if missing:
+        contents = await get_transcripts_content_async(DB_NAME, COLLECTION_NAME, missing)
+        for stem, text in contents.items():
+            segments = parse_columnar(text)
+            parsed[stem] = {"segments": segments, "speakers": segments.speakers, "content_hash": content_hash(text)}
+            if stored:
+                _store_later(stem, parsed[stem])
+    return {stem: parsed[stem] for stem in stems if stem in parsed}
@@ -1,21 +1,39 @@
-import json
-import os
+import hashlib
 import re
-from pymongo import MongoClient
-from pymongo.server_api import ServerApi
-from motor.motor_asyncio import AsyncIOMotorClient
+from lib.db import get_motor_client, get_sync_client
+from lib.local_corpus import get_local_corpus, get_local_corpus_async
+from lib.transcript_parser import iter_raw_segments
 
-# Reusable async MongoDB client (connection pooling handled by Motor)
-_motor_client = None
+# FILE_STEM is the normalized lookup key (FILE without its extension), so
+# content lookups are exact `$in` matches on an index instead of regex scans;
+# updated_at is the navigation cache's change watermark
+TRANSCRIPT_INDEXES = [
+    ([("FILE_STEM", 1)], {"name": "file_stem"}),
+    ([("updated_at", -1)], {"name": "updated_at"}),
+]
 
 
-def _get_motor_client():
-    """Get or create a reusable Motor client."""
-    global _motor_client
-    if _motor_client is None:
-        uri = os.getenv("MONGODB_URI")
-        _motor_client = AsyncIOMotorClient(uri)
-    return _motor_client
+def file_stem(file: str) -> str:
+    """Normalized lookup key of a transcript: its FILE without the extension."""
+    file = file.strip()
+    return file[:-4] if len(file) > 4 else file
+
+
+def transcript_filter(file: str) -> dict:
+    """
+    Filter matching a transcript by its FILE_STEM, or by FILE for a document
+    stored before FILE_STEM existed, so an upsert updates it (and sets its
+    FILE_STEM) instead of inserting a duplicate. The `$exists: False` branch
+    reads the FILE_STEM index's null entries, one probe once backfilled.
+    """
+    return {"$or": [{"FILE_STEM": file_stem(file)}, {"FILE": file, "FILE_STEM": {"$exists": False}}]}
+
+
+async def ensure_transcript_indexes(database: str, collection: str):
+    """Create the transcript collection indexes (idempotent, called at startup)."""
+    coll = get_motor_client()[database][collection]
+    for keys, options in TRANSCRIPT_INDEXES:
+        await coll.create_index(keys, **options)
 
 
 async def load_transcripts_metadata_async(database: str, collection: str):
@@ -24,7 +42,7 @@ async def load_transcripts_metadata_async(database: str, collection: str):
     This is fast because we don't transfer the large text content.
     """
     try:
-        client = _get_motor_client()
+        client = get_motor_client()
         coll = client[database][collection]
 
         # Exclude TRANSCRIPT field for fast metadata-only fetch
@@ -38,11 +56,8 @@ async def load_transcripts_metadata_async(database: str, collection: str):
 
     except Exception as e:
         print(f"LOG:\tAsync load failed: {e}")
-        # Fallback to local samples
-        with open("data/samples.json", "r") as f:
-            samples = json.load(f)
-            # Return without TRANSCRIPT to match the expected structure
-            return [{k: v for k, v in doc.items() if k != "TRANSCRIPT"} for doc in samples]
+        # Fallback to local samples, without TRANSCRIPT to match the expected structure
+        return list((await get_local_corpus_async()).metadata)
 
 
 async def get_transcripts_content_async(database: str, collection: str, filenames: list[str]):
@@ -58,59 +73,92 @@ async def get_transcripts_content_async(database: str, collection: str, filename
     if not filenames:
         return {}
 
-    def _load_from_samples(filenames_to_load):
-        """Helper to load from local samples file."""
-        with open("data/samples.json", "r") as f:
-            samples = json.load(f)
-            return {
-                doc["FILE"][:-4]: doc.get("TRANSCRIPT", "")
-                for doc in samples
-                if doc["FILE"][:-4] in filenames_to_load
-            }
+    async def _load_from_samples(filenames_to_load):
+        """Helper to load from the local samples corpus."""
+        return (await get_local_corpus_async()).get_contents(filenames_to_load)
 
     try:
-        client = _get_motor_client()
+        client = get_motor_client()
         coll = client[database][collection]
 
-        # Query where FILE starts with any of the filenames followed by a dot
-        escaped_filenames = [re.escape(fn) for fn in filenames]
-        regex_pattern = f"^({'|'.join(escaped_filenames)})\\."
-
+        # Exact match on the indexed FILE_STEM: cost grows with the selection, not the collection
         cursor = coll.find(
-            {"FILE": {"$regex": regex_pattern}},
-            {"FILE": 1, "TRANSCRIPT": 1}
+            {"FILE_STEM": {"$in": list(filenames)}},
+            {"FILE_STEM": 1, "TRANSCRIPT": 1}
         )
         documents = await cursor.to_list(length=None)
+        result = {doc["FILE_STEM"]: doc.get("TRANSCRIPT", "") for doc in documents}
 
-        # Return as dict: filename (without extension) -> content
-        result = {}
-        for doc in documents:
-            file_with_ext = doc["FILE"]
-            filename_no_ext = file_with_ext[:-4] if len(file_with_ext) > 4 else file_with_ext
-            if filename_no_ext in filenames:
-                result[filename_no_ext] = doc.get("TRANSCRIPT", "")
+        # Documents ingested before FILE_STEM existed (until utils.backfill_file_stem has run)
+        missing = [fn for fn in filenames if fn not in result]
+        if missing:
+            result.update(await _get_legacy_transcripts_content(coll, missing))
 
         # If MongoDB returned empty or missing files, fall back to local samples
         if not result:
             print(f"LOG:\tNo results from MongoDB, falling back to local samples")
-            return _load_from_samples(filenames)
+            return await _load_from_samples(filenames)
 
         return result
 
     except Exception as e:
         print(f"LOG:\tFailed to fetch transcript content: {e}")
-        return _load_from_samples(filenames)
+        return await _load_from_samples(filenames)
+
+
+async def _get_legacy_transcripts_content(coll, filenames: list[str]):
+    """
+    Regex lookup on FILE for documents without FILE_STEM.
+    The `$exists: False` clause reads them through the FILE_STEM index's null
+    entries, so once the backfill has run this costs one index probe.
+    """
+    escaped_filenames = [re.escape(fn) for fn in filenames]
+    regex_pattern = f"^({'|'.join(escaped_filenames)})\\."
+
+    cursor = coll.find(
+        {"FILE": {"$regex": regex_pattern}, "FILE_STEM": {"$exists": False}},
+        {"FILE": 1, "TRANSCRIPT": 1}
+    )
+    documents = await cursor.to_list(length=None)
+    if documents:
+        print(f"LOG:\t{len(documents)} transcripts without FILE_STEM - run `python -m utils.backfill_file_stem`")
+    return {
+        file_stem(doc["FILE"]): doc.get("TRANSCRIPT", "")
+        for doc in documents
+        if file_stem(doc["FILE"]) in filenames
+    }
+
+
+async def load_content_hashes_async(database: str, collection: str):
+    """
+    Content hash of every transcript, without transferring the TRANSCRIPT text
+    (to find what an index must refresh).
+
+    Returns: dict mapping filename (without extension) -> stored content_hash,
+    None for documents written before content hashes were stored
+    """
+    try:
+        client = get_motor_client()
+        coll = client[database][collection]
+
+        cursor = coll.find({}, {"_id": 0, "FILE": 1, "FILE_STEM": 1, "content_hash": 1})
+        documents = await cursor.to_list(length=None)
+
+        if documents:
+            return {doc.get("FILE_STEM") or file_stem(doc["FILE"]): doc.get("content_hash") for doc in documents}
+        else:
+            raise Exception("Collection is empty! -> Load local samples")
+
+    except Exception as e:
+        print(f"LOG:\tAsync content hash load failed: {e}")
+        return {stem: content_hash(text) for stem, text in (await get_local_corpus_async()).contents.items()}
 
 
 # Keep synchronous version for local development/fallback
 def load_transcripts(database, collection):
-    """Synchronous version - used as fallback."""
-    uri = os.getenv("MONGODB_URI")
-    client = MongoClient(uri, server_api=ServerApi("1"))
-
+    """Synchronous version - used as fallback (shares the process-wide client, no per-call connect and ping)."""
     try:
-        client.admin.command("ping")
-        collection = client[database][collection]
+        collection = get_sync_client()[database][collection]
         documents = [doc for doc in collection.find()]
         if len(documents) > 0:
             return documents
@@ -119,31 +167,28 @@ def load_transcripts(database, collection):
 
     except Exception as e:
         print(e)
-        with open("data/samples.json", "r") as f:
-            return json.load(f)
+        return list(get_local_corpus().documents)
 
 
-def build_navigation(transcripts):
-    """Build navigation tree from transcript metadata."""
-    transcript_nav = {}
-    for transcript in transcripts:
-        country = transcript["COUNTRY"]
-        project = transcript["PROJECT"] + " - " + str(transcript["NAME"])
-        record = transcript["FILE"][:-4]
+def navigation_entry(transcript) -> tuple[str, str, str]:
+    """(country, project label, record) of a transcript in the navigation tree."""
+    return transcript["COUNTRY"], transcript["PROJECT"] + " - " + str(transcript["NAME"]), file_stem(transcript["FILE"])
 
-        if country not in transcript_nav.keys():
-            transcript_nav[country] = {}
 
-        if project not in transcript_nav[country].keys():
-            transcript_nav[country][project] = []
+def navigation_tree(entries) -> dict:
+    """Group (country, project, record) entries in one pass, then sort each level once."""
+    tree = {}
+    for country, project, record in entries:
+        tree.setdefault(country, {}).setdefault(project, set()).add(record)
+    return {
+        country: {project: sorted(tree[country][project]) for project in sorted(tree[country])}
+        for country in sorted(tree)
+    }
 
-        if record not in transcript_nav[country][project]:
-            transcript_nav[country][project].append(record)
-            transcript_nav[country][project] = sorted(transcript_nav[country][project])
 
-    # Sort by country
-    transcript_nav = {k: transcript_nav[k] for k in sorted(transcript_nav)}
-    return transcript_nav
+def build_navigation(transcripts):
+    """Build navigation tree from transcript metadata."""
+    return navigation_tree(navigation_entry(transcript) for transcript in transcripts)
 
 
 def parse_transcript(transcript_text: str) -> list[dict]:
@@ -153,29 +198,25 @@ def parse_transcript(transcript_text: str) -> list[dict]:
     Format: [00:00:00 - 00:00:21] Speaker Name : Text content...
 
     Returns list of dicts with keys: start_time, end_time, speaker, text
+    (see `lib.transcript_parser` for the lazy and columnar forms)
     """
-    # Pattern to match: [HH:MM:SS - HH:MM:SS] Speaker : Text
-    pattern = r'\[(\d{2}:\d{2}:\d{2})\s*-\s*(\d{2}:\d{2}:\d{2})\]\s*([^:]+?)\s*:\s*(.+?)(?=\[\d{2}:\d{2}:\d{2}|$)'
+    return [
+        {"start_time": start, "end_time": end, "speaker": speaker, "text": text}
+        for start, end, speaker, text in iter_raw_segments(transcript_text)
+    ]
+
 
-    segments = []
-    matches = re.findall(pattern, transcript_text, re.DOTALL)
+def timestamp_to_ms(timestamp: str) -> int:
+    """Convert an HH:MM:SS transcript timestamp to milliseconds."""
+    hours, minutes, seconds = timestamp.split(":")
+    return (int(hours) * 3600 + int(minutes) * 60 + int(seconds)) * 1000
 
-    for match in matches:
-        start_time, end_time, speaker, text = match
-        segments.append({
-            "start_time": start_time,
-            "end_time": end_time,
-            "speaker": speaker.strip(),
-            "text": text.strip()
-        })
 
-    return segments
+def content_hash(text: str) -> str:
+    """Stable hash of transcript content, used to detect changed documents."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
 def get_unique_speakers(segments: list[dict]) -> list[str]:
-    """Extract unique speakers from transcript segments."""
-    speakers = []
-    for seg in segments:
-        if seg["speaker"] not in speakers:
-            speakers.append(seg["speaker"])
-    return speakers
+    """Extract unique speakers from transcript segments, in order of appearance."""
+    return list(dict.fromkeys(seg["speaker"] for seg in segments))
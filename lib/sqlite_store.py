@@ -0,0 +1,261 @@
+"""
+SQLite transcript store for single-box deployments and tests without MongoDB.
+
+Transcripts are parsed on write: `transcripts` holds one row per FILE stem
+(navigation fields, metadata as JSON, text, content hash, speakers, segment count) and
+`segments` one row per segment, indexed by an external-content FTS5 table
+kept in sync by triggers. Reader pages are range reads on (stem, i) and
+keyword search is FTS5 `MATCH` ranked by its built-in BM25, all in process.
+
+sqlite3 calls block, so every operation runs in a worker thread with its own
+connection (WAL mode lets readers proceed during a write). An empty database
+is seeded from the local samples before its first use, whether or not
+`prepare` ran (LAZY_STARTUP skips it).
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from lib.local_corpus import get_local_corpus
+from lib.retrieval import tokenize
+from lib.sources import content_hash, file_stem, navigation_tree
+from lib.store import TranscriptStore
+from lib.transcript_parser import Segment, SegmentTable, parse_columnar
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    stem TEXT PRIMARY KEY,
+    country TEXT,
+    project TEXT,
+    name TEXT,
+    metadata TEXT NOT NULL,
+    transcript TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    speakers TEXT NOT NULL,
+    segment_count INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    stem TEXT NOT NULL,
+    i INTEGER NOT NULL,
+    start_s INTEGER NOT NULL,
+    end_s INTEGER NOT NULL,
+    speaker TEXT NOT NULL,
+    text TEXT NOT NULL,
+    UNIQUE (stem, i)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+    text, content='segments', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS segments_ai AFTER INSERT ON segments BEGIN
+    INSERT INTO segments_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS segments_ad AFTER DELETE ON segments BEGIN
+    INSERT INTO segments_fts(segments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+
+class SQLiteTranscriptStore(TranscriptStore):
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._seed_lock = threading.Lock()
+        self._seeded = False
+        self._navigation = (None, None, 0)  # (version, tree, count)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, mode=0o700, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        if not self._seeded:
+            self._seed(conn)
+        return conn
+
+    async def _run(self, fn, *args):
+        return await asyncio.to_thread(fn, *args)
+
+    # Seed an empty database from the local samples, once per process
+
+    def _seed(self, conn):
+        with self._seed_lock:
+            if self._seeded:
+                return
+            (count,) = conn.execute("SELECT count(*) FROM transcripts").fetchone()
+            if not count:
+                written = self._write(conn, get_local_corpus().documents)
+                print(f"LOG:\tSeeded {written} transcripts into {self.path} from the local samples")
+            self._seeded = True
+
+    async def prepare(self):
+        await self._run(self._connection)
+
+    # Reads
+
+    def _list_metadata(self) -> list[dict]:
+        rows = self._connection().execute("SELECT metadata FROM transcripts ORDER BY stem")
+        return [json.loads(metadata) for (metadata,) in rows]
+
+    async def list_metadata(self) -> list[dict]:
+        return await self._run(self._list_metadata)
+
+    def _navigation_state(self):
+        conn = self._connection()
+        version = conn.execute("SELECT max(updated_at), count(*) FROM transcripts").fetchone()
+        if version != self._navigation[0]:
+            rows = conn.execute("SELECT country, project || ' - ' || name, stem FROM transcripts")
+            tree = navigation_tree(rows)
+            self._navigation = (version, tree, version[1])
+        return self._navigation
+
+    async def navigation(self) -> tuple[dict, int, object]:
+        version, tree, count = await self._run(self._navigation_state)
+        return tree, count, version
+
+    def _get_contents(self, stems: list[str]) -> dict:
+        stems = list(dict.fromkeys(stems))
+        placeholders = ",".join("?" * len(stems))
+        rows = self._connection().execute(
+            f"SELECT stem, transcript FROM transcripts WHERE stem IN ({placeholders})", stems
+        )
+        return dict(rows)
+
+    async def get_contents(self, stems: list[str]) -> dict:
+        if not stems:
+            return {}
+        return await self._run(self._get_contents, stems)
+
+    def _get_parsed(self, stems: list[str]) -> dict:
+        stems = list(dict.fromkeys(stems))
+        placeholders = ",".join("?" * len(stems))
+        conn = self._connection()
+        parsed = {
+            stem: {"segments": SegmentTable(), "content_hash": digest}
+            for stem, digest in conn.execute(f"SELECT stem, content_hash FROM transcripts WHERE stem IN ({placeholders})", stems)
+        }
+        rows = conn.execute(
+            f"SELECT stem, start_s, end_s, speaker, text FROM segments WHERE stem IN ({placeholders}) ORDER BY stem, i", stems
+        )
+        for stem, start, end, speaker, text in rows:
+            parsed[stem]["segments"].append(start, end, speaker, text)
+        for data in parsed.values():
+            data["speakers"] = data["segments"].speakers
+        return parsed
+
+    async def get_parsed_transcripts(self, stems: list[str]) -> dict:
+        if not stems:
+            return {}
+        return await self._run(self._get_parsed, stems)
+
+    def _content_hashes(self) -> dict:
+        return dict(self._connection().execute("SELECT stem, content_hash FROM transcripts"))
+
+    async def content_hashes(self) -> dict:
+        return await self._run(self._content_hashes)
+
+    def _get_segments(self, stem: str, offset: int, limit: int):
+        conn = self._connection()
+        header = conn.execute("SELECT speakers, segment_count, content_hash FROM transcripts WHERE stem = ?", (stem,)).fetchone()
+        if header is None:
+            return None
+        rows = conn.execute(
+            "SELECT start_s, end_s, speaker, text FROM segments WHERE stem = ? AND i >= ? AND i < ? ORDER BY i",
+            (stem, offset, offset + limit),
+        )
+        return {
+            "metadata": {"NAME": stem},
+            "segments": [Segment(*row) for row in rows],
+            "speakers": json.loads(header[0]),
+            "total": header[1],
+            "content_hash": header[2],
+        }
+
+    async def get_segments(self, stem: str, offset: int, limit: int):
+        return await self._run(self._get_segments, stem, max(offset, 0), max(limit, 0))
+
+    def _search(self, query: str, limit: int) -> list[dict]:
+        terms = tokenize(query)
+        if not terms:
+            return []
+        match = " OR ".join(f'"{term}"' for term in dict.fromkeys(terms))
+        rows = self._connection().execute(
+            "SELECT s.stem, s.start_s, s.end_s, s.speaker, s.text, bm25(segments_fts) AS rank"
+            " FROM segments_fts JOIN segments s ON s.id = segments_fts.rowid"
+            " WHERE segments_fts MATCH ? ORDER BY rank LIMIT ?",
+            (match, limit),
+        )
+        return [
+            {
+                "filename": stem,
+                "start_ms": start * 1000,
+                "end_ms": end * 1000,
+                "speaker": speaker,
+                "text": text,
+                "score": round(-rank, 4),
+            }
+            for stem, start, end, speaker, text, rank in rows
+        ]
+
+    async def search(self, query: str, limit: int = 20) -> list[dict]:
+        return await self._run(self._search, query, limit)
+
+    # Writes
+
+    def _put(self, documents: list[dict]) -> int:
+        return self._write(self._connection(), documents)
+
+    def _write(self, conn, documents: list[dict]) -> int:
+        written = 0
+        with self._write_lock, conn:
+            for doc in documents:
+                stem = file_stem(doc["FILE"])
+                text = doc.get("TRANSCRIPT", "")
+                digest = content_hash(text)
+                stored = conn.execute("SELECT content_hash FROM transcripts WHERE stem = ?", (stem,)).fetchone()
+                if stored is not None and stored[0] == digest:
+                    continue
+
+                segments = parse_columnar(text)
+                metadata = {k: v for k, v in doc.items() if k not in ("TRANSCRIPT", "_id")}
+                conn.execute("DELETE FROM segments WHERE stem = ?", (stem,))
+                conn.executemany(
+                    "INSERT INTO segments (stem, i, start_s, end_s, speaker, text) VALUES (?, ?, ?, ?, ?, ?)",
+                    ((stem, i, seg.start, seg.end, seg.speaker, seg.text) for i, seg in enumerate(segments)),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        stem, doc.get("COUNTRY"), doc.get("PROJECT"), str(doc.get("NAME")),
+                        json.dumps(metadata, default=str), text, digest,
+                        json.dumps(segments.speakers), len(segments), time.time(),
+                    ),
+                )
+                written += 1
+        return written
+
+    async def put_transcripts(self, documents: list[dict]) -> int:
+        return await self._run(self._put, documents)
+
+    def _delete(self, stems: list[str]) -> int:
+        conn = self._connection()
+        with self._write_lock, conn:
+            removed = 0
+            for stem in stems:
+                conn.execute("DELETE FROM segments WHERE stem = ?", (stem,))
+                removed += conn.execute("DELETE FROM transcripts WHERE stem = ?", (stem,)).rowcount
+        return removed
+
+    async def delete_transcripts(self, stems: list[str]) -> int:
+        return await self._run(self._delete, stems)
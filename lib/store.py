@@ -0,0 +1,87 @@
+"""
+Transcript storage backends.
+
+`TranscriptStore` is what the app needs from storage: metadata listing and
+navigation, content by FILE stem, whole transcripts as the segments parsed
+on write (for map retrieval and the search indexes) and the content hashes
+those indexes refresh from, segment ranges for the reader, keyword search
+over segments, and writes. `get_store()` returns the backend chosen by
+`TRANSCRIPT_STORE`:
+
+- "mongo": MongoDB through Motor (`lib.mongo_store`), with the local samples
+  as fallback
+- "sqlite": a local SQLite database with an FTS5 segment index
+  (`lib.sqlite_store`), for single-box deployments and tests without MongoDB
+
+Both pass `benchmarks/store_contract.py` and are compared by `benchmarks/bench_store.py`.
+"""
+from abc import ABC, abstractmethod
+
+from config import TRANSCRIPT_STORE, SQLITE_PATH
+
+
+class TranscriptStore(ABC):
+    """Storage backend for transcripts. Stems are FILE names without the extension."""
+
+    @abstractmethod
+    async def prepare(self):
+        """Create indexes/schema; called once at startup."""
+
+    @abstractmethod
+    async def list_metadata(self) -> list[dict]:
+        """Every transcript's metadata, without TRANSCRIPT."""
+
+    @abstractmethod
+    async def navigation(self) -> tuple[dict, int, object]:
+        """(country -> project -> records tree, transcript count, version that changes with the tree)."""
+
+    @abstractmethod
+    async def get_contents(self, stems: list[str]) -> dict:
+        """stem -> transcript text, for the stems that exist."""
+
+    @abstractmethod
+    async def get_parsed_transcripts(self, stems: list[str]) -> dict:
+        """
+        stem -> {'segments' (a `SegmentTable` of every segment), 'speakers', 'content_hash'},
+        for the stems that exist: the segments parsed on write, so readers do not parse TRANSCRIPT.
+        """
+
+    @abstractmethod
+    async def content_hashes(self) -> dict:
+        """stem -> content hash of every transcript (None if not stored), without the text; indexes refresh from it."""
+
+    @abstractmethod
+    async def get_segments(self, stem: str, offset: int, limit: int):
+        """
+        Segments `[offset, offset + limit)` of a transcript.
+        Returns dict with 'metadata', 'segments' (`Segment`s), 'speakers', 'total' and 'content_hash'
+        (of the whole transcript, None if unknown) keys, or None if not found.
+        """
+
+    @abstractmethod
+    async def search(self, query: str, limit: int = 20) -> list[dict]:
+        """Best matching segments: dicts with filename, start_ms, end_ms, speaker, text, score."""
+
+    @abstractmethod
+    async def put_transcripts(self, documents: list[dict]) -> int:
+        """Insert or replace transcript documents (FILE, TRANSCRIPT and metadata); unchanged ones are skipped. Returns the count written."""
+
+    @abstractmethod
+    async def delete_transcripts(self, stems: list[str]) -> int:
+        """Remove transcripts by stem. Returns the count removed."""
+
+
+_store: TranscriptStore = None
+
+
+def get_store() -> TranscriptStore:
+    """The configured transcript store (created on first use)."""
+    global _store
+    if _store is None:
+        if TRANSCRIPT_STORE == "sqlite":
+            from lib.sqlite_store import SQLiteTranscriptStore
+            _store = SQLiteTranscriptStore(SQLITE_PATH)
+        else:
+            from lib.mongo_store import MongoTranscriptStore
+            _store = MongoTranscriptStore()
+    return _store
@@ -0,0 +1,63 @@
+"""
+Token estimates and per-model token budgets.
+
+Estimates are a fast local heuristic (no tokenizer download): about four
+UTF-8 bytes per token, i.e. four characters of English prose, and
+proportionally more tokens for accented or non-Latin text. It errs on the
+high side for the models offered in `config.MODELS`.
+"""
+import math
+from dataclasses import dataclass
+
+from config import MODEL_REQUEST_TOKEN_LIMIT
+
+BYTES_PER_TOKEN = 4
+
+
+@dataclass(frozen=True)
+class ModelBudget:
+    context_window: int  # prompt + completion
+    max_output_tokens: int  # largest completion the model accepts
+
+    @property
+    def request_tokens(self) -> int:
+        """Prompt + completion allowed in one request (MODEL_REQUEST_TOKEN_LIMIT caps it, e.g. for rate-limited accounts)."""
+        if MODEL_REQUEST_TOKEN_LIMIT:
+            return min(self.context_window, MODEL_REQUEST_TOKEN_LIMIT)
+        return self.context_window
+
+
+# Per model id, from the Groq model docs
+MODEL_BUDGETS = {
+    "qwen/qwen3-32b": ModelBudget(131_072, 40_960),
+    "meta-llama/llama-guard-4-12b": ModelBudget(131_072, 1_024),
+    "openai/gpt-oss-120b": ModelBudget(131_072, 65_536),
+    "openai/gpt-oss-20b": ModelBudget(131_072, 65_536),
+    "meta-llama/llama-4-maverick-17b-128e-instruct": ModelBudget(131_072, 8_192),
+    "meta-llama/llama-4-scout-17b-16e-instruct": ModelBudget(131_072, 8_192),
+    "moonshotai/kimi-k2-instruct-0905": ModelBudget(262_144, 16_384),
+}
+DEFAULT_BUDGET = ModelBudget(32_768, 1_024)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a text."""
+    return math.ceil(len(text.encode("utf-8")) / BYTES_PER_TOKEN)
+
+
+def clip_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut a text to about `max_tokens` tokens."""
+    data = text.encode("utf-8")
+    if len(data) <= max_tokens * BYTES_PER_TOKEN:
+        return text
+    return data[: max_tokens * BYTES_PER_TOKEN].decode("utf-8", "ignore")
+
+
+def model_budget(model: str) -> ModelBudget:
+    """Token budget of a model, with a conservative default for unknown ids."""
+    return MODEL_BUDGETS.get(model, DEFAULT_BUDGET)
+
+
+def context_window(model: str) -> int:
+    """Tokens available to one request of a model (its context window, unless capped)."""
+    return model_budget(model).request_tokens
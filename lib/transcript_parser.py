@@ -0,0 +1,153 @@
+"""
+Single-pass transcript parser.
+
+Format: [00:00:00 - 00:00:21] Speaker Name : Text content...
+
+The header pattern is compiled once and the text is scanned in a single
+`finditer` pass: each segment's text runs from the end of its header to the
+next `[HH:MM:SS` (normally the next header, or the end of the transcript).
+Segments can be consumed lazily with `iter_segments`, or collected into a
+columnar `SegmentTable`: start/end times as integer seconds in `array`s,
+speakers interned once and referenced by index.
+
+Compared with the original `findall` regex, segments are the same (checked
+over data/samples.json by benchmarks/bench_parser.py), including segments
+with empty text, with one exception: a header with no text directly followed
+by another header is an empty segment here, where the regex swallowed the
+next header into its text. `iter_raw_segments` keeps the timestamps as
+written; the integer forms render them back canonically (`format_timestamp`),
+which only differs for out-of-range minutes or seconds such as 00:75:00.
+"""
+import re
+import sys
+from array import array
+
+_HEADER = re.compile(r"\[(\d{2}):(\d{2}):(\d{2})\s*-\s*(\d{2}):(\d{2}):(\d{2})\]\s*([^:]+?)\s*:\s*")
+_NEXT_TIMESTAMP = re.compile(r"\[\d{2}:\d{2}:\d{2}")
+
+
+def format_timestamp(seconds: int) -> str:
+    """Integer seconds to the transcript's HH:MM:SS form."""
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def _iter_headers(transcript_text: str):
+    """Yield (header match, text) for each segment, in order."""
+    headers = _HEADER.finditer(transcript_text)
+    header = next(headers, None)
+    while header is not None:
+        following = next(headers, None)
+        start = header.end()
+        end = following.start() if following is not None else len(transcript_text)
+        # Text also stops at a stray timestamp that does not open a full header
+        if transcript_text.find("[", start, end) != -1:
+            stray = _NEXT_TIMESTAMP.search(transcript_text, start, end)
+            if stray:
+                end = stray.start()
+        yield header, transcript_text[start:end].strip()
+        header = following
+
+
+def iter_segments(transcript_text: str):
+    """Yield (start_seconds, end_seconds, speaker, text) for each segment, in order."""
+    for header, text in _iter_headers(transcript_text):
+        h1, m1, s1, h2, m2, s2, speaker = header.groups()
+        yield (
+            int(h1) * 3600 + int(m1) * 60 + int(s1),
+            int(h2) * 3600 + int(m2) * 60 + int(s2),
+            speaker.strip(),
+            text,
+        )
+
+
+def iter_raw_segments(transcript_text: str):
+    """Yield (start_time, end_time, speaker, text) for each segment, timestamps as written."""
+    for header, text in _iter_headers(transcript_text):
+        h1, m1, s1, h2, m2, s2, speaker = header.groups()
+        yield f"{h1}:{m1}:{s1}", f"{h2}:{m2}:{s2}", speaker.strip(), text
+
+
+class Segment:
+    """One transcript segment; times are integer seconds."""
+
+    __slots__ = ("start", "end", "speaker", "text")
+
+    def __init__(self, start: int, end: int, speaker: str, text: str):
+        self.start = start
+        self.end = end
+        self.speaker = speaker
+        self.text = text
+
+    @property
+    def start_time(self) -> str:
+        return format_timestamp(self.start)
+
+    @property
+    def end_time(self) -> str:
+        return format_timestamp(self.end)
+
+    def as_dict(self) -> dict:
+        """The dict form returned by `lib.sources.parse_transcript`."""
+        return {"start_time": self.start_time, "end_time": self.end_time, "speaker": self.speaker, "text": self.text}
+
+
+class SegmentTable:
+    """
+    Columnar transcript segments: parallel arrays plus an interned speaker table.
+
+    starts/ends: integer seconds; speaker_ids: index into `speakers` (in order of
+    first appearance); texts: segment text.
+    """
+
+    __slots__ = ("starts", "ends", "speaker_ids", "speakers", "texts", "_speaker_index")
+
+    def __init__(self):
+        self.starts = array("I")
+        self.ends = array("I")
+        self.speaker_ids = array("I")
+        self.speakers: list[str] = []
+        self.texts: list[str] = []
+        self._speaker_index: dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.texts)
+
+    def append(self, start: int, end: int, speaker: str, text: str):
+        speaker_id = self._speaker_index.get(speaker)
+        if speaker_id is None:
+            speaker_id = self._speaker_index[speaker] = len(self.speakers)
+            self.speakers.append(speaker)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.speaker_ids.append(speaker_id)
+        self.texts.append(text)
+
+    def __getitem__(self, i):
+        """A `Segment`, or a list of them for a slice (built on demand, only for that page)."""
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return Segment(self.starts[i], self.ends[i], self.speakers[self.speaker_ids[i]], self.texts[i])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def as_dict(self, i: int) -> dict:
+        """Segment `i` in the dict form returned by `lib.sources.parse_transcript`."""
+        return self[i].as_dict()
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the table, for cache budgets."""
+        return (
+            sys.getsizeof(self.starts) + sys.getsizeof(self.ends) + sys.getsizeof(self.speaker_ids)
+            + sys.getsizeof(self.texts) + sum(sys.getsizeof(t) for t in self.texts)
+            + sum(sys.getsizeof(s) for s in self.speakers)
+        )
+
+
+def parse_columnar(transcript_text: str) -> SegmentTable:
+    """Parse a transcript into a `SegmentTable` in one pass."""
+    table = SegmentTable()
+    for start, end, speaker, text in iter_segments(transcript_text):
+        table.append(start, end, speaker, text)
+    return table
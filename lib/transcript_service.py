@@ -1,51 +1,28 @@
-from lib.sources import get_transcripts_content_async, parse_transcript, get_unique_speakers
-from config import DB_NAME, COLLECTION_NAME
+from lib.cache import LRUCache
+from lib.sources import content_hash, get_transcripts_content_async
+from lib.transcript_parser import parse_columnar
+from config import DB_NAME, COLLECTION_NAME, TRANSCRIPT_CACHE_MAX_BYTES, TRANSCRIPT_CACHE_TTL
 
 
-# Transcript content cache (LRU-style)
-_TRANSCRIPT_CACHE_MAX = 8
-_transcript_cache: dict[str, dict] = {}
-_transcript_cache_order: list[str] = []
+# Parsed transcripts are bounded by estimated memory rather than count
+_TRANSCRIPT_CACHE_MAX = 256
 
 
-def _cache_get(filename: str):
-    if filename not in _transcript_cache:
-        return None
-    # refresh LRU-ish order
-    try:
-        _transcript_cache_order.remove(filename)
-    except ValueError:
-        pass
-    _transcript_cache_order.append(filename)
-    return _transcript_cache[filename]
-
-
-def _cache_set(filename: str, value: dict):
-    if filename in _transcript_cache:
-        _transcript_cache[filename] = value
-        try:
-            _transcript_cache_order.remove(filename)
-        except ValueError:
-            pass
-        _transcript_cache_order.append(filename)
-        return
-
-    _transcript_cache[filename] = value
-    _transcript_cache_order.append(filename)
-    while len(_transcript_cache_order) > _TRANSCRIPT_CACHE_MAX:
-        evict = _transcript_cache_order.pop(0)
-        _transcript_cache.pop(evict, None)
+def _payload_size(payload: dict) -> int:
+    """Approximate memory held by a parsed transcript payload."""
+    return payload["segments"].nbytes()
 
 
-async def get_parsed_transcript(filename: str):
-    """
-    Fetch and parse a transcript, with LRU caching.
-    Returns dict with 'metadata', 'segments', and 'speakers' keys, or None if not found.
-    """
-    cached = _cache_get(filename)
-    if cached:
-        return cached
+_transcript_cache = LRUCache(
+    _TRANSCRIPT_CACHE_MAX,
+    ttl=TRANSCRIPT_CACHE_TTL,
+    name="parsed_transcripts",
+    max_bytes=TRANSCRIPT_CACHE_MAX_BYTES,
+    sizeof=_payload_size,
+)
+
 
+async def _load_parsed_transcript(filename: str):
     contents = await get_transcripts_content_async(DB_NAME, COLLECTION_NAME, [filename])
     if filename not in contents:
         return None
@@ -53,9 +30,25 @@ async def get_parsed_transcript(filename: str):
     transcript_text = contents[filename]
     metadata = {"NAME": filename}
 
-    segments = parse_transcript(transcript_text)
-    speakers = get_unique_speakers(segments)
+    segments = parse_columnar(transcript_text)
+
+    return {"metadata": metadata, "segments": segments, "speakers": segments.speakers, "content_hash": content_hash(transcript_text)}
+
+
+async def get_parsed_transcript(filename: str):
+    """
+    Fetch and parse a transcript, with LRU caching.
+    Concurrent calls for the same uncached filename share a single fetch and parse.
+    Returns dict with 'metadata', 'segments' (a columnar SegmentTable), 'speakers' and 'content_hash' keys, or None if not found.
+    """
+    return await _transcript_cache.get_or_load(filename, lambda: _load_parsed_transcript(filename))
+
+
+def peek_parsed_transcript(filename: str):
+    """Parsed transcript if it is already cached, without fetching it."""
+    return _transcript_cache.get(filename)
+
 
-    payload = {"metadata": metadata, "segments": segments, "speakers": speakers}
-    _cache_set(filename, payload)
-    return payload
+def forget_parsed_transcript(filename: str):
+    """Drop a cached transcript after it was rewritten or deleted."""
+    _transcript_cache.pop(filename)
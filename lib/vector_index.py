@@ -0,0 +1,322 @@
+"""
+Embedding-based vector index over segment-aligned transcript chunks.
+
+Chunks come from `lib.retrieval.chunk_segments`. Their embeddings are stored as
+a float32 matrix in `<path>.f32`, memory-mapped on load, with the chunk
+metadata in `<path>.json` next to it. Search is a NumPy dot product over the
+L2-normalized rows (exact), or an IVF approximation for large collections:
+rows are clustered with k-means and a query only scans the `nprobe` closest
+clusters.
+
+The embedding function is pluggable through EMBEDDING_FUNCTION ("hashing" or
+"module:function"); it takes a list of texts and returns an (n, dim) array.
+"""
+import asyncio
+import importlib
+import json
+import os
+import re
+import tempfile
+import time
+import zlib
+
+import numpy as np
+
+from lib.locks import LoopLock
+from lib.retrieval import Chunk, chunk_segments, document_hash, document_segments
+from lib.sources import timestamp_to_ms
+from config import (
+    EMBEDDING_FUNCTION,
+    EMBEDDING_DIM,
+    VECTOR_INDEX_PATH,
+    VECTOR_ANN_THRESHOLD,
+    SEARCH_INDEX_REFRESH,
+    RAG_CHUNK_CHARS,
+)
+
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Bump when the on-disk layout changes; older files are rebuilt
+INDEX_VERSION = 2
+
+
+def hashing_embed(texts: list[str], dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """
+    Local, dependency-free embedding: signed feature hashing of words and word
+    bigrams with sublinear term frequency, L2-normalized.
+    """
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        words = [w for w in _WORD_PATTERN.findall(text.lower()) if len(w) > 1]
+        features = words + [a + " " + b for a, b in zip(words, words[1:])]
+        for feature in features:
+            h = zlib.crc32(feature.encode("utf-8"))
+            matrix[row, h % dim] += 1.0 if h & 0x80000000 else -1.0
+    np.copysign(np.log1p(np.abs(matrix)), matrix, out=matrix)
+    return _normalize(matrix)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+def get_embedder():
+    """Resolve EMBEDDING_FUNCTION to a callable taking a list of texts."""
+    if EMBEDDING_FUNCTION == "hashing":
+        return hashing_embed
+    module, _, name = EMBEDDING_FUNCTION.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def embed(texts: list[str]) -> np.ndarray:
+    """Embed texts with the configured function, as normalized float32 rows."""
+    if not texts:
+        return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+    return _normalize(np.asarray(get_embedder()(texts), dtype=np.float32))
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first."""
+    if k >= len(scores):
+        return np.argsort(-scores)
+    best = np.argpartition(-scores, k)[:k]
+    return best[np.argsort(-scores[best])]
+
+
+def kmeans(matrix: np.ndarray, clusters: int, iterations: int = 8, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Spherical k-means on normalized rows. Returns (centroids, assignments)."""
+    rng = np.random.default_rng(seed)
+    centroids = matrix[rng.choice(len(matrix), clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(matrix @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, matrix)
+        empty = ~sums.any(axis=1)
+        sums[empty] = centroids[empty]
+        centroids = _normalize(sums)
+    return centroids, np.argmax(matrix @ centroids.T, axis=1)
+
+
+class VectorIndex:
+    """Chunk embeddings with exact and IVF search, persisted as <path>.f32 + <path>.json."""
+
+    def __init__(self, matrix=None, chunks=None, documents=None):
+        self.matrix = matrix if matrix is not None else np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        # Chunk metadata per row, the record /search returns in either mode:
+        # filename, start_ms, end_ms, speaker, text
+        self.chunks: list[dict] = chunks or []
+        # stem -> {"hash": content hash, "first": first row, "end": end row}
+        self.documents: dict[str, dict] = documents or {}
+        self._by_hash = {doc["hash"]: doc for doc in self.documents.values()}
+        self._ivf = None
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def stale(self, hashes: dict) -> tuple[list[str], list[str]]:
+        """
+        Documents to refresh given the corpus' content hashes (stem -> hash, None if unknown).
+
+        Documents keep the hash computed when they were embedded, so one
+        without a stored hash is only embedded once, not on every refresh.
+
+        Returns (stems to fetch and update, indexed stems no longer in the corpus).
+        """
+        changed = [
+            stem for stem, digest in hashes.items()
+            if (stem not in self.documents if digest is None else self.documents.get(stem, {}).get("hash") != digest)
+        ]
+        removed = [stem for stem in self.documents if stem not in hashes]
+        return changed, removed
+
+    def update(self, contents: dict, removed: list[str] = None) -> tuple[int, int]:
+        """
+        Rebuild the rows for `contents` (stem -> transcript text, or parsed as by
+        `TranscriptStore.get_parsed_transcripts`), embedding only added or changed transcripts.
+
+        Without `removed`, `contents` is the whole corpus and indexed documents
+        missing from it are removed; with it, `contents` only holds the new or
+        changed documents (see `stale`).
+
+        Returns (added_or_changed, removed) document counts.
+        """
+        hashes = {stem: document_hash(document) for stem, document in contents.items()}
+        changed = [stem for stem, digest in hashes.items() if self.documents.get(stem, {}).get("hash") != digest]
+        if removed is None:
+            removed = [stem for stem in self.documents if stem not in contents]
+        removed = [stem for stem in removed if stem in self.documents and stem not in contents]
+        if not changed and not removed:
+            return 0, 0
+
+        new_chunks = {}
+        for stem in changed:
+            new_chunks[stem] = chunk_segments([segment.as_dict() for segment in document_segments(contents[stem])], RAG_CHUNK_CHARS)
+        fresh = embed([c.text for stem in changed for c in new_chunks[stem]])
+
+        blocks, chunks, documents = [], [], {}
+        offset = 0
+        kept = [stem for stem in self.documents if stem not in removed]
+        for stem in kept + [stem for stem in contents if stem not in self.documents]:
+            if stem in new_chunks:
+                rows = fresh[offset: offset + len(new_chunks[stem])]
+                offset += len(new_chunks[stem])
+                metadata = [
+                    {
+                        "filename": stem,
+                        "start_ms": timestamp_to_ms(c.start_time),
+                        "end_ms": timestamp_to_ms(c.end_time),
+                        "speaker": c.speaker,
+                        "text": c.text,
+                    }
+                    for c in new_chunks[stem]
+                ]
+            else:
+                old = self.documents[stem]
+                rows = self.matrix[old["first"]: old["end"]]
+                metadata = self.chunks[old["first"]: old["end"]]
+            documents[stem] = {"hash": hashes.get(stem) or self.documents[stem]["hash"], "first": len(chunks), "end": len(chunks) + len(metadata)}
+            blocks.append(np.asarray(rows, dtype=np.float32))
+            chunks.extend(metadata)
+
+        self.__init__(np.concatenate(blocks) if blocks else None, chunks, documents)
+        return len(changed), len(removed)
+
+    def document_rows(self, digest: str):
+        """(chunks, rows) already indexed for a transcript content hash, or None."""
+        doc = self._by_hash.get(digest)
+        if doc is None:
+            return None
+        return self.chunks[doc["first"]: doc["end"]], self.matrix[doc["first"]: doc["end"]]
+
+    def search(self, query: str, limit: int = 20, approximate: bool = None, nprobe: int = 16) -> list[dict]:
+        """
+        Chunks most similar to the query.
+
+        `approximate` defaults to IVF search above VECTOR_ANN_THRESHOLD chunks.
+        """
+        if not self.chunks:
+            return []
+        if approximate is None:
+            approximate = len(self.chunks) > VECTOR_ANN_THRESHOLD
+
+        q = embed([query])[0]
+        if approximate:
+            rows, scores = self._ivf_search(q, limit, nprobe)
+        else:
+            scores = self.matrix @ q
+            rows = top_k(scores, limit)
+            scores = scores[rows]
+
+        return [dict(self.chunks[row], score=round(float(score), 4)) for row, score in zip(rows, scores)]
+
+    def build_ivf(self, clusters: int = None):
+        """Train the IVF coarse quantizer (about sqrt(n) clusters by default)."""
+        n = len(self.chunks)
+        clusters = min(n, clusters or max(1, int(np.sqrt(n))))
+        centroids, assignments = kmeans(np.asarray(self.matrix), clusters)
+        order = np.argsort(assignments, kind="stable")
+        offsets = np.searchsorted(assignments[order], np.arange(clusters + 1))
+        self._ivf = (centroids, order, offsets)
+
+    def _ivf_search(self, q: np.ndarray, limit: int, nprobe: int):
+        if self._ivf is None:
+            self.build_ivf()
+        centroids, order, offsets = self._ivf
+        probes = top_k(centroids @ q, nprobe)
+        rows = np.concatenate([order[offsets[c]: offsets[c + 1]] for c in probes])
+        scores = self.matrix[rows] @ q
+        best = top_k(scores, limit)
+        return rows[best], scores[best]
+
+    def save(self, path: str):
+        """Write matrix and metadata atomically; the matrix is raw float32 for memory-mapping."""
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        with tempfile.NamedTemporaryFile("wb", dir=directory, delete=False) as f:
+            np.ascontiguousarray(self.matrix, dtype=np.float32).tofile(f)
+        os.replace(f.name, path + ".f32")
+        with tempfile.NamedTemporaryFile("w", dir=directory, delete=False) as f:
+            json.dump({
+                "version": INDEX_VERSION,
+                "shape": list(self.matrix.shape),
+                "embedding": EMBEDDING_FUNCTION,
+                "chunks": self.chunks,
+                "documents": self.documents,
+            }, f)
+        os.replace(f.name, path + ".json")
+
+    @classmethod
+    def load(cls, path: str):
+        """Memory-map an index saved by `save`, or None if missing, in an older format or built with another embedding."""
+        try:
+            with open(path + ".json", "r") as f:
+                metadata = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if metadata.get("version") != INDEX_VERSION:
+            return None
+        if metadata.get("embedding") != EMBEDDING_FUNCTION or metadata["shape"][1:] != [EMBEDDING_DIM]:
+            return None
+        shape = tuple(metadata["shape"])
+        matrix = np.memmap(path + ".f32", dtype=np.float32, mode="r", shape=shape) if shape[0] else None
+        return cls(matrix, metadata["chunks"], metadata["documents"])
+
+
+def rank_chunks_by_vector(question: str, chunks: list[Chunk], k: int, digest: str = None) -> list[Chunk]:
+    """
+    Return the `k` chunks most similar to the question, in transcript order.
+
+    Reuses the indexed embeddings when the transcript (by content hash) is
+    already in the loaded vector index, otherwise embeds the chunks on the fly.
+    """
+    rows = None
+    if _index is not None and digest is not None:
+        indexed = _index.document_rows(digest)
+        if indexed is not None and len(indexed[0]) == len(chunks):
+            rows = indexed[1]
+    if rows is None:
+        rows = embed([c.text for c in chunks])
+
+    scores = np.asarray(rows) @ embed([question])[0]
+    return [chunks[i] for i in sorted(top_k(scores, k))]
+
+
+# Process-wide index, refreshed at most every SEARCH_INDEX_REFRESH seconds
+_index = None
+_refreshed_at = 0.0
+_lock = LoopLock()
+
+
+async def get_vector_index(store) -> VectorIndex:
+    """Memory-map the persisted index and incrementally refresh it from the transcript store."""
+    global _index, _refreshed_at
+
+    if _index is not None and time.monotonic() - _refreshed_at < SEARCH_INDEX_REFRESH:
+        return _index
+
+    async with _lock.get():
+        if _index is not None and time.monotonic() - _refreshed_at < SEARCH_INDEX_REFRESH:
+            return _index
+
+        if _index is None:
+            index = await asyncio.to_thread(VectorIndex.load, VECTOR_INDEX_PATH) or VectorIndex()
+        else:
+            # Update a copy so searches on the current index stay consistent
+            index = VectorIndex(_index.matrix, _index.chunks, _index.documents)
+        # Only the hashes are listed; only new or changed transcripts are fetched
+        changed, removed = index.stale(await store.content_hashes())
+        contents = await store.get_parsed_transcripts(changed) if changed else {}
+        # Embedding is CPU-bound; build off the event loop, then swap in
+        added, removed = await asyncio.to_thread(index.update, contents, removed)
+        if added or removed:
+            print(f"LOG:\tVector index updated: {added} added/changed, {removed} removed")
+            try:
+                await asyncio.to_thread(index.save, VECTOR_INDEX_PATH)
+            except OSError as e:
+                print(f"LOG:\tCould not persist vector index: {e}")
+        _index = index
+        _refreshed_at = time.monotonic()
+
+    return _index
@@ -1,18 +1,30 @@
+import asyncio
 import os
-from fasthtml.svg import *
+import time
+from contextlib import aclosing
+from pathlib import Path
 from fasthtml.common import *
 from monsterui.all import *
-from lib.discussion import map_document, reduce_responses
-from lib.sources import load_transcripts_metadata_async, get_transcripts_content_async, build_navigation
-from lib.transcript_service import get_parsed_transcript
+from lib.discussion import map_document, reduce_all, run_rag, map_partials, tree_reduce, stream_reduce
+from lib.store import get_store
+from lib.navigation import cached_fragment
+from lib.rag_jobs import create_job, get_job_document
+from lib.cache import LRUCache, cache_stats
+from lib.map_cache import map_cache_stats
+from lib.db import pool_stats
+from lib.assets import STATIC_PREFIX, register_asset, get_asset
+from lib.http_cache import IMMUTABLE, etag, conditional_response, matched_etag
+from lib.compression import CompressionMiddleware
 from lib.auth import generate_magic_link, verify_token, is_email_allowed, MagicLinkRequest
-from styles import css
+from styles import CSS
 
 # Import UI components
 from components import (
     render_response,
-    PromptForm,
+    StreamingResponse,
     TranscriptsCard,
+    CountryProjects,
+    ProjectRecords,
     TranscriptSegmentRow,
     TranscriptLoadingSkeleton,
     TranscriptLoadMoreSentinel,
@@ -25,13 +37,15 @@ from components import (
 from config import (
     SESSION_SECRET,
     IS_PRODUCTION,
-    DB_NAME,
-    COLLECTION_NAME,
     MAX_SESSION_AGE,
+    NAVIGATION_LAZY,
+    LAZY_STARTUP,
+    DEFAULT_MODEL,
+    MODELS,
 )
 
 # Client-side JavaScript for transcript selection and RAG orchestration
-selection_js = Script("""
+SELECTION_JS = """
 function updateSourcesList() {
     const wrappers = document.querySelectorAll('.transcript-checkbox-wrapper');
     const checkboxes = Array.from(wrappers)
@@ -107,13 +121,111 @@ function clearHistory() {
 
 document.addEventListener('DOMContentLoaded', renderHistoryList);
 
-// Client-side RAG orchestration - parallel map, then reduce
+// Split a server-sent events frame into its event name and data
+function parseSSE(frame) {
+    let event = 'message';
+    const data = [];
+    for (const line of frame.split('\\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data.push(line.slice(6));
+    }
+    return { event, data: data.join('\\n') };
+}
+
+// Show how many documents are mapped; the last 10% of the bar is the reduce
+function showProgress(completed, count) {
+    document.getElementById('progress-text').textContent = completed < count
+        ? `${completed} / ${count} documents`
+        : 'Consolidating responses...';
+    document.getElementById('progress-bar').style.width = `${(completed / count) * 90}%`;
+}
+
+// The server maps all selected documents, then streams the answer
+async function streamRAG(query, selected, model, resultsDiv, progressDiv) {
+    const response = await fetch('/rag-stream', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'HX-Request': 'true'  // Tell FastHTML to return fragment only
+        },
+        body: new URLSearchParams({ query, selected, model })
+    });
+    
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        
+        let sep;
+        while ((sep = buffer.indexOf('\\n\\n')) !== -1) {
+            const { event, data } = parseSSE(buffer.slice(0, sep));
+            buffer = buffer.slice(sep + 2);
+            
+            if (event === 'progress') {
+                const [completed, count] = data.split('/').map(Number);
+                showProgress(completed, count);
+            } else if (event === 'answer') {
+                // Partial answer - replace the results with the latest render
+                progressDiv.style.display = 'none';
+                resultsDiv.innerHTML = data;
+            } else if (event === 'done' || event === 'error') {
+                reader.cancel();
+                return data;
+            }
+        }
+    }
+    throw new Error('Connection closed before the answer completed');
+}
+
+// Browsers without streamed response bodies orchestrate the map-reduce here:
+// one /rag-job prefetch of the selection, a bounded fan-out of /map calls
+// reading their transcript from that job, then /reduce
+const MAP_CONCURRENCY = 4;
+
+async function fanOutRAG(query, selected, model) {
+    const form = { 'Content-Type': 'application/x-www-form-urlencoded' };
+    const job = await (await fetch('/rag-job', {
+        method: 'POST', headers: form, body: new URLSearchParams({ selected })
+    })).json();
+    if (job.error) throw new Error(job.error);
+    if (!job.filenames.length) throw new Error('Selected transcripts not found');
+    
+    const responses = [];
+    let next = 0;
+    let completed = 0;
+    async function worker() {
+        while (next < job.filenames.length) {
+            const filename = job.filenames[next++];
+            const result = await (await fetch('/map', {
+                method: 'POST', headers: form,
+                body: new URLSearchParams({ query, filename, model, job_id: job.job_id })
+            })).json();
+            if (result.response) responses.push(result.response);
+            showProgress(++completed, job.filenames.length);
+        }
+    }
+    await Promise.all(Array.from({ length: MAP_CONCURRENCY }, worker));
+    if (!responses.length) throw new Error('All document processing failed');
+    
+    const reduce = await fetch('/reduce', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', 'HX-Request': 'true' },
+        body: JSON.stringify({ query, responses, model })
+    });
+    return await reduce.text();
+}
+
 async function executeRAG(event) {
     event.preventDefault();
     
     const form = event.target;
     const query = form.querySelector('#query').value;
     const selected = form.querySelector('#selected-transcripts').value;
+    const model = form.querySelector('select[name="model"]')?.value || '';
     const resultsDiv = document.getElementById('discussion-results');
     const progressDiv = document.getElementById('rag-progress');
     
@@ -122,8 +234,7 @@ async function executeRAG(event) {
         return;
     }
     
-    const filenames = selected.split(',').filter(s => s.trim());
-    const total = filenames.length;
+    const total = selected.split(',').filter(s => s.trim()).length;
     
     // Show progress UI
     progressDiv.style.display = 'flex';
@@ -140,48 +251,12 @@ async function executeRAG(event) {
     resultsDiv.innerHTML = '';
     
     try {
-        // Phase 1: Map - process all documents in parallel
-        let completed = 0;
-        const mapPromises = filenames.map(async (filename) => {
-            const response = await fetch('/map', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/x-www-form-urlencoded' },
-                body: new URLSearchParams({ query, filename })
-            });
-            const result = await response.json();
-            completed++;
-            document.getElementById('progress-text').textContent = `${completed} / ${total} documents`;
-            document.getElementById('progress-bar').style.width = `${(completed / total) * 80}%`;
-            return result;
-        });
-        
-        const mapResults = await Promise.all(mapPromises);
-        
-        // Check for errors
-        const errors = mapResults.filter(r => r.error);
-        if (errors.length === mapResults.length) {
-            throw new Error('All document processing failed');
-        }
-        
-        const responses = mapResults.filter(r => !r.error).map(r => r.response);
-        
-        // Phase 2: Reduce - consolidate responses
-        document.getElementById('progress-text').textContent = 'Consolidating responses...';
-        document.getElementById('progress-bar').style.width = '90%';
-        
-        const reduceResponse = await fetch('/reduce', {
-            method: 'POST',
-            headers: { 
-                'Content-Type': 'application/json',
-                'HX-Request': 'true'  // Tell FastHTML to return fragment only
-            },
-            body: JSON.stringify({ query, responses })
-        });
-        
-        const finalResult = await reduceResponse.text();
+        const streamed = window.ReadableStream && 'body' in Response.prototype;
+        const finalResult = streamed
+            ? await streamRAG(query, selected, model, resultsDiv, progressDiv)
+            : await fanOutRAG(query, selected, model);
         
         // Done - show results
-        document.getElementById('progress-bar').style.width = '100%';
         progressDiv.style.display = 'none';
         resultsDiv.innerHTML = finalResult;
         
@@ -198,12 +273,42 @@ async function executeRAG(event) {
         resultsDiv.innerHTML = `<div class="uk-card-secondary p-4">Error: ${error.message}. Please try again.</div>`;
     }
 }
-""")
-hdrs = (Theme.neutral.headers(apex_charts=True, highlightjs=True, daisy=True), css, selection_js)
+"""
+
+# The app's JS and CSS are served as fingerprinted files cached by the browser
+# instead of being inlined into every full page
+app_js = register_asset("app.js", SELECTION_JS, "text/javascript; charset=utf-8")
+app_css = register_asset("app.css", CSS, "text/css; charset=utf-8")
+hdrs = (
+    Theme.neutral.headers(apex_charts=True, highlightjs=True, daisy=True),
+    Link(rel="stylesheet", href=app_css.url),
+    Script(src=app_js.url),
+)
+
+
+async def _prepare_store():
+    try:
+        await get_store().prepare()
+        print("LOG:\tTranscript store ready")
+    except Exception as e:
+        print(f"LOG:\tCould not prepare the transcript store: {e}")
+
+
+_startup_tasks = set()
+
+
+async def prepare_store_on_startup():
+    """Create indexes in the background so an unreachable database does not delay startup."""
+    task = asyncio.create_task(_prepare_store())
+    _startup_tasks.add(task)
+    task.add_done_callback(_startup_tasks.discard)
+
 
 # Create your app with the theme and secure session config
 app, rt = fast_app(
     hdrs=hdrs,
+    middleware=[Middleware(CompressionMiddleware)],
+    on_startup=[] if LAZY_STARTUP else [prepare_store_on_startup],
     live=not IS_PRODUCTION,
     secret_key=SESSION_SECRET,
     sess_cookie="socioscope_session",
@@ -213,22 +318,93 @@ app, rt = fast_app(
 )
 
 
+async def static_asset(request):
+    """Fingerprinted JS/CSS: immutable for a year, 304 on revalidation."""
+    asset = get_asset(request.path_params["filename"])
+    if asset is None:
+        return Response(status_code=404)
+    return conditional_response(request, asset.body, asset.etag, asset.media_type, IMMUTABLE)
+
+
+# Ahead of FastHTML's catch-all static file route, which would look for the file on disk
+app.router.routes.insert(0, Route(f"{STATIC_PREFIX}/{{filename}}", static_asset))
+
+# Fragment ETags also cover the markup, so a deploy that changes the components invalidates them
+RENDER_VERSION = etag(*(path.read_bytes() for path in sorted(Path(__file__).parent.joinpath("components").glob("*.py"))))
+
+
+def _is_fragment(request) -> bool:
+    """HTMX swap (bare fragment) rather than a full page load, as FastHTML decides."""
+    return "hx-request" in request.headers and "hx-history-restore-request" not in request.headers
+
+
+def _render_html(request, components) -> str:
+    """FT components rendered as FastHTML renders a route's return value: a full page, or a bare fragment for HTMX swaps."""
+    return FtResponse(components).__response__(request).body.decode()
+
+
+def _fragment_etag(request, *parts) -> str:
+    """Strong ETag of a GET response determined by `parts` (content hashes, versions, ranges)."""
+    return etag(RENDER_VERSION, request.url.path, _is_fragment(request), *parts)
+
+
+def conditional_fragment(request, tag, render):
+    """
+    `render()` served with ETag `tag`, or a 304 without rendering when the
+    client already has it. A None tag (version unknown) serves it unvalidated.
+    `render()` returns FT components, or a string of already rendered HTML.
+    """
+    if tag is None:
+        return render()
+    if matched_etag(request, tag):
+        return conditional_response(request, b"", tag, headers={"Vary": "HX-Request, HX-History-Restore-Request"})
+    body = render()
+    html = body if isinstance(body, str) else _render_html(request, body)
+    return conditional_response(request, html, tag, headers={"Vary": "HX-Request, HX-History-Restore-Request"})
+
+
+async def _rag_documents(filenames: list[str]) -> tuple[dict, dict]:
+    """
+    The selected transcripts for the map phase: (filename -> text, filename ->
+    segments parsed on write), fetched concurrently so retrieval does not parse the text again.
+    """
+    store = get_store()
+    contents, parsed = await asyncio.gather(store.get_contents(filenames), store.get_parsed_transcripts(filenames))
+    return contents, {fn: data["segments"] for fn, data in parsed.items() if len(data["segments"])}
+
+
+@rt("/rag-job")
+async def rag_job_endpoint(session, selected: str):
+    """Prefetch every selected transcript once for the signed-in user's /map calls of a question."""
+    email = session.get("email")
+    if not email:
+        return JSONResponse({"error": "Not signed in"}, status_code=401)
+    filenames = _selected_filenames(selected)
+    contents, segments = await _rag_documents(filenames) if filenames else ({}, {})
+    job_id = create_job(email, contents, segments)
+    print(f"LOG:\t/rag-job - Prefetched {len(contents)}/{len(filenames)} transcripts for job {job_id}")
+    return {"job_id": job_id, "filenames": list(contents), "missing": [fn for fn in filenames if fn not in contents]}
+
+
 @rt("/map")
-async def map_endpoint(query: str, filename: str):
-    """Process a single document - called in parallel by client."""
+async def map_endpoint(session, query: str, filename: str, job_id: str = None, model: str = DEFAULT_MODEL):
+    """Process a single document - called in parallel by client (with its /rag-job id to skip the fetch)."""
     print(f"LOG:\t/map - Processing {filename}...")
 
     try:
-        # Fetch single transcript content
-        content_map = await get_transcripts_content_async(DB_NAME, COLLECTION_NAME, [filename])
+        document = get_job_document(job_id, session.get("email"), filename) if job_id else None
+        if document is None:
+            # No prefetch for this call (or not this user's): fetch the single transcript
+            content_map, segments = await _rag_documents([filename])
 
-        if not content_map or filename not in content_map:
-            return {"error": f"Transcript {filename} not found"}
+            if not content_map or filename not in content_map:
+                return {"error": f"Transcript {filename} not found"}
 
-        content = content_map[filename]
+            document = content_map[filename], segments.get(filename)
+        content, segments = document
 
-        # Single LLM call - fast, well within timeout
-        response = map_document(query, content)
+        # Single LLM call - awaited, so concurrent /map requests overlap
+        response = await map_document(query, content, _checked_model(model), segments=segments)
         print(f"LOG:\t/map - Completed {filename}")
 
         return {"filename": filename, "response": response}
@@ -244,6 +420,7 @@ async def reduce_endpoint(request):
     body = await request.json()
     query = body.get("query", "")
     responses = body.get("responses", [])
+    model = _checked_model(body.get("model", DEFAULT_MODEL))
 
     print(f"LOG:\t/reduce - Consolidating {len(responses)} responses...")
 
@@ -251,11 +428,8 @@ async def reduce_endpoint(request):
         return Div(cls="uk-card-secondary p-4")("No responses to consolidate.")
 
     try:
-        # Single response - no reduce needed
-        if len(responses) == 1:
-            final = responses[0]
-        else:
-            final = reduce_responses(query, responses)
+        # Single response - no reduce needed; large selections are tree-reduced
+        final = await reduce_all(query, responses, model)
 
         print("LOG:\t/reduce - Complete")
         return render_response(final)
@@ -267,24 +441,205 @@ async def reduce_endpoint(request):
         )
 
 
+def _selected_filenames(selected: str) -> list[str]:
+    """Split the comma-separated selection into unique filenames, keeping order."""
+    return list(dict.fromkeys(fn.strip() for fn in selected.split(",") if fn.strip()))
+
+
+def _checked_model(model: str) -> str:
+    """Only allow models offered in the prompt form."""
+    return model if model in {model_id for _, model_id in MODELS} else DEFAULT_MODEL
+
+
+@rt("/rag")
+async def rag_endpoint(query: str, selected: str, model: str = DEFAULT_MODEL):
+    """Map-reduce over all selected documents in a single request."""
+    filenames = _selected_filenames(selected)
+    model = _checked_model(model)
+
+    print(f"LOG:\t/rag - Processing {len(filenames)} documents with {model}...")
+
+    if not filenames:
+        return Div(cls="uk-card-secondary p-4")("Please select at least one source in the transcripts panel.")
+
+    try:
+        # One database round trip for every selected transcript
+        contents, segments = await _rag_documents(filenames)
+        if not contents:
+            return Div(cls="uk-card-secondary p-4")("Selected transcripts not found.")
+
+        final = await run_rag(query, contents, model, segments=segments)
+        print("LOG:\t/rag - Complete")
+        return render_response(final)
+
+    except Exception as e:
+        print(f"LOG:\t/rag error: {e}")
+        return Div(cls="uk-card-secondary p-4")(
+            "Error processing documents. Please try again."
+        )
+
+
+# Minimum seconds between two partial renders of a streamed answer
+STREAM_RENDER_INTERVAL = 0.1
+
+
+async def _cancel_on_disconnect(request, task):
+    """
+    Cancel `task` once the client disconnects. Under ASGI 2.4 servers Starlette
+    only notices a disconnect when a write fails, which a long map phase never
+    attempts, so the request's receive channel is watched directly.
+    """
+    while not task.done():
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            print("LOG:\t/rag-stream - Client disconnected, cancelling")
+            task.cancel()
+            return
+
+
+@rt("/rag-stream")
+async def rag_stream_endpoint(request, query: str, selected: str, model: str = DEFAULT_MODEL):
+    """
+    Streaming variant of /rag as server-sent events.
+
+    Events: `progress` ("mapped/total"), `answer` (partial render while the
+    reduce is streaming), then `done` (final render) or `error`.
+
+    The map/reduce runs in a task feeding the stream, and is cancelled when the
+    client goes away, so no LLM call outlives the request.
+    """
+    filenames = _selected_filenames(selected)
+    model = _checked_model(model)
+
+    print(f"LOG:\t/rag-stream - Processing {len(filenames)} documents with {model}...")
+
+    async def produce(emit):
+        try:
+            contents, segments = await _rag_documents(filenames)
+            if not contents:
+                emit(sse_message(Div(cls="uk-card-secondary p-4")("Selected transcripts not found."), event="error"))
+                return
+
+            def on_mapped(mapped):
+                emit(sse_message(f"{mapped}/{len(contents)}", event="progress"))
+
+            partials = await tree_reduce(query, await map_partials(query, contents, model, on_mapped=on_mapped, segments=segments), model)
+
+            if len(partials) == 1:
+                final = partials[0]
+            else:
+                final = ""
+                last_render = 0.0
+                stream = StreamingResponse()  # partial renders only convert the unfinished tail
+                async with aclosing(stream_reduce(query, partials, model)) as deltas:
+                    async for delta in deltas:
+                        final += delta
+                        if time.monotonic() - last_render >= STREAM_RENDER_INTERVAL:
+                            last_render = time.monotonic()
+                            emit(sse_message(stream.render(final), event="answer"))
+
+            print("LOG:\t/rag-stream - Complete")
+            emit(sse_message(render_response(final), event="done"))
+
+        except Exception as e:
+            print(f"LOG:\t/rag-stream error: {e}")
+            emit(sse_message(Div(cls="uk-card-secondary p-4")("Error processing documents. Please try again."), event="error"))
+
+    async def events():
+        if not filenames:
+            yield sse_message(Div(cls="uk-card-secondary p-4")("Please select at least one source in the transcripts panel."), event="error")
+            return
+
+        # First byte goes out before any database or LLM work
+        yield sse_message(f"0/{len(filenames)}", event="progress")
+
+        messages = asyncio.Queue()
+        task = asyncio.create_task(produce(messages.put_nowait))
+        task.add_done_callback(lambda _: messages.put_nowait(None))
+        watcher = asyncio.create_task(_cancel_on_disconnect(request, task))
+        try:
+            while (message := await messages.get()) is not None:
+                yield message
+        finally:
+            task.cancel()
+            watcher.cancel()
+
+    return EventStream(events())
+
+
 @rt("/load-transcripts")
-async def load_transcripts_route():
+async def load_transcripts_route(request):
     """
     Async endpoint to load transcripts from MongoDB.
     Called via HTMX after initial page render.
-    Fetches metadata only (no content) for fast loading.
+    The navigation tree is cached and only refreshed when the collection changed;
+    its version is the ETag, so an unchanged tree is a 304.
     """
-    print("LOG:\tLoading transcripts asynchronously...")
+    transcript_nav, count, version = await get_store().navigation()
+
+    print(f"LOG:\tNavigation for {count} transcripts")
+
+    tag = _fragment_etag(request, version, NAVIGATION_LAZY) if version is not None else None
+    return conditional_fragment(request, tag, lambda: TranscriptsCard(transcript_nav, count, lazy=NAVIGATION_LAZY))
+
 
-    # Fetch metadata only (no TRANSCRIPT content) - this is fast!
-    transcripts_metadata = await load_transcripts_metadata_async(DB_NAME, COLLECTION_NAME)
+@rt("/load-transcripts-country")
+async def load_transcripts_country(request, country: str):
+    """Lazy navigation fragment: the projects of one country."""
+    transcript_nav, _, version = await get_store().navigation()
+    projects = transcript_nav.get(country, {})
+    tag = _fragment_etag(request, version, country) if version is not None else None
+    return conditional_fragment(
+        request, tag, lambda: cached_fragment(("country", country), lambda: to_xml(CountryProjects(country, projects)), version)
+    )
+
+
+@rt("/load-transcripts-project")
+async def load_transcripts_project(request, country: str, project: str):
+    """Lazy navigation fragment: the transcript rows of one project."""
+    transcript_nav, _, version = await get_store().navigation()
+    records = transcript_nav.get(country, {}).get(project, [])
+    tag = _fragment_etag(request, version, country, project) if version is not None else None
+    return conditional_fragment(
+        request, tag, lambda: cached_fragment(("project", country, project), lambda: to_xml(ProjectRecords(records)), version)
+    )
 
-    print(f"LOG:\tLoaded {len(transcripts_metadata)} transcript metadata entries")
 
-    # Build navigation tree directly (no caching - serverless-friendly)
-    transcript_nav = build_navigation(transcripts_metadata)
+@rt("/search")
+async def search_endpoint(q: str, limit: int = 20, mode: str = "keyword"):
+    """
+    Ranked transcript matches for the query: segments by BM25 (mode=keyword),
+    or segment-aligned chunks by embedding similarity (mode=semantic).
+    """
+    limit = max(1, min(limit, 100))
+    if mode == "semantic":
+        # numpy and the vector index load with the first semantic search, not at cold start
+        from lib.vector_index import get_vector_index
+
+        index = await get_vector_index(get_store())
+        results = index.search(q, limit=limit)
+    else:
+        results = await get_store().search(q, limit=limit)
+    print(f"LOG:\t/search - {len(results)} {mode} results for {q!r}")
+    return {"query": q, "mode": mode, "results": results}
 
-    return TranscriptsCard(transcript_nav, len(transcripts_metadata))
+
+def _signed_out(session):
+    """401 response for routes that need a signed-in session, or None when signed in."""
+    if not session.get("email"):
+        return JSONResponse({"error": "Not signed in"}, status_code=401)
+
+
+@rt("/cache-stats")
+def cache_stats_endpoint(session):
+    """Hit/miss counters of the in-process caches and the persistent map cache tier (signed-in users only)."""
+    return _signed_out(session) or {"memory": cache_stats(), "map_responses_persistent": map_cache_stats()}
+
+
+@rt("/db-stats")
+def db_stats_endpoint(session):
+    """MongoDB connection pool counters: open and checked-out connections, check-out waits and failures (signed-in users only)."""
+    return _signed_out(session) or pool_stats()
 
 
 @rt("/read-transcript")
@@ -304,44 +659,63 @@ async def read_transcript_shell(filename: str):
     )(TranscriptLoadingSkeleton())
 
 
+def _page_etag(request, page, filename: str, offset: int, limit: int):
+    """A transcript page is fixed by the transcript's content hash and the range (None if the hash is unknown)."""
+    if page["content_hash"] is None:
+        return None
+    return _fragment_etag(request, page["content_hash"], filename, offset, limit)
+
+
 @rt("/read-transcript-content")
-async def read_transcript_content(filename: str, offset: int = 0, limit: int = 200):
-    data = await get_parsed_transcript(filename)
-    if not data:
+async def read_transcript_content(request, filename: str, offset: int = 0, limit: int = 200):
+    page = await get_store().get_segments(filename, offset, limit)
+    if not page:
         return Div(cls="p-4 text-center")(P("Transcript not found.", cls="text-red-400"))
 
-    return TranscriptViewer(
-        metadata=data["metadata"],
-        segments=data["segments"],
-        speakers=data["speakers"],
+    return conditional_fragment(request, _page_etag(request, page, filename, offset, limit), lambda: TranscriptViewer(
+        metadata=page["metadata"],
+        segments=page["segments"],
+        speakers=page["speakers"],
         offset=offset,
         limit=limit,
         filename=filename,
-    )
+        total=page["total"],
+    ))
 
 
 @rt("/read-transcript-chunk")
-async def read_transcript_chunk(filename: str, offset: int = 200, limit: int = 200):
-    data = await get_parsed_transcript(filename)
-    if not data:
+async def read_transcript_chunk(request, filename: str, offset: int = 200, limit: int = 200):
+    page = await get_store().get_segments(filename, offset, limit)
+    if not page:
         return Div()
 
-    segments = data["segments"]
-    speakers = data["speakers"]
-    total = len(segments)
-    chunk = segments[offset: offset + limit]
+    return conditional_fragment(request, _page_etag(request, page, filename, offset, limit), lambda: Div(
+        *[TranscriptSegmentRow(seg) for seg in page["segments"]],
+        TranscriptLoadMoreSentinel(filename, offset + limit, limit) if (offset + limit) < page["total"] else None,
+    ))
 
-    return Div(
-        *[TranscriptSegmentRow(seg) for seg in chunk],
-        TranscriptLoadMoreSentinel(filename, offset + limit, limit) if (offset + limit) < total else None,
-    )
+
+# AppPage is static: it is rendered once per URL and page/fragment form, then
+# served from memory with an ETag so repeat visits get a 304
+_app_page_cache = LRUCache(16, name="app_page")
+
+
+def _rendered_app_page(request) -> tuple[str, str]:
+    key = (_is_fragment(request), str(request.url))
+    cached = _app_page_cache.get(key)
+    if cached is None:
+        html = _render_html(request, (Title("Socioscope"), AppPage))
+        cached = (html, etag(html))
+        _app_page_cache.set(key, cached)
+    return cached
 
 
 @rt
-def index(session):
+def index(session, request):
     """Main app - requires login."""
     if session.get("email"):
-        return (Title("Socioscope"), AppPage)
+        html, tag = _rendered_app_page(request)
+        return conditional_response(request, html, tag, headers={"Vary": "HX-Request, HX-History-Restore-Request"})
     return RedirectResponse(url="/auth")
 
 
@@ -1,6 +1,5 @@
-from fasthtml.common import Style
-
-css = Style(
+# App stylesheet, served as a fingerprinted static asset (see lib/assets.py)
+CSS = (
     """
     html, body { height: 100vh; max-height: 100vh; overflow: hidden; }
 
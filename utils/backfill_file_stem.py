@@ -0,0 +1,65 @@
+"""
+Backfill FILE_STEM and content_hash on transcript documents ingested before
+they existed, and create the transcript indexes.
+
+Safe to re-run: only documents without FILE_STEM or content_hash are updated.
+
+Usage:
+    python -m utils.backfill_file_stem [batch_size]
+"""
+import sys
+from pymongo import UpdateOne
+
+from lib.db import get_sync_client
+from lib.sources import TRANSCRIPT_INDEXES, content_hash, file_stem
+from config import DB_NAME, COLLECTION_NAME
+
+
+def backfill_file_stems(collection, batch_size: int = 1000) -> int:
+    """Set FILE_STEM on every document missing it, in unordered bulk batches. Returns the count updated."""
+    updated = 0
+    batch = []
+    for doc in collection.find({"FILE_STEM": {"$exists": False}}, {"FILE": 1}):
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"FILE_STEM": file_stem(doc["FILE"])}}))
+        if len(batch) >= batch_size:
+            updated += collection.bulk_write(batch, ordered=False).modified_count
+            batch = []
+    if batch:
+        updated += collection.bulk_write(batch, ordered=False).modified_count
+    return updated
+
+
+def backfill_content_hashes(collection, batch_size: int = 1000) -> int:
+    """Set content_hash on every document missing it, in unordered bulk batches. Returns the count updated."""
+    updated = 0
+    batch = []
+    for doc in collection.find({"content_hash": {"$exists": False}}, {"TRANSCRIPT": 1}):
+        # A document rewritten meanwhile already carries its hash
+        batch.append(UpdateOne(
+            {"_id": doc["_id"], "content_hash": {"$exists": False}},
+            {"$set": {"content_hash": content_hash(doc.get("TRANSCRIPT", ""))}},
+        ))
+        if len(batch) >= batch_size:
+            updated += collection.bulk_write(batch, ordered=False).modified_count
+            batch = []
+    if batch:
+        updated += collection.bulk_write(batch, ordered=False).modified_count
+    return updated
+
+
+def create_indexes(collection):
+    for keys, options in TRANSCRIPT_INDEXES:
+        collection.create_index(keys, **options)
+
+
+if __name__ == "__main__":
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    client = get_sync_client()
+    collection = client[DB_NAME][COLLECTION_NAME]
+
+    print("> Backfilling FILE_STEM...")
+    print("Updated:", backfill_file_stems(collection, batch_size))
+    print("> Backfilling content_hash...")
+    print("Updated:", backfill_content_hashes(collection, batch_size))
+    create_indexes(collection)
+    print("Indexes:", ", ".join(collection.index_information()))
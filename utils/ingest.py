@@ -0,0 +1,40 @@
+"""
+Bulk-ingest transcripts into MongoDB, parsing them on write.
+
+Reads .json (array), .jsonl or .csv files of transcript documents (FILE,
+TRANSCRIPT and metadata columns). Safe to re-run: transcripts whose content
+hash is already stored are skipped. Documents stored before FILE_STEM existed
+are backfilled first, so they are updated rather than duplicated.
+
+Usage:
+    python -m utils.ingest FILE [FILE ...] [--batch-size 200] [--workers N]
+"""
+import argparse
+
+from lib.db import get_sync_client
+from lib.ingest import ingest
+from lib.segment_store import SEGMENT_INDEX
+from utils.backfill_file_stem import backfill_file_stems, create_indexes
+from config import DB_NAME, COLLECTION_NAME, SEGMENTS_COLLECTION_NAME
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-ingest transcripts into MongoDB.")
+    parser.add_argument("paths", nargs="+", help=".json, .jsonl or .csv files")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: CPU count)")
+    args = parser.parse_args()
+
+    client = get_sync_client()
+    collection = client[DB_NAME][COLLECTION_NAME]
+    segments_collection = client[DB_NAME][SEGMENTS_COLLECTION_NAME]
+    print("FILE_STEM backfilled:", backfill_file_stems(collection))
+    create_indexes(collection)
+    keys, options = SEGMENT_INDEX
+    segments_collection.create_index(keys, **options)
+
+    print("> Ingesting transcripts...")
+    counts = ingest(args.paths, collection, segments_collection, args.batch_size, args.workers)
+    print("Read:     ", counts["read"])
+    print("Written:  ", counts["written"])
+    print("Unchanged:", counts["unchanged"])